@@ -0,0 +1,155 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Benchmark de la jointure as-of Uniswap / Chainlink (scripts/asof_join.py).
+
+Pour chaque taille d'entrée, un CSV de swaps synthétiques et un CSV de
+rounds Chainlink (un round par heure, plus des rounds intermédiaires) sont
+joints dans un processus enfant :
+  - stream : asof_join.py, une passe par morceaux ;
+  - full   : chargement complet des deux fichiers puis pandas.merge_asof.
+Le pic de mémoire résidente (ru_maxrss) du mode stream doit rester stable
+quand la taille d'entrée augmente. Les deux sorties doivent être identiques.
+
+    python3 benchmarks/bench_asof_join.py --swaps 500000 2000000 5000000
+"""
+
+import argparse
+import filecmp
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.normpath(os.path.join(HERE, os.pardir, 'scripts'))
+sys.path.insert(0, SCRIPTS_DIR)
+from asof_join import ORACLE_COLUMNS, asof_join  # noqa: E402
+
+
+def synthetic_rounds(swaps, heartbeat=3_600, extra_ratio=0.2, seed=0):
+    """
+    Rounds Chainlink synthétiques couvrant la période des swaps : un par heartbeat,
+    plus `extra_ratio` rounds intermédiaires ; prix du dernier swap, légèrement bruité.
+    """
+    rng = np.random.default_rng(seed)
+    seconds = swaps['timestamp'].dt.tz_convert(None).to_numpy(dtype='datetime64[s]').astype(np.int64)
+    first, last = seconds[0] - heartbeat // 2, seconds[-1]
+    beats = np.arange(first, last + 1, heartbeat)
+    extra = rng.integers(first, last + 1, int(len(beats) * extra_ratio))
+    times = np.sort(np.concatenate((beats, extra)))
+    last_swap = np.clip(np.searchsorted(seconds, times, side='right') - 1, 0, None)
+    prices = np.round(swaps['price_usdc_per_eth'].to_numpy()[last_swap] * rng.normal(1, 5e-4, len(times)), 8)
+    return pd.DataFrame({
+        'global_round_id': [str((1 << 64) | i) for i in range(1, len(times) + 1)],
+        'phase': 1,
+        'aggregator_round': np.arange(1, len(times) + 1),
+        'datetime_utc': pd.to_datetime(times, unit='s').strftime('%Y-%m-%d %H:%M:%S'),
+        'price': prices,
+    })
+
+
+def naive_join(uniswap_path, chainlink_path, output_path):
+    """
+    Référence : chargement complet puis pandas.merge_asof.
+    """
+    swaps = pd.read_csv(uniswap_path, dtype={'timestamp': str}, float_precision='round_trip')
+    rounds = pd.read_csv(chainlink_path, usecols=['global_round_id', 'datetime_utc', 'price'],
+                         dtype={'global_round_id': str, 'datetime_utc': str}, float_precision='round_trip')
+    swaps['_t'] = pd.to_datetime(swaps['timestamp'], utc=True, format='ISO8601')
+    rounds['_t'] = pd.to_datetime(rounds['datetime_utc'], utc=True, format='ISO8601')
+    rounds = rounds.rename(columns={'global_round_id': 'oracle_round_id', 'price': 'oracle_price',
+                                    'datetime_utc': 'oracle_updated_at'})
+    rounds['_rt'] = rounds['_t']
+    joined = pd.merge_asof(swaps, rounds, on='_t', direction='backward')
+    joined['staleness_s'] = ((joined['_t'] - joined['_rt']).dt.total_seconds()).astype('Int64')
+    joined['deviation_bps'] = (joined['price_usdc_per_eth'] - joined['oracle_price']) / joined['oracle_price'] * 10_000
+    columns = [c for c in swaps.columns if c != '_t'] + ORACLE_COLUMNS
+    joined[columns].to_csv(output_path, index=False)
+    return len(joined)
+
+
+def run_child(uniswap_path, chainlink_path, output_path, mode, chunk_size):
+    """
+    Joint les deux fichiers dans le processus courant et retourne les mesures.
+    """
+    start = time.perf_counter()
+    if mode == 'stream':
+        rows = asof_join(uniswap_path, chainlink_path, output_path, chunk_size=chunk_size)
+    else:
+        rows = naive_join(uniswap_path, chainlink_path, output_path)
+    elapsed = time.perf_counter() - start
+    return {
+        'mode': mode,
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows / elapsed) if elapsed else None,
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps et pic mémoire de la jointure as-of selon la taille d'entrée.")
+    parser.add_argument("--swaps", type=int, nargs='+', default=[500_000, 2_000_000, 5_000_000])
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Taille des morceaux en mode stream (défaut: 100000).")
+    parser.add_argument("--modes", nargs='+', choices=['stream', 'full'], default=['stream', 'full'])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats.")
+    parser.add_argument("--child", nargs=4, metavar=('UNISWAP', 'CHAINLINK', 'OUT', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(*args.child, args.chunk_size)))
+        return
+
+    sys.path.insert(0, HERE)
+    from synthetic_logs import synthetic_swaps
+
+    results, mismatches = [], 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_swaps in args.swaps:
+            swaps = synthetic_swaps(n_swaps, seed=args.seed)
+            uniswap_path = os.path.join(tmp, f'swaps_{n_swaps}.csv')
+            chainlink_path = os.path.join(tmp, f'rounds_{n_swaps}.csv')
+            synthetic_rounds(swaps, seed=args.seed).to_csv(chainlink_path, index=False)
+            swaps.to_csv(uniswap_path, index=False)
+            del swaps
+            size_mb = os.path.getsize(uniswap_path) / 1024**2
+
+            outputs = {}
+            for mode in args.modes:
+                outputs[mode] = os.path.join(tmp, f'joined_{mode}.csv')
+                out = subprocess.run(
+                    [sys.executable, __file__, '--child', uniswap_path, chainlink_path, outputs[mode], mode,
+                     '--chunk-size', str(args.chunk_size)],
+                    check=True, capture_output=True, text=True
+                )
+                result = json.loads(out.stdout.strip().splitlines()[-1])
+                result.update({'input_rows': n_swaps, 'input_mb': round(size_mb, 1), 'chunk_size': args.chunk_size})
+                results.append(result)
+                print(f"{mode:>6} | {n_swaps:>9} swaps ({size_mb:7.1f} Mo) | pic RSS {result['peak_rss_mb']:8.1f} Mo "
+                      f"| {result['seconds']:7.2f} s | {result['rows_per_second']} lignes/s")
+            if len(outputs) == 2:
+                identical = filecmp.cmp(outputs['stream'], outputs['full'], shallow=False)
+                print(f"Sorties identiques : {'oui' if identical else 'NON'}")
+                mismatches += not identical
+            for path in (uniswap_path, chainlink_path, *outputs.values()):
+                os.remove(path)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if mismatches:
+        print(f"ERREUR: {mismatches} comparaison(s) en échec", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
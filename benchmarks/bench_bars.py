@@ -0,0 +1,141 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Benchmark de l'agrégation en barres OHLCV / VWAP (scripts/bars.py).
+
+Pour chaque taille d'entrée (swaps synthétiques déjà décodés, plusieurs par
+bloc de 12 s) et chaque intervalle :
+  - agrégation vectorisée en une fois (aggregate_bars) ;
+  - référence pandas (groupby sur le début de barre), dont les barres doivent
+    être identiques ;
+  - mise à jour incrémentale du fichier de barres, par morceaux alignés sur
+    les blocs, dont le résultat doit être identique à une construction en
+    une fois.
+
+    python3 benchmarks/bench_bars.py --swaps 1000000 5000000 --intervals 1m 1h 1d
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.normpath(os.path.join(HERE, os.pardir, 'scripts')))
+from bars import INTERVALS, aggregate_bars, format_bars, update_bars_file  # noqa: E402
+from synthetic_logs import synthetic_swaps  # noqa: E402
+
+
+def pandas_bars(swaps, interval):
+    """
+    Référence : groupby pandas sur le début de barre.
+    """
+    width = INTERVALS[interval]
+    seconds = swaps['timestamp'].dt.tz_convert(None).to_numpy(dtype='datetime64[s]').astype(np.int64)
+    frame = pd.DataFrame({
+        'bar_start': seconds - seconds % width,
+        'price': swaps['price_usdc_per_eth'],
+        'volume_eth': swaps['eth_amount'].abs(),
+        'volume_usdc': swaps['volume_usdc'],
+        'block_number': swaps['block_number'],
+    })
+    frame['price_volume'] = frame['price'] * frame['volume_eth']
+    bars = frame.groupby('bar_start', sort=True).agg(
+        open=('price', 'first'), high=('price', 'max'), low=('price', 'min'), close=('price', 'last'),
+        swap_count=('price', 'size'), volume_usdc=('volume_usdc', 'sum'), volume_eth=('volume_eth', 'sum'),
+        last_block=('block_number', 'max'), price_volume=('price_volume', 'sum'),
+    ).reset_index()
+    bars['vwap'] = bars['price_volume'] / bars['volume_eth']
+    return bars
+
+
+def same_bars(a, b, rtol=1e-9):
+    """
+    Vrai si deux jeux de barres sont identiques (égalité exacte hors sommes flottantes).
+    """
+    if len(a) != len(b):
+        return False
+    for column in ('bar_start', 'open', 'high', 'low', 'close', 'swap_count', 'last_block'):
+        if not np.array_equal(np.asarray(a[column]), np.asarray(b[column])):
+            return False
+    return all(np.allclose(a[c].astype(float), b[c].astype(float), rtol=rtol, atol=0)
+               for c in ('vwap', 'volume_usdc', 'volume_eth'))
+
+
+def run(n_swaps, interval, chunk_size, seed):
+    """
+    Mesures d'une taille d'entrée et d'un intervalle.
+    """
+    swaps = synthetic_swaps(n_swaps, seed=seed)
+
+    start = time.perf_counter()
+    bars = aggregate_bars(swaps, interval)
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reference = pandas_bars(swaps, interval)
+    pandas_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bars.csv')
+        start = time.perf_counter()
+        # Morceaux alignés sur les blocs, comme les tranches du pipeline
+        blocks = swaps['block_number'].to_numpy()
+        edges = np.unique(np.searchsorted(blocks, blocks[::chunk_size], side='left'))
+        for first, last in zip(edges, np.append(edges[1:], n_swaps)):
+            update_bars_file(path, swaps.iloc[first:last], interval)
+        incremental = time.perf_counter() - start
+        incremental_bars = pd.read_csv(path, dtype={'bar_start': str}, float_precision='round_trip')
+
+    one_shot = format_bars(bars)
+    return {
+        'swaps': n_swaps,
+        'interval': interval,
+        'bars': len(bars),
+        'vectorized_seconds': round(vectorized, 3),
+        'pandas_seconds': round(pandas_seconds, 3),
+        'incremental_seconds': round(incremental, 3),
+        'chunk_size': chunk_size,
+        'swaps_per_second': round(n_swaps / vectorized) if vectorized else None,
+        'matches_pandas': same_bars(bars, reference),
+        'incremental_matches': same_bars(one_shot, incremental_bars),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'agrégation OHLCV / VWAP.")
+    parser.add_argument("--swaps", type=int, nargs='+', default=[1_000_000, 5_000_000])
+    parser.add_argument("--intervals", nargs='+', choices=list(INTERVALS), default=["1m", "1h", "1d"])
+    parser.add_argument("--chunk-size", type=int, default=50_000,
+                        help="Swaps par mise à jour incrémentale (défaut: 50000, ordre d'une tranche eth_getLogs).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats.")
+    args = parser.parse_args()
+
+    results, mismatches = [], 0
+    for n_swaps in args.swaps:
+        for interval in args.intervals:
+            result = run(n_swaps, interval, args.chunk_size, args.seed)
+            results.append(result)
+            print(f"{n_swaps:>9} swaps | {interval:>3} | {result['bars']:>7} barres "
+                  f"| vectorisé {result['vectorized_seconds']:6.2f} s ({result['swaps_per_second']} swaps/s) "
+                  f"| pandas {result['pandas_seconds']:6.2f} s | incrémental {result['incremental_seconds']:6.2f} s "
+                  f"| identiques : {'oui' if result['matches_pandas'] and result['incremental_matches'] else 'NON'}")
+            mismatches += not (result['matches_pandas'] and result['incremental_matches'])
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if mismatches:
+        print(f"ERREUR: {mismatches} comparaison(s) en échec", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Démarrage à froid des scripts et du pipeline en un seul processus
+(scripts/pipeline.py), contre un nœud simulé.
+
+  - import   : durée d'import de chaque module dans un interpréteur neuf, et
+               modules lourds (pandas, web3, mpmath, aiohttp) chargés par l'import ;
+  - help     : durée de `python3 <script> --help` (interpréteur compris) ;
+  - update   : mise à jour complète d'un projet temporaire, comme update.sh
+               avant le pipeline (bars.py, Uniswap_process_logs.py,
+               chainlink_dicho.py, concaténation, generate_readme.py : quatre
+               processus Python) puis avec pipeline.py (un processus). Les
+               jeux de données produits doivent être identiques à l'octet près.
+
+Chaque mesure est répétée --repeat fois ; la médiane est retenue.
+
+    python3 benchmarks/bench_cold_start.py --repeat 5 --swaps 6000
+"""
+
+import argparse
+import filecmp
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.normpath(os.path.join(HERE, os.pardir, 'scripts'))
+sys.path.insert(0, HERE)
+from mock_node import MockChain, MockFeed, MockNode, MockPool  # noqa: E402
+
+START_BLOCK = 18_000_000
+SWAPS_PER_BLOCK = 3
+MODULES = ('pipeline', 'generate_readme', 'Uniswap_process_logs', 'chainlink_dicho')
+SCRIPTS = ('pipeline.py', 'Uniswap_process_logs.py', 'chainlink_dicho.py')
+HEAVY_MODULES = ('pandas', 'web3', 'mpmath', 'aiohttp')
+DATASETS = ('uniswap_eth_usd.csv', 'chainlink_eth_usd.csv',
+            'uniswap_eth_usd_bars_1m.csv', 'uniswap_eth_usd_bars_1h.csv')
+
+IMPORT_PROBE = """
+import sys, time, json
+sys.path.insert(0, {scripts!r})
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def timed_run(command, **kwargs):
+    start = time.perf_counter()
+    subprocess.run(command, check=True, capture_output=True, text=True, **kwargs)
+    return time.perf_counter() - start
+
+
+def measure_imports(repeat):
+    results = []
+    for module in MODULES:
+        runs = []
+        for _ in range(repeat):
+            probe = IMPORT_PROBE.format(scripts=SCRIPTS_DIR, module=module, heavy=HEAVY_MODULES)
+            output = subprocess.run([sys.executable, '-c', probe], check=True, capture_output=True, text=True).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        seconds = statistics.median(run['seconds'] for run in runs)
+        loaded = runs[0]['loaded']
+        results.append({'module': module, 'import_seconds': round(seconds, 3), 'heavy_modules': loaded})
+        print(f"import  | {module:>22} | {seconds * 1000:7.1f} ms | {', '.join(loaded) or '-'}")
+    return results
+
+
+def measure_help(repeat):
+    results = []
+    env = {k: v for k, v in os.environ.items() if k != 'RPC'}
+    for script in SCRIPTS:
+        seconds = statistics.median(
+            timed_run([sys.executable, os.path.join(SCRIPTS_DIR, script), '--help'], env=env) for _ in range(repeat)
+        )
+        results.append({'script': script, 'help_seconds': round(seconds, 3)})
+        print(f"help    | {script:>22} | {seconds * 1000:7.1f} ms")
+    return results
+
+
+def make_project(path):
+    """
+    Projet temporaire : copie de scripts/ et répertoire data/ vide.
+    """
+    shutil.copytree(SCRIPTS_DIR, os.path.join(path, 'scripts'), ignore=shutil.ignore_patterns('__pycache__'))
+    os.makedirs(os.path.join(path, 'data'))
+    return path
+
+
+def seed_project(path, url, pool, feed):
+    """
+    Jeux cumulés initiaux : la première moitié des swaps et des rounds du nœud simulé.
+    Les barres sont absentes (reconstruites par la mise à jour).
+    """
+    data = os.path.join(path, 'data')
+    env = dict(os.environ, RPC=url)
+    middle = pool.rows[len(pool.rows) // 2]['block_number']
+    subprocess.run([sys.executable, os.path.join('scripts', 'Uniswap_process_logs.py'), '--from-block', str(START_BLOCK),
+                    '--to-block', str(middle), '--full', '--no-block-index'],
+                   cwd=path, env=env, check=True, capture_output=True)
+    os.replace(os.path.join(data, 'uniswap_eth_usd_last.csv'), os.path.join(data, 'uniswap_eth_usd.csv'))
+    subprocess.run([sys.executable, os.path.join('scripts', 'chainlink_dicho.py'), '--debut', str(feed.phases[1][0][1])],
+                   cwd=path, env=env, check=True, capture_output=True)
+    n_rounds = sum(len(rounds) for rounds in feed.phases.values())
+    with open(os.path.join(data, 'chainlink_eth_usd_last.csv'), encoding='utf-8') as src, \
+            open(os.path.join(data, 'chainlink_eth_usd.csv'), 'w', encoding='utf-8') as dst:
+        for i, line in enumerate(src):
+            if i > n_rounds // 2:
+                break
+            dst.write(line)
+    os.remove(os.path.join(data, 'chainlink_eth_usd_last.csv'))
+    for name in os.listdir(data):
+        if name not in DATASETS:
+            os.remove(os.path.join(data, name))
+
+
+def update_separate(path, url):
+    """
+    Étapes d'update.sh avant le pipeline : un processus Python par script.
+    """
+    sys.path.insert(0, SCRIPTS_DIR)
+    from pipeline import append_rows, next_timestamp
+
+    data = os.path.join(path, 'data')
+    dataset_uniswap, dataset_chainlink = os.path.join(data, 'uniswap_eth_usd.csv'), os.path.join(data, 'chainlink_eth_usd.csv')
+    env = dict(os.environ, RPC=url)
+    script = lambda name: [sys.executable, os.path.join(path, 'scripts', name)]  # noqa: E731
+    start = time.perf_counter()
+    since, debut = next_timestamp(dataset_uniswap, 'timestamp'), next_timestamp(dataset_chainlink, 'datetime_utc')
+    subprocess.run(script('bars.py') + ['--input', dataset_uniswap, '--intervals', '1m', '1h', '--rebuild'],
+                   cwd=path, env=env, check=True, capture_output=True)
+    subprocess.run(script('Uniswap_process_logs.py') + ['--source', 'rpc', '--since', str(since), '--bars', '1m', '1h'],
+                   cwd=path, env=env, check=True, capture_output=True)
+    subprocess.run(script('chainlink_dicho.py') + ['--resume', '--dataset', dataset_chainlink, '--debut', str(debut),
+                                                   '--phases-file', os.path.join(data, 'chainlink_phases.json')],
+                   cwd=path, env=env, check=True, capture_output=True)
+    for name, dataset in (('uniswap_eth_usd_last.csv', dataset_uniswap), ('chainlink_eth_usd_last.csv', dataset_chainlink)):
+        append_rows(os.path.join(data, name), dataset)
+        os.remove(os.path.join(data, name))
+    subprocess.run(script('generate_readme.py'), cwd=path, env=env, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def update_pipeline(path, url):
+    return timed_run([sys.executable, os.path.join(path, 'scripts', 'pipeline.py'), '--bars', '1m', '1h'],
+                     cwd=path, env=dict(os.environ, RPC=url))
+
+
+def measure_update(args):
+    pool = MockPool.synthetic(args.swaps, start_block=START_BLOCK, swaps_per_block=SWAPS_PER_BLOCK)
+    feed = MockFeed.synthetic(tuple(args.rounds_per_phase))
+    # Tête de chaîne juste après le dernier swap : la mise à jour ne lit que les blocs utiles
+    chain = MockChain(head_block=pool.rows[-1]['block_number'] + 10)
+    timings, identical = {'separate': [], 'pipeline': []}, True
+    with MockNode(chain=chain, feed=feed, pool=pool, latency=args.latency) as node, \
+            tempfile.TemporaryDirectory() as tmp:
+        seed = make_project(os.path.join(tmp, 'seed'))
+        seed_project(seed, node.url, pool, feed)
+        for i in range(args.repeat):
+            projects = {}
+            for mode, update in (('separate', update_separate), ('pipeline', update_pipeline)):
+                path = projects[mode] = os.path.join(tmp, f'{mode}_{i}')
+                shutil.copytree(seed, path)
+                timings[mode].append(update(path, node.url))
+            for name in DATASETS:
+                if not filecmp.cmp(*(os.path.join(p, 'data', name) for p in projects.values()), shallow=False):
+                    print(f"ERREUR: {name} différent entre les deux modes (répétition {i + 1})", file=sys.stderr)
+                    identical = False
+
+    results = []
+    for mode, processes in (('separate', 4), ('pipeline', 1)):
+        seconds = statistics.median(timings[mode])
+        results.append({'mode': mode, 'python_processes': processes, 'seconds': round(seconds, 3),
+                        'runs': [round(t, 3) for t in timings[mode]]})
+        print(f"update  | {mode:>22} | {seconds:7.2f} s | {processes} processus Python")
+    print(f"update  | gain du pipeline : {results[0]['seconds'] - results[1]['seconds']:.2f} s "
+          f"| jeux de données identiques : {'oui' if identical else 'NON'}")
+    return results, identical
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Démarrage à froid des scripts et du pipeline en un seul processus.")
+    parser.add_argument("--repeat", type=int, default=3, help="Répétitions de chaque mesure (défaut: 3).")
+    parser.add_argument("--swaps", type=int, default=6_000, help="Events Swap du pool simulé (défaut: 6000).")
+    parser.add_argument("--rounds-per-phase", type=int, nargs='+', default=[400, 600])
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence du nœud simulé, en secondes (défaut: 0).")
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats.")
+    args = parser.parse_args()
+
+    results = {'imports': measure_imports(args.repeat), 'help': measure_help(args.repeat)}
+    results['update'], identical = measure_update(args)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
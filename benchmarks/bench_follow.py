@@ -0,0 +1,186 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Vérification et mesure du suivi de chaîne (scripts/follow_chain.py) contre
+un nœud simulé dont la tête avance en temps réel (un bloc toutes les 12 s).
+
+Deux démons suivent le même nœud pendant --duration secondes :
+  - direct : lignes écrites à chaque cycle ; mesure de la fraîcheur
+             (délai bloc → ligne écrite, block_to_row_seconds) ;
+  - tampon : lignes gardées en mémoire (--flush-interval plus long que
+             l'exécution) : aucune ligne avant SIGTERM, toutes après.
+Le démon direct est ensuite relancé (--restart secondes) : la reprise
+depuis le manifeste et le CSV Chainlink ne doit créer ni trou ni doublon.
+
+Chaque sortie est comparée aux données du nœud : tous les swaps des blocs
+couverts par le manifeste, une seule fois ; des rounds Chainlink consécutifs
+(changement de phase compris) identiques à ceux du flux, prix convertis
+avec ses décimales (--feed-decimals).
+
+    python3 benchmarks/bench_follow.py --duration 60 --confirmations 1
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.normpath(os.path.join(HERE, os.pardir, 'scripts'))
+sys.path.insert(0, HERE)
+from mock_node import MockChain, MockFeed, MockNode, MockPool, SLOT_SECONDS  # noqa: E402
+
+SWAPS_PER_BLOCK = 3
+
+
+def start_follower(url, workdir, args, flush_interval=0.0):
+    os.makedirs(workdir, exist_ok=True)
+    command = [
+        sys.executable, os.path.join(SCRIPTS_DIR, 'follow_chain.py'),
+        '--confirmations', str(args.confirmations), '--poll-interval', str(args.poll_interval),
+        '--flush-interval', str(flush_interval), '--metrics-dir', workdir, '--metrics-interval', '5',
+        '--uniswap-output', os.path.join(workdir, 'uniswap.csv'),
+        '--chainlink-output', os.path.join(workdir, 'chainlink.csv'),
+        '--manifest', os.path.join(workdir, 'manifest.json'),
+        '--block-index', os.path.join(workdir, 'block_index.sqlite'),
+    ]
+    log = open(os.path.join(workdir, 'follow.log'), 'a', encoding='utf-8')
+    return subprocess.Popen(command, env=dict(os.environ, RPC=url), stdout=log, stderr=subprocess.STDOUT, cwd=workdir)
+
+
+def stop_follower(process, timeout=30):
+    """
+    SIGTERM puis attente de l'arrêt ; retourne (code de sortie, secondes jusqu'à l'arrêt).
+    """
+    start = time.perf_counter()
+    process.send_signal(signal.SIGTERM)
+    code = process.wait(timeout=timeout)
+    return code, time.perf_counter() - start
+
+
+def rows(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return pd.DataFrame()
+    return pd.read_csv(path, dtype={'global_round_id': str})
+
+
+def verify(workdir, pool, feed):
+    """
+    Compare les sorties d'un démon aux données du nœud. Retourne (mesures, liste des écarts).
+    """
+    errors = []
+    with open(os.path.join(workdir, 'manifest.json'), encoding='utf-8') as f:
+        covered = json.load(f)['covered_blocks']
+    if len(covered) != 1:
+        errors.append(f"plages couvertes non contiguës : {covered}")
+    first_block, last_block = covered[0][0], covered[-1][1]
+
+    swaps = rows(os.path.join(workdir, 'uniswap.csv'))
+    expected = {row['transaction_hash'] for row in pool.rows if first_block <= row['block_number'] <= last_block}
+    written = list(swaps['transaction_hash']) if not swaps.empty else []
+    if len(written) != len(set(written)):
+        errors.append(f"{len(written) - len(set(written))} swaps en double")
+    if set(written) != expected:
+        errors.append(f"swaps : {len(set(written) - expected)} en trop, {len(expected - set(written))} manquants")
+
+    rounds = rows(os.path.join(workdir, 'chainlink.csv'))
+    for _, row in rounds.iterrows():
+        round_id = int(row['global_round_id'])
+        phase, agg = round_id >> 64, round_id & 0xFFFFFFFFFFFFFFFF
+        answer, updated_at = feed.phases[phase][agg - 1]
+        stamp = pd.Timestamp(row['datetime_utc']).timestamp()
+        if (row['phase'], row['aggregator_round']) != (phase, agg) or stamp != updated_at or row['price'] != answer / 10**feed.decimals:
+            errors.append(f"round {round_id} différent du flux")
+    ids = [(int(r) >> 64, int(r) & 0xFFFFFFFFFFFFFFFF) for r in rounds.get('global_round_id', [])]
+    for (p0, a0), (p1, a1) in zip(ids, ids[1:]):
+        if not ((p1 == p0 and a1 == a0 + 1) or (p1 == p0 + 1 and a1 == 1 and a0 == len(feed.phases[p0]))):
+            errors.append(f"rounds non consécutifs : {(p0, a0)} puis {(p1, a1)}")
+
+    with open(os.path.join(workdir, 'metrics_follow.json'), encoding='utf-8') as f:
+        metrics = json.load(f)
+    freshness = metrics.get('block_to_row_seconds', {})
+    result = {
+        'blocks': last_block - first_block + 1,
+        'swaps': len(written),
+        'rounds': len(rounds),
+        'freshness_mean_s': {label.split('=')[1]: h['mean'] for label, h in freshness.items()},
+        'rpc_calls': metrics.get('rpc_calls_total', {}),
+    }
+    return result, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suivi de chaîne contre un nœud simulé en temps réel.")
+    parser.add_argument("--duration", type=float, default=60.0, help="Durée du suivi, en secondes (défaut: 60).")
+    parser.add_argument("--restart", type=float, default=30.0, help="Durée du second suivi après relance (défaut: 30).")
+    parser.add_argument("--confirmations", type=int, default=1, help="Profondeur de confirmation (défaut: 1).")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Intervalle de lecture de la tête (défaut: 0.5).")
+    parser.add_argument("--round-interval", type=int, default=20, help="Secondes entre deux rounds simulés (défaut: 20).")
+    parser.add_argument("--latency", type=float, default=0.002, help="Latence du nœud simulé, en secondes (défaut: 0.002).")
+    parser.add_argument("--feed-decimals", type=int, default=8, help="Décimales du flux Chainlink simulé (défaut: 8).")
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats.")
+    args = parser.parse_args()
+
+    chain = MockChain(live=True)
+    now, head = int(time.time()), chain.head_block
+    blocks = int((args.duration + args.restart) / SLOT_SECONDS) + 20
+    pool = MockPool.synthetic(SWAPS_PER_BLOCK * blocks, start_block=head - 5, swaps_per_block=SWAPS_PER_BLOCK)
+    # La phase 1 se termine pendant le suivi : le changement de phase est exercé
+    switch = max(2, int(args.duration / 2 / args.round_interval))
+    feed = MockFeed.synthetic((10 + switch, 1_000), start_ts=now - 10 * args.round_interval, interval=args.round_interval,
+                              decimals=args.feed_decimals)
+
+    results, failures = [], []
+    with MockNode(chain=chain, feed=feed, pool=pool, latency=args.latency) as node, \
+            tempfile.TemporaryDirectory() as tmp:
+        direct_dir, buffered_dir = os.path.join(tmp, 'direct'), os.path.join(tmp, 'tampon')
+        direct = start_follower(node.url, direct_dir, args)
+        buffered = start_follower(node.url, buffered_dir, args, flush_interval=10 * args.duration)
+        time.sleep(args.duration)
+
+        buffered_before = len(rows(os.path.join(buffered_dir, 'uniswap.csv')))
+        codes = {}
+        for name, process in (('direct', direct), ('tampon', buffered)):
+            codes[name], stop_seconds = stop_follower(process)
+            print(f"{name:>7} | SIGTERM → arrêt en {stop_seconds:.2f} s, code {codes[name]}")
+
+        checks = [('direct', *verify(direct_dir, pool, feed)), ('tampon', *verify(buffered_dir, pool, feed))]
+        restarted = start_follower(node.url, direct_dir, args)
+        time.sleep(args.restart)
+        codes['reprise'], _ = stop_follower(restarted)
+        checks.append(('reprise', *verify(direct_dir, pool, feed)))
+
+    for name, result, errors in checks:
+        if codes[name] != 0:
+            errors.append(f"code de sortie {codes[name]}")
+        if name == 'tampon' and buffered_before:
+            errors.append(f"{buffered_before} swaps écrits avant SIGTERM malgré --flush-interval")
+        if not result['swaps']:
+            errors.append("aucun swap écrit")
+        result.update({'scenario': name, 'errors': errors})
+        results.append(result)
+        freshness = ", ".join(f"{k} {v:.1f} s" for k, v in result['freshness_mean_s'].items() if v is not None)
+        print(f"{name:>7} | {result['blocks']:>4} blocs | {result['swaps']:>5} swaps | {result['rounds']:>3} rounds "
+              f"| fraîcheur moyenne : {freshness or '-'} | {'OK' if not errors else 'ÉCARTS'}")
+        for error in errors:
+            print(f"        |   {error}")
+        if errors:
+            failures.append(name)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if failures:
+        print(f"ERREUR: scénario(s) en échec : {', '.join(failures)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
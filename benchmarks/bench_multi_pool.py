@@ -0,0 +1,151 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Benchmark de l'extraction multi-pool (Uniswap_process_logs.py --pools)
+contre un nœud simulé qui sert plusieurs pools.
+
+Pour chaque nombre de pools, un registre temporaire décrit les pools
+simulés (la moitié cotés sans inversion), puis les mêmes blocs sont extraits :
+  - separate : une exécution par pool, comme avant le registre (chacune
+               avec sa connexion, ses requêtes eth_getLogs et ses timestamps
+               de blocs) ;
+  - single   : une seule exécution pour tous les pools (eth_getLogs filtré
+               sur toutes les adresses, timestamps de blocs communs).
+Les appels RPC sont comptés par méthode. Le coût de single doit suivre le
+nombre de logs et non le nombre de pools ; les fichiers de chaque pool
+doivent être identiques à l'octet près dans les deux modes.
+
+    python3 benchmarks/bench_multi_pool.py --pools 1 4 8 --swaps 20000
+"""
+
+import argparse
+import contextlib
+import filecmp
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.normpath(os.path.join(HERE, os.pardir, 'scripts')))
+sys.path.insert(0, HERE)
+import Uniswap_process_logs as uniswap  # noqa: E402
+from mock_node import MockNode, MockPool  # noqa: E402
+
+START_BLOCK = 18_000_000
+SWAPS_PER_BLOCK = 3
+
+
+def write_registry(path, n_pools):
+    """
+    Registre de n_pools pools simulés (données sous <répertoire du registre>/data).
+    Retourne les noms et adresses des pools.
+    """
+    pools = {}
+    for i in range(n_pools):
+        pools[f"pool_{i}"] = {
+            "address": f"0x{0xb0000 + i:040x}", "token0": "USDC", "token1": "WETH",
+            "decimals0": 6, "decimals1": 18, "invert": i % 2 == 0, "feed": "feed",
+        }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"data_dir": "data", "pools": pools,
+                   "feeds": {"feed": {"address": "0x5f4ec3df9cbd43714fe2740f5e3616155c5b8419"}}}, f, indent=2)
+    return [(name, entry["address"]) for name, entry in pools.items()]
+
+
+def extract(registry_path, pool_names, last_block, args):
+    """
+    Une exécution de main() pour pool_names ; retourne (secondes, lignes écrites).
+    """
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows = uniswap.main(
+            pools=pool_names, registry_path=registry_path, from_block=START_BLOCK, to_block=last_block,
+            block_index_path=None, use_slots=args.slots, manifest_path=None,
+            log_chunk_size=args.log_chunk_size, bar_intervals=args.bars,
+        )
+    return time.perf_counter() - start, rows
+
+
+def run(n_pools, args):
+    """
+    Mesures des deux modes pour n_pools pools.
+    """
+    last_block = START_BLOCK + (args.swaps - 1) // SWAPS_PER_BLOCK
+    result = {'pools': n_pools, 'swaps_per_pool': args.swaps}
+    with tempfile.TemporaryDirectory() as tmp:
+        registries = {}
+        for mode in ('separate', 'single'):
+            os.makedirs(os.path.join(tmp, mode, 'data'))
+            registries[mode] = os.path.join(tmp, mode, 'registry.json')
+            pools = write_registry(registries[mode], n_pools)
+        names = [name for name, _ in pools]
+        mock_pools = [MockPool.synthetic(args.swaps, START_BLOCK, SWAPS_PER_BLOCK, seed=i, address=address)
+                      for i, (_, address) in enumerate(pools)]
+
+        with MockNode(pools=mock_pools, latency=args.latency) as node:
+            os.environ['RPC'] = node.url
+            for mode, runs in (('separate', [[name] for name in names]), ('single', [names])):
+                node.calls.clear()
+                requests_before = node.http_requests
+                seconds, rows = 0.0, 0
+                for pool_names in runs:
+                    run_seconds, run_rows = extract(registries[mode], pool_names, last_block, args)
+                    seconds += run_seconds
+                    rows += run_rows
+                result[mode] = {
+                    'seconds': round(seconds, 3),
+                    'rows': rows,
+                    'http_requests': node.http_requests - requests_before,
+                    'eth_getLogs': node.calls['eth_getLogs'],
+                    'eth_getBlockByNumber': node.calls['eth_getBlockByNumber'],
+                    'rpc_calls': sum(node.calls.values()),
+                }
+
+        separate_dir, single_dir = (os.path.join(tmp, mode, 'data') for mode in ('separate', 'single'))
+        outputs = sorted(os.listdir(single_dir))
+        result['identical'] = bool(outputs) and outputs == sorted(os.listdir(separate_dir)) and all(
+            filecmp.cmp(os.path.join(separate_dir, name), os.path.join(single_dir, name), shallow=False)
+            for name in outputs
+        )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extraction de plusieurs pools : une passe par pool ou une seule passe.")
+    parser.add_argument("--pools", type=int, nargs='+', default=[1, 2, 4, 8], help="Nombres de pools mesurés (défaut: 1 2 4 8).")
+    parser.add_argument("--swaps", type=int, default=20_000, help="Events Swap par pool (défaut: 20000).")
+    parser.add_argument("--latency", type=float, default=0.002, help="Latence du nœud simulé, en secondes (défaut: 0.002).")
+    parser.add_argument("--log-chunk-size", type=int, default=2_000, help="Blocs par requête eth_getLogs (défaut: 2000).")
+    parser.add_argument("--bars", nargs='*', default=["1m", "1h"], help="Intervalles des barres écrites (défaut: 1m 1h).")
+    parser.add_argument("--slots", action="store_true",
+                        help="Déduire les timestamps post-Merge des slots (défaut: un eth_getBlockByNumber par bloc).")
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats.")
+    args = parser.parse_args()
+
+    results, mismatches = [], 0
+    for n_pools in args.pools:
+        result = run(n_pools, args)
+        results.append(result)
+        for mode in ('separate', 'single'):
+            m = result[mode]
+            print(f"{n_pools:>2} pools | {mode:<8} | {m['seconds']:6.2f} s | {m['rows']:>7} lignes "
+                  f"| {m['http_requests']:>5} requêtes HTTP | eth_getLogs {m['eth_getLogs']:>4} "
+                  f"| eth_getBlockByNumber {m['eth_getBlockByNumber']:>6}")
+        print(f"{n_pools:>2} pools | gain {result['separate']['seconds'] / max(result['single']['seconds'], 1e-9):4.1f}x "
+              f"| identiques : {'oui' if result['identical'] else 'NON'}")
+        mismatches += not result['identical']
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if mismatches:
+        print(f"ERREUR: {mismatches} comparaison(s) en échec", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
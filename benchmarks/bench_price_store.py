@@ -0,0 +1,138 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Benchmark du magasin binaire des prix (scripts/price_store.py).
+
+Pour chaque taille d'entrée, un CSV de swaps synthétiques est converti en
+magasin (build_store), puis interrogé :
+  - csv_load  : chargement complet du CSV (pandas), nécessaire aujourd'hui
+                pour répondre à une seule question « prix à la date t » ;
+  - open      : ouverture du magasin (meta.json, index clairsemé, memmap) ;
+  - price_at  : dernier prix à ou avant une date tirée au hasard ;
+  - range     : vues des lignes d'une fenêtre d'une heure ;
+  - latest    : dernière ligne.
+Les latences de price_at et range doivent rester de l'ordre de la
+microseconde quand la taille d'entrée augmente. Les réponses sont comparées
+à numpy.searchsorted sur les colonnes chargées en mémoire.
+
+    python3 benchmarks/bench_price_store.py --swaps 1000000 5000000 --queries 20000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.normpath(os.path.join(HERE, os.pardir, 'scripts')))
+from price_store import PriceStore, build_store  # noqa: E402
+from synthetic_logs import synthetic_swaps  # noqa: E402
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def latencies_us(function, arguments):
+    """
+    Durées d'appel de function(*args) pour chaque args, en microsecondes.
+    """
+    timings = []
+    for args in arguments:
+        start = time.perf_counter()
+        function(*args)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+def run(n_swaps, n_queries, seed):
+    """
+    Mesures d'une taille d'entrée.
+    """
+    swaps = synthetic_swaps(n_swaps, seed=seed)
+    seconds = swaps['timestamp'].dt.tz_convert(None).to_numpy(dtype='datetime64[s]').astype(np.int64)
+    prices = swaps['price_usdc_per_eth'].to_numpy()
+    rng = np.random.default_rng(seed)
+    queries = rng.integers(seconds[0] - 60, seconds[-1] + 60, n_queries)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, root = os.path.join(tmp, 'uniswap_eth_usd.csv'), os.path.join(tmp, 'store')
+        swaps.to_csv(csv_path, index=False)
+
+        start = time.perf_counter()
+        build_store(csv_path, root, 'uniswap')
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loaded = pd.read_csv(csv_path, float_precision='round_trip')
+        pd.to_datetime(loaded['timestamp'], utc=True, format='ISO8601')
+        csv_load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store = PriceStore(root)
+        open_ms = (time.perf_counter() - start) * 1e3
+
+        price_at = latencies_us(store.price_at, ((int(q),) for q in queries))
+        windows = [(int(q), int(q) + 3_600) for q in queries]
+        range_us = latencies_us(store.range, windows)
+        latest_us = latencies_us(store.latest, [()] * n_queries)
+
+        positions = np.searchsorted(seconds, queries, side='right') - 1
+        expected = [None if p < 0 else float(prices[p]) for p in positions]
+        matches = [store.price_at(int(q)) for q in queries] == expected
+        counts = np.searchsorted(seconds, [w[1] for w in windows], 'right') - np.searchsorted(seconds, queries, 'left')
+        matches = matches and [len(store.range(*w)['timestamp']) for w in windows] == counts.tolist()
+
+        result = {
+            'swaps': n_swaps,
+            'build_seconds': round(build_seconds, 3),
+            'csv_mb': round(os.path.getsize(csv_path) / 2**20, 1),
+            'store_mb': round(directory_size(root) / 2**20, 1),
+            'csv_load_seconds': round(csv_load_seconds, 3),
+            'open_ms': round(open_ms, 3),
+            'price_at_us': round(statistics.median(price_at), 2),
+            'price_at_p99_us': round(float(np.percentile(price_at, 99)), 2),
+            'range_1h_us': round(statistics.median(range_us), 2),
+            'latest_us': round(statistics.median(latest_us), 2),
+            'matches_searchsorted': matches,
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du magasin binaire des prix (mmap).")
+    parser.add_argument("--swaps", type=int, nargs='+', default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--queries", type=int, default=20_000, help="Requêtes par mesure (défaut: 20000).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats.")
+    args = parser.parse_args()
+
+    results, mismatches = [], 0
+    for n_swaps in args.swaps:
+        result = run(n_swaps, args.queries, args.seed)
+        results.append(result)
+        print(f"{n_swaps:>9} swaps | construction {result['build_seconds']:6.2f} s "
+              f"| CSV {result['csv_mb']:7.1f} Mo → magasin {result['store_mb']:6.1f} Mo "
+              f"| chargement CSV {result['csv_load_seconds']:6.2f} s | ouverture {result['open_ms']:6.2f} ms "
+              f"| price_at {result['price_at_us']:5.1f} µs (p99 {result['price_at_p99_us']:5.1f}) "
+              f"| range 1h {result['range_1h_us']:5.1f} µs | latest {result['latest_us']:5.1f} µs "
+              f"| identiques : {'oui' if result['matches_searchsorted'] else 'NON'}")
+        mismatches += not result['matches_searchsorted']
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if mismatches:
+        print(f"ERREUR: {mismatches} comparaison(s) en échec", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
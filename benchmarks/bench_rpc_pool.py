@@ -0,0 +1,208 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Vérification et benchmark du pool d'endpoints RPC (scripts/rpc_client.py)
+contre des nœuds simulés qui injectent des erreurs.
+
+  - limite     : un nœud limité à --rate-limit requêtes/s ; sans limite côté
+                 client des requêtes reçoivent des 429, avec rps=90 % de la
+                 limite aucune n'échoue ;
+  - bascule    : trois endpoints (sain, 30 % de 503, injoignable), pondérés ;
+                 toutes les requêtes doivent aboutir ;
+  - uniswap    : prix décodés par eth_getLogs à travers le pool dégradé,
+                 identiques à ceux d'un nœud sain ;
+  - chainlink  : extraction complète chainlink_dicho.py à travers le pool
+                 dégradé, CSV identique à celui d'un nœud sain.
+
+    python3 benchmarks/bench_rpc_pool.py --requests 2000 --rate-limit 100
+"""
+
+import argparse
+import filecmp
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.normpath(os.path.join(HERE, os.pardir, 'scripts'))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, HERE)
+from metrics import METRICS  # noqa: E402
+from mock_node import MockFeed, MockNode, MockPool  # noqa: E402
+from rpc_client import PooledRpcClient, RpcError  # noqa: E402
+
+START_BLOCK = 18_000_000
+SWAPS_PER_BLOCK = 3
+
+
+def unreachable_url() -> str:
+    """
+    URL d'un port local sans serveur (connexion refusée).
+    """
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def run_load(client, n_requests, concurrency, batch_size=10):
+    """
+    n_requests requêtes batch eth_getBlockByNumber depuis `concurrency` threads.
+    Retourne les mesures (durée, requêtes/s, requêtes en échec).
+    """
+    def one(i):
+        first = START_BLOCK + i * batch_size
+        try:
+            replies = client.batch([("eth_getBlockByNumber", [hex(bn), False]) for bn in range(first, first + batch_size)])
+        except RpcError:
+            return False
+        return all(reply and reply.get("result") for reply in replies)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        ok = sum(pool.map(one, range(n_requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        'requests': n_requests,
+        'failed': n_requests - ok,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(n_requests / elapsed, 1),
+    }
+
+
+def scenario_rate_limit(args):
+    results = []
+    rps = 0.9 * args.rate_limit
+    for label, fragment in (('sans limite client', ''), (f'rps={rps:g}', f'#rps={rps:g}')):
+        with MockNode(latency=args.latency, rate_limit=args.rate_limit) as node:
+            client = PooledRpcClient(node.url + fragment, retries=0)
+            result = run_load(client, args.requests, args.concurrency)
+            result.update({'scenario': 'limite', 'client': label, 'http_statuses': dict(node.http_statuses)})
+        results.append(result)
+        print(f"limite    | {label:>18} | {result['requests_per_second']:8.1f} req/s | {result['failed']:>5} en échec "
+              f"| réponses {result['http_statuses']}")
+    return results, results[-1]['failed'] == 0
+
+
+def scenario_failover(args):
+    with MockNode(latency=args.latency, rate_limit=args.rate_limit) as healthy, \
+            MockNode(latency=args.latency, rate_limit=args.rate_limit, error_rate=0.3, seed=1) as flaky:
+        rps = f"#rps={0.9 * args.rate_limit:g}"
+        spec = f"{healthy.url}{rps}&weight=2,{flaky.url}{rps},{unreachable_url()}{rps}"
+        METRICS.reset()
+        client = PooledRpcClient(spec)
+        result = run_load(client, args.requests, args.concurrency)
+        endpoints = {e.name: {} for e in client.pool.endpoints}
+        for (name, labels), value in METRICS.counters.items():
+            if name == 'rpc_endpoint_requests_total':
+                labels = dict(labels)
+                endpoints[labels['endpoint']][labels['status']] = value
+        result.update({'scenario': 'bascule', 'endpoints': endpoints,
+                       'retries': sum(v for (n, _), v in METRICS.counters.items() if n == 'rpc_retries_total')})
+    print(f"bascule   | {result['requests']:>6} requêtes | {result['requests_per_second']:8.1f} req/s "
+          f"| {result['failed']:>5} en échec | {result['retries']} nouvelles tentatives")
+    for name, statuses in endpoints.items():
+        print(f"          |   {name:>20} : {statuses}")
+    return [result], result['failed'] == 0
+
+
+def uniswap_prices(spec, n_swaps):
+    import pandas as pd
+    import Uniswap_process_logs as uniswap
+    client = PooledRpcClient(spec, pool_size=4)
+    last_block = START_BLOCK + (n_swaps - 1) // SWAPS_PER_BLOCK
+    frames = [prices for prices, _, _ in uniswap.iter_rpc_uniswap_prices(
+        client, START_BLOCK, last_block, block_index=None, log_chunk_size=500
+    )]
+    return pd.concat(frames, ignore_index=True)
+
+
+def scenario_uniswap(args):
+    node_args = dict(latency=args.latency, rate_limit=args.rate_limit)
+    with MockNode(pool=MockPool.synthetic(args.swaps), **node_args) as clean:
+        reference = uniswap_prices(clean.url, args.swaps)
+    with MockNode(pool=MockPool.synthetic(args.swaps), **node_args) as healthy, \
+            MockNode(pool=MockPool.synthetic(args.swaps), error_rate=0.3, seed=2, **node_args) as flaky:
+        rps = f"#rps={0.9 * args.rate_limit:g}"
+        start = time.perf_counter()
+        prices = uniswap_prices(f"{healthy.url}{rps},{flaky.url}{rps},{unreachable_url()}", args.swaps)
+        elapsed = time.perf_counter() - start
+    identical = prices.equals(reference)
+    print(f"uniswap   | {len(prices):>6} prix ({len(reference)} attendus) | {elapsed:6.2f} s "
+          f"| identiques : {'oui' if identical else 'NON'}")
+    return [{'scenario': 'uniswap', 'rows': len(prices), 'expected': len(reference),
+             'seconds': round(elapsed, 3), 'identical': identical}], identical
+
+
+def run_chainlink(spec, debut, workdir):
+    os.makedirs(os.path.join(workdir, 'data'), exist_ok=True)
+    subprocess.run(
+        [sys.executable, os.path.join(SCRIPTS_DIR, 'chainlink_dicho.py'), '--debut', str(debut),
+         '--phases-file', os.path.join(workdir, 'phases.json')],
+        cwd=workdir, env=dict(os.environ, RPC=spec), check=True, capture_output=True, text=True
+    )
+    return os.path.join(workdir, 'data', 'chainlink_eth_usd_last.csv')
+
+
+def scenario_chainlink(args):
+    feed = MockFeed.synthetic(tuple(args.rounds_per_phase))
+    debut = feed.phases[1][0][1]
+    node_args = dict(feed=feed, latency=args.latency, rate_limit=args.rate_limit)
+    with tempfile.TemporaryDirectory() as tmp:
+        with MockNode(**node_args) as clean:
+            reference = run_chainlink(clean.url, debut, os.path.join(tmp, 'clean'))
+        with MockNode(**node_args) as healthy, MockNode(error_rate=0.3, seed=3, **node_args) as flaky:
+            rps = f"#rps={0.9 * args.rate_limit:g}"
+            start = time.perf_counter()
+            output = run_chainlink(f"{healthy.url}{rps},{flaky.url}{rps},{unreachable_url()}", debut,
+                                   os.path.join(tmp, 'pool'))
+            elapsed = time.perf_counter() - start
+        identical = filecmp.cmp(reference, output, shallow=False)
+        rows = sum(1 for _ in open(output, encoding='utf-8')) - 1
+    print(f"chainlink | {rows:>6} rounds | {elapsed:6.2f} s | identiques : {'oui' if identical else 'NON'}")
+    return [{'scenario': 'chainlink', 'rows': rows, 'seconds': round(elapsed, 3), 'identical': identical}], identical
+
+
+SCENARIOS = {
+    'limite': scenario_rate_limit,
+    'bascule': scenario_failover,
+    'uniswap': scenario_uniswap,
+    'chainlink': scenario_chainlink,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pool d'endpoints RPC contre des nœuds simulés qui injectent des erreurs.")
+    parser.add_argument("--scenarios", nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=1_000, help="Requêtes batch des scénarios limite et bascule (défaut: 1000).")
+    parser.add_argument("--concurrency", type=int, default=8, help="Threads clients (défaut: 8).")
+    parser.add_argument("--rate-limit", type=float, default=100.0, help="Requêtes/s acceptées par chaque nœud (défaut: 100).")
+    parser.add_argument("--latency", type=float, default=0.002, help="Latence des nœuds simulés, en secondes (défaut: 0.002).")
+    parser.add_argument("--swaps", type=int, default=30_000, help="Events Swap du scénario uniswap (défaut: 30000).")
+    parser.add_argument("--rounds-per-phase", type=int, nargs='+', default=[2_000, 3_000])
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats.")
+    args = parser.parse_args()
+
+    results, failures = [], []
+    for name in args.scenarios:
+        scenario_results, ok = SCENARIOS[name](args)
+        results.extend(scenario_results)
+        if not ok:
+            failures.append(name)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if failures:
+        print(f"ERREUR: scénario(s) en échec : {', '.join(failures)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
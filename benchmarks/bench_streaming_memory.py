@@ -0,0 +1,104 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Benchmark mémoire du traitement Uniswap : mode en flux vs chargement complet.
+
+Pour chaque taille de fichier, un processus enfant traite un fichier cryo
+synthétique contre un nœud JSON-RPC simulé et rapporte son pic de mémoire
+résidente (ru_maxrss). En mode flux, le pic doit rester stable quand la
+taille d'entrée augmente ; en chargement complet, il croît avec elle.
+
+    python3 benchmarks/bench_streaming_memory.py --rows 50000 200000 800000
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.normpath(os.path.join(HERE, os.pardir, 'scripts'))
+
+
+def run_child(csv_path, mode, chunk_size):
+    """
+    Traite `csv_path` dans le processus courant et retourne les mesures.
+    """
+    sys.path.insert(0, SCRIPTS_DIR)
+    from mock_node import MockNode
+
+    with MockNode() as node, tempfile.TemporaryDirectory() as tmp:
+        import Uniswap_process_logs as uniswap
+        from rpc_client import JsonRpcClient
+
+        rpc = JsonRpcClient(node.url)
+        output_path = os.path.join(tmp, 'out.csv')
+        rows = 0
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            if mode == 'stream':
+                for prices, _, _ in uniswap.iter_uniswap_prices(csv_path, rpc, chunk_size=chunk_size):
+                    prices.to_csv(output_path, mode='a', header=rows == 0, index=False)
+                    rows += len(prices)
+            else:
+                prices = uniswap.process_uniswap_logs(csv_path, rpc)
+                prices.to_csv(output_path, index=False)
+                rows = len(prices)
+        elapsed = time.perf_counter() - start
+
+    return {
+        'mode': mode,
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows / elapsed) if elapsed else None,
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pic mémoire du traitement Uniswap selon la taille d'entrée.")
+    parser.add_argument("--rows", type=int, nargs='+', default=[25_000, 100_000, 400_000],
+                        help="Tailles de fichiers à tester (nombre de swaps).")
+    parser.add_argument("--chunk-size", type=int, default=20_000, help="Taille des morceaux en mode flux (défaut: 20000).")
+    parser.add_argument("--modes", nargs='+', choices=['stream', 'full'], default=['stream', 'full'])
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats.")
+    parser.add_argument("--child", nargs=2, metavar=('CSV', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child[0], args.child[1], args.chunk_size)))
+        return
+
+    sys.path.insert(0, HERE)
+    from synthetic_logs import write_cryo_csv
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.rows:
+            csv_path = os.path.join(tmp, f'logs_{n_rows}.csv')
+            write_cryo_csv(csv_path, n_rows)
+            size_mb = os.path.getsize(csv_path) / 1024**2
+            for mode in args.modes:
+                out = subprocess.run(
+                    [sys.executable, __file__, '--child', csv_path, mode, '--chunk-size', str(args.chunk_size)],
+                    check=True, capture_output=True, text=True
+                )
+                result = json.loads(out.stdout.strip().splitlines()[-1])
+                result.update({'input_rows': n_rows, 'input_mb': round(size_mb, 1), 'chunk_size': args.chunk_size})
+                results.append(result)
+                print(f"{mode:>6} | {n_rows:>9} lignes ({size_mb:7.1f} Mo) | pic RSS {result['peak_rss_mb']:8.1f} Mo "
+                      f"| {result['rows_per_second']} lignes/s")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
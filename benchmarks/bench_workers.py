@@ -0,0 +1,120 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Benchmark du décodage parallèle (Uniswap_process_logs.py --workers) contre
+un nœud simulé.
+
+Les mêmes blocs sont extraits en série (--workers 1) puis avec chaque nombre
+de processus demandé. Deux pools simulés (l'un coté sans inversion) ont leurs
+swaps répartis en deux plages séparées par des blocs sans aucun swap : une
+partie des tranches eth_getLogs sont vides. Les fichiers écrits (prix,
+barres, manifestes) doivent être identiques à l'octet près à ceux de
+l'exécution en série.
+
+    python3 benchmarks/bench_workers.py --workers 2 4 --swaps 50000
+"""
+
+import argparse
+import contextlib
+import filecmp
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.normpath(os.path.join(HERE, os.pardir, 'scripts')))
+sys.path.insert(0, HERE)
+import Uniswap_process_logs as uniswap  # noqa: E402
+from bench_multi_pool import write_registry  # noqa: E402
+from mock_node import MockNode, MockPool  # noqa: E402
+from synthetic_logs import iter_swap_rows  # noqa: E402
+
+START_BLOCK = 18_000_000
+SWAPS_PER_BLOCK = 3
+GAP_BLOCKS = 20_000  # Blocs sans swap entre les deux plages
+
+
+def mock_pools(pools, n_swaps):
+    """
+    Pools simulés : la moitié des swaps au début, l'autre après GAP_BLOCKS blocs vides.
+    Retourne les pools et le dernier bloc.
+    """
+    half = n_swaps // 2
+    second_start = START_BLOCK + half // SWAPS_PER_BLOCK + GAP_BLOCKS
+    result = []
+    for i, (_, address) in enumerate(pools):
+        rows = list(iter_swap_rows(half, START_BLOCK, SWAPS_PER_BLOCK, seed=2 * i, address=address))
+        rows += iter_swap_rows(n_swaps - half, second_start, SWAPS_PER_BLOCK, seed=2 * i + 1, address=address)
+        result.append(MockPool(rows, address))
+    return result, second_start + (n_swaps - half - 1) // SWAPS_PER_BLOCK
+
+
+def extract(registry_path, pool_names, last_block, workers, args):
+    """
+    Une exécution de main() ; retourne (secondes, lignes écrites).
+    """
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows = uniswap.main(
+            pools=pool_names, registry_path=registry_path, from_block=START_BLOCK, to_block=last_block,
+            block_index_path=None, use_slots=args.slots, workers=workers,
+            log_chunk_size=args.log_chunk_size, bar_intervals=args.bars,
+        )
+    return time.perf_counter() - start, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Décodage en série ou réparti entre plusieurs processus.")
+    parser.add_argument("--workers", type=int, nargs='+', default=[2, 4], help="Nombres de processus mesurés (défaut: 2 4).")
+    parser.add_argument("--swaps", type=int, default=50_000, help="Events Swap par pool (défaut: 50000).")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence du nœud simulé, en secondes (défaut: 0).")
+    parser.add_argument("--log-chunk-size", type=int, default=1_000, help="Blocs par requête eth_getLogs (défaut: 1000).")
+    parser.add_argument("--bars", nargs='*', default=["1m", "1h"], help="Intervalles des barres écrites (défaut: 1m 1h).")
+    parser.add_argument("--slots", action="store_true",
+                        help="Déduire les timestamps post-Merge des slots (défaut: un eth_getBlockByNumber par bloc).")
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats.")
+    args = parser.parse_args()
+
+    results, mismatches = [], 0
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = {}
+        for workers in [1] + args.workers:
+            os.makedirs(os.path.join(tmp, str(workers), 'data'))
+            runs[workers] = os.path.join(tmp, str(workers), 'registry.json')
+            pools = write_registry(runs[workers], 2)
+        names = [name for name, _ in pools]
+        nodes_pools, last_block = mock_pools(pools, args.swaps)
+
+        with MockNode(pools=nodes_pools, latency=args.latency) as node:
+            os.environ['RPC'] = node.url
+            for workers, registry_path in runs.items():
+                seconds, rows = extract(registry_path, names, last_block, workers, args)
+                results.append({'workers': workers, 'seconds': round(seconds, 3), 'rows': rows})
+
+        serial_dir = os.path.join(tmp, '1', 'data')
+        outputs = sorted(os.listdir(serial_dir))
+        for result in results:
+            run_dir = os.path.join(tmp, str(result['workers']), 'data')
+            result['identical'] = bool(outputs) and outputs == sorted(os.listdir(run_dir)) and all(
+                filecmp.cmp(os.path.join(serial_dir, name), os.path.join(run_dir, name), shallow=False)
+                for name in outputs
+            )
+            print(f"{result['workers']:>2} processus | {result['seconds']:6.2f} s | {result['rows']:>7} lignes "
+                  f"| gain {results[0]['seconds'] / max(result['seconds'], 1e-9):4.1f}x "
+                  f"| identiques : {'oui' if result['identical'] else 'NON'}")
+            mismatches += not result['identical']
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if mismatches:
+        print(f"ERREUR: {mismatches} comparaison(s) en échec", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
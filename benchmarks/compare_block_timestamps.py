@@ -0,0 +1,187 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Vérification de la récupération des timestamps de blocs (scripts/block_timestamps.py)
+contre un nœud simulé dont certains blocs échouent dans les requêtes batch, et
+de leur résolution par slots sur une chaîne simulée où des slots sont manqués.
+
+Chaque scénario compare les timestamps obtenus aux timestamps de la chaîne
+simulée et compte les appels eth_getBlockByNumber reçus par le nœud :
+  - transitoire : des blocs échouent 1 à `retries` fois (erreur JSON-RPC ou
+                  réponse absente du batch) ; ils sont tous récupérés, chacun
+                  en (échecs + 1) appels ;
+  - permanent   : des blocs échouent toujours, d'autres une fois de plus que
+                  `retries` ; ils sont exactement ceux de `failed`, après
+                  retries + 1 appels chacun ;
+  - enrich      : enrich_log_chunk lève BlockTimestampError avec ces blocs,
+                  qu'ils soient demandés un par un ou par slots (bloc en bord de plage) ;
+  - slots       : resolve_block_timestamps sur des blocs épars, avec des slots
+                  manqués répartis dans la plage, à côté des ancres et aux bords
+                  de la plage, et des blocs pré-Merge (intervalles irréguliers)
+                  récupérés un par un. Tous les timestamps doivent être exacts,
+                  pour au plus blocs pré-Merge + 2 bords + log2(plage) en-têtes
+                  par slot manqué dans la plage.
+
+    python3 benchmarks/compare_block_timestamps.py --blocks 500
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import sys
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.normpath(os.path.join(HERE, os.pardir, 'scripts')))
+sys.path.insert(0, HERE)
+import Uniswap_process_logs as uniswap  # noqa: E402
+from block_timestamps import MERGE_BLOCK, BlockTimestampError, fetch_block_timestamps, resolve_block_timestamps  # noqa: E402
+from mock_node import MockChain, MockNode  # noqa: E402
+from rpc_client import JsonRpcClient  # noqa: E402
+
+START_BLOCK = 18_000_000
+RETRIES = 3
+
+
+def check(label, ok, **measures):
+    """
+    Affiche et retourne le résultat d'un scénario.
+    """
+    details = " | ".join(f"{key} {value}" for key, value in measures.items())
+    print(f"{label:<36} | {details} | {'OK' if ok else 'ÉCHEC'}")
+    return {'case': label, **measures, 'ok': ok}
+
+
+def fetch_scenario(label, chain, blocks, failures, mode, args):
+    """
+    fetch_block_timestamps contre un nœud où `failures` ({bloc: échecs, None : toujours}) échouent.
+    """
+    with MockNode(chain=chain, block_failures=failures, block_failure_mode=mode) as node:
+        client = JsonRpcClient(node.url)
+        with contextlib.redirect_stdout(io.StringIO()):
+            timestamps, failed = fetch_block_timestamps(client, blocks, batch_size=args.batch_size,
+                                                        retries=RETRIES, backoff=0.0)
+        calls = node.calls['eth_getBlockByNumber']
+
+    lost = sorted(bn for bn, n in failures.items() if n is None or n > RETRIES)
+    expected_calls = len(blocks) + sum(RETRIES if n is None else min(n, RETRIES) for n in failures.values())
+    wrong = sum(timestamps.get(bn) != chain.block_timestamp(bn) for bn in blocks if bn not in lost)
+    # Un bloc en échec ne doit pas non plus recevoir de timestamp
+    ok = failed == lost and not wrong and not any(bn in timestamps for bn in lost) and calls == expected_calls
+    return check(label, ok, failed=len(failed), expected_failed=len(lost), wrong_timestamps=wrong,
+                 calls=calls, expected_calls=expected_calls)
+
+
+def enrich_scenario(label, chain, blocks, failing, use_slots):
+    """
+    enrich_log_chunk doit lever BlockTimestampError avec exactement les blocs `failing`.
+    """
+    df = pd.DataFrame({
+        'block_number': blocks,
+        'transaction_hash': [f"0x{bn:064x}" for bn in blocks],
+        'log_index': 0,
+    })
+    raised = None
+    with MockNode(chain=chain, block_failures={bn: None for bn in failing}) as node:
+        rpc = JsonRpcClient(node.url)
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            try:
+                uniswap.enrich_log_chunk(df, rpc, use_slots=use_slots)
+            except BlockTimestampError as e:
+                raised = e.blocks
+    ok = raised == sorted(failing)
+    return check(label, ok, raised=raised is not None, blocks=raised, expected=sorted(failing))
+
+
+def resolve_scenario(label, chain, wanted, anchors, missed_slots):
+    """
+    resolve_block_timestamps : timestamps exacts et nombre d'en-têtes en O(log n) par slot manqué.
+    """
+    with MockNode(chain=chain) as node:
+        client = JsonRpcClient(node.url)
+        with contextlib.redirect_stdout(io.StringIO()):
+            timestamps, failed = resolve_block_timestamps(client, wanted, anchors=anchors, backoff=0.0)
+        calls = node.calls['eth_getBlockByNumber']
+
+    wrong = sum(timestamps.get(bn) != chain.block_timestamp(bn) for bn in wanted)
+    post_merge = [bn for bn in wanted if bn >= MERGE_BLOCK]
+    pre_merge = sum(bn < MERGE_BLOCK and bn not in anchors for bn in wanted)
+    # Un slot manqué avant le bloc g se situe entre g - 1 et g
+    gaps = sum(post_merge[0] < g <= post_merge[-1] for g in missed_slots)
+    max_calls = pre_merge + 2 + gaps * math.ceil(math.log2(max(post_merge[-1] - post_merge[0], 2)))
+    ok = not failed and not wrong and calls <= max_calls
+    return check(label, ok, blocks=len(wanted), gaps=gaps, wrong_timestamps=wrong, calls=calls, max_calls=max_calls)
+
+
+def slot_scenarios(rng, args):
+    """
+    Scénarios de resolve_block_timestamps sur une chaîne à slots manqués et preuve de travail irrégulière.
+    """
+    span = args.slot_range
+    wanted = sorted({START_BLOCK, START_BLOCK + span} | set(rng.sample(range(START_BLOCK, START_BLOCK + span), args.blocks)))
+    anchor_blocks = sorted(rng.sample(wanted[1:-1], 8))
+    near_merge = sorted(set(rng.sample(range(MERGE_BLOCK - 2_000, MERGE_BLOCK), 200))
+                        | set(rng.sample(range(MERGE_BLOCK, MERGE_BLOCK + span), args.blocks)))
+
+    # Slots manqués : épars dans les deux plages, autour des ancres et aux bords des plages
+    missed = {g: rng.randint(1, 3) for g in rng.sample(range(START_BLOCK + 1, START_BLOCK + span), 16)}
+    missed.update({g: rng.randint(1, 3) for g in rng.sample(range(MERGE_BLOCK + 1, MERGE_BLOCK + span), 8)})
+    for bn in anchor_blocks[:4]:
+        missed[bn] = missed[bn + 1] = 1
+    for bn in (START_BLOCK, START_BLOCK + 1, START_BLOCK + span, near_merge[-1]):
+        missed[bn] = 2
+    missed[MERGE_BLOCK + 1] = 1
+
+    plain = MockChain(head_block=START_BLOCK + 2 * span)
+    chain = MockChain(head_block=START_BLOCK + 2 * span, missed_slots=missed, irregular_pow=True)
+    anchors = {bn: chain.block_timestamp(bn) for bn in anchor_blocks}
+    return [
+        resolve_scenario("slots / aucun slot manqué", plain, wanted, {}, {}),
+        resolve_scenario("slots / slots manqués", chain, wanted, {}, missed),
+        resolve_scenario("slots / slots manqués, ancres", chain, wanted, anchors, missed),
+        resolve_scenario("slots / pré-Merge et Merge", chain, near_merge, {}, missed),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Timestamps de blocs : nouvelles tentatives et blocs en échec.")
+    parser.add_argument("--blocks", type=int, default=500, help="Blocs demandés par scénario (défaut: 500).")
+    parser.add_argument("--slot-range", type=int, default=50_000,
+                        help="Plage de blocs des scénarios de slots (défaut: 50000).")
+    parser.add_argument("--batch-size", type=int, default=50, help="Appels par requête batch (défaut: 50).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    chain = MockChain()
+    blocks = list(range(START_BLOCK, START_BLOCK + args.blocks))
+    picked = rng.sample(blocks, 24)
+    transient = {bn: 1 + i % RETRIES for i, bn in enumerate(picked[:12])}
+    permanent = {**{bn: None for bn in picked[12:18]}, **{bn: RETRIES + 1 for bn in picked[18:]}}
+
+    results = []
+    for mode in ('error', 'drop'):
+        results.append(fetch_scenario(f"transitoire / {mode}", chain, blocks, transient, mode, args))
+        results.append(fetch_scenario(f"permanent / {mode}", chain, blocks, {**transient, **permanent}, mode, args))
+    results.append(enrich_scenario("enrich / bloc par bloc", chain, blocks, picked[12:15], use_slots=False))
+    results.append(enrich_scenario("enrich / slots, bord de plage", chain, blocks, [blocks[-1]], use_slots=True))
+    results.extend(slot_scenarios(rng, args))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    failures = sum(not result['ok'] for result in results)
+    if failures:
+        print(f"ERREUR: {failures} comparaison(s) en échec", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
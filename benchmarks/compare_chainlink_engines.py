@@ -0,0 +1,137 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Vérification des deux moteurs de chainlink_dicho.py contre un nœud simulé.
+
+Le même flux Chainlink synthétique (intervalles irréguliers, plusieurs
+phases) est extrait avec --engine rounds (getRoundData) puis --engine logs
+(événements AnswerUpdated) ; les CSV produits doivent être identiques à
+l'octet près. Le nombre d'appels RPC de chaque moteur est rapporté.
+
+Le flux est ensuite extrait deux fois de suite en sortie Parquet seule
+(--output-format parquet --resume) : la seconde exécution reprend du jeu
+Parquet, qui doit contenir chaque round une seule fois.
+
+    python3 benchmarks/compare_chainlink_engines.py --rounds-per-phase 3000 20000 4000 --max-log-range 20000
+"""
+
+import argparse
+import filecmp
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.normpath(os.path.join(HERE, os.pardir, 'scripts', 'chainlink_dicho.py'))
+
+sys.path.insert(0, os.path.dirname(SCRIPT))
+sys.path.insert(0, HERE)
+from mock_node import MockFeed, MockNode  # noqa: E402
+
+
+def irregular_feed(rounds_per_phase, start_ts=1_600_000_000, heartbeat=3_600, seed=0):
+    """
+    Flux synthétique : un round par heartbeat, et un sur six plus tôt (écart de prix).
+    """
+    rng = random.Random(seed)
+    phases, ts = {}, start_ts
+    for phase, n_rounds in enumerate(rounds_per_phase, start=1):
+        rounds = []
+        for _ in range(n_rounds):
+            ts += heartbeat if rng.random() < 5 / 6 else rng.randint(1, heartbeat)
+            rounds.append((2_000 * 10**8 + rng.randint(-10**10, 10**10), ts))
+        phases[phase] = rounds
+    return MockFeed(phases)
+
+
+def run_engine(node, engine, debut, workdir):
+    """
+    Lance chainlink_dicho.py avec un moteur ; retourne (chemin du CSV, mesures).
+    """
+    os.makedirs(os.path.join(workdir, 'data'), exist_ok=True)
+    node.calls.clear()
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, SCRIPT, '--debut', str(debut), '--engine', engine],
+        cwd=workdir, env=dict(os.environ, RPC=node.url), check=True, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+    return os.path.join(workdir, 'data', 'chainlink_eth_usd_last.csv'), {
+        'engine': engine,
+        'seconds': round(elapsed, 3),
+        'rpc_calls': dict(node.calls),
+    }
+
+
+def parquet_resume(node, debut, expected_rows, workdir):
+    """
+    Deux exécutions successives en sortie Parquet seule ; retourne les mesures et le verdict.
+    """
+    # Import différé : pyarrow n'est requis que pour ce scénario
+    from columnar_store import read_range
+
+    os.makedirs(os.path.join(workdir, 'data'), exist_ok=True)
+    for _ in range(2):
+        subprocess.run(
+            [sys.executable, SCRIPT, '--debut', str(debut), '--resume', '--output-format', 'parquet'],
+            cwd=workdir, env=dict(os.environ, RPC=node.url), check=True, capture_output=True, text=True
+        )
+    ids = read_range(os.path.join(workdir, 'data', 'parquet', 'chainlink'), 'chainlink',
+                     columns=['global_round_id'])['global_round_id']
+    ok = len(ids) == ids.nunique() == expected_rows
+    print(f"parquet x2 | début {debut} | {len(ids):>7} lignes | {ids.nunique():>7} rounds distincts "
+          f"(attendus {expected_rows}) | {'OK' if ok else 'ÉCHEC'}")
+    return {'engine': 'parquet x2', 'debut': debut, 'rows': len(ids), 'distinct_rounds': int(ids.nunique()),
+            'expected_rows': expected_rows, 'ok': ok}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare les moteurs logs et rounds de chainlink_dicho.py.")
+    parser.add_argument("--rounds-per-phase", type=int, nargs='+', default=[3_000, 20_000, 4_000])
+    parser.add_argument("--start-offsets", type=float, nargs='+', default=[0.0, 0.5, 0.99],
+                        help="Débuts testés, en fraction de la durée totale du flux.")
+    parser.add_argument("--max-log-range", type=int, default=None, help="Limite de plage eth_getLogs du nœud simulé.")
+    parser.add_argument("--max-logs", type=int, default=10_000, help="Limite de résultats eth_getLogs (défaut: 10000).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats.")
+    args = parser.parse_args()
+
+    feed = irregular_feed(args.rounds_per_phase, seed=args.seed)
+    first_ts = feed.phases[1][0][1]
+    last_ts = feed.phases[max(feed.phases)][-1][1]
+
+    results, mismatches = [], 0
+    with MockNode(feed=feed, max_log_range=args.max_log_range, max_logs=args.max_logs) as node:
+        for offset in args.start_offsets:
+            debut = int(first_ts + offset * (last_ts - first_ts))
+            with tempfile.TemporaryDirectory() as tmp:
+                outputs = {}
+                for engine in ('rounds', 'logs'):
+                    csv_path, result = run_engine(node, engine, debut, os.path.join(tmp, engine))
+                    outputs[engine] = csv_path
+                    result.update({'debut': debut, 'rows': sum(1 for _ in open(csv_path, encoding='utf-8')) - 1})
+                    results.append(result)
+                    print(f"{engine:>6} | début {debut} | {result['rows']:>7} rounds | {result['seconds']:7.2f} s "
+                          f"| {result['rpc_calls']}")
+                identical = filecmp.cmp(outputs['rounds'], outputs['logs'], shallow=False)
+                print(f"CSV identiques : {'oui' if identical else 'NON'}")
+                mismatches += not identical
+                result = parquet_resume(node, debut, results[-1]['rows'], os.path.join(tmp, 'parquet'))
+                results.append(result)
+                mismatches += not result['ok']
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if mismatches:
+        print(f"ERREUR: {mismatches} comparaison(s) en échec", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Vérification de la récupération adaptative des logs (scripts/log_fetcher.py)
+contre un nœud simulé qui refuse des plages ou échoue par intermittence.
+
+Chaque scénario compare les logs obtenus à ceux d'un nœud sans limite et
+compte les découpages de plage :
+  - plage       : plages limitées à --max-log-range blocs ; les tranches sont
+                  coupées, les logs identiques ;
+  - résultats   : réponses limitées à --max-logs logs ; idem ;
+  - limite levée : la limite de plage disparaît après le premier quart des
+                  tranches ; la taille des tranches doit revenir à la taille
+                  initiale ;
+  - erreurs 503 : une fraction des requêtes échoue (--error-rate) ; elles sont
+                  retentées sans aucun découpage ni baisse de la taille des
+                  tranches.
+
+    python3 benchmarks/compare_log_fetcher.py --swaps 60000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.normpath(os.path.join(HERE, os.pardir, 'scripts')))
+sys.path.insert(0, HERE)
+from log_fetcher import LogFetcher  # noqa: E402
+from mock_node import MockNode, MockPool  # noqa: E402
+from rpc_client import JsonRpcClient  # noqa: E402
+from synthetic_logs import POOL_ADDRESS, SWAP_TOPIC0, iter_swap_rows  # noqa: E402
+
+START_BLOCK = 18_000_000
+SWAPS_PER_BLOCK = 3
+
+
+def fetch(node, args, lift_after=None, retries=3):
+    """
+    Logs de toute la plage, tranche par tranche ; retourne (logs, découpages, taille finale des tranches).
+    lift_after : nombre de tranches après lequel la limite de plage du nœud est levée.
+    """
+    fetcher = LogFetcher(JsonRpcClient(node.url), chunk_size=args.chunk_size, concurrency=args.concurrency,
+                         retries=retries, backoff=0.0, grow_after=args.grow_after)
+    logs, output = [], io.StringIO()
+    with contextlib.redirect_stdout(output):
+        chunks = fetcher.iter_chunks(POOL_ADDRESS, [SWAP_TOPIC0], START_BLOCK, args.last_block)
+        for i, (_, _, chunk_logs) in enumerate(chunks):
+            if i == lift_after:
+                node.max_log_range = None
+            logs.extend(chunk_logs)
+    return logs, output.getvalue().count("découpage"), fetcher.chunk_size
+
+
+def scenario(label, pool, reference, args, expect_splits, lift_after=None, retries=3, **node_options):
+    """
+    Un scénario contre un nœud configuré par `node_options` ; retourne les mesures et le verdict.
+    """
+    with MockNode(pool=pool, **node_options) as node:
+        logs, splits, chunk_size = fetch(node, args, lift_after=lift_after, retries=retries)
+    identical = logs == reference
+    # Sans limite active en fin de parcours, la taille des tranches doit être revenue à la taille initiale
+    size_ok = chunk_size == args.chunk_size if lift_after is not None or not expect_splits else True
+    ok = identical and size_ok and (splits > 0) == expect_splits
+    print(f"{label:<14} | {len(logs):>7} logs | identiques : {'oui' if identical else 'NON'} | découpages {splits:>4} "
+          f"| tranches finales {chunk_size:>6} blocs (initiales {args.chunk_size}) | {'OK' if ok else 'ÉCHEC'}")
+    return {'case': label, 'logs': len(logs), 'identical': identical, 'splits': splits,
+            'final_chunk_size': chunk_size, 'ok': ok}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LogFetcher : plages refusées, limite levée et erreurs transitoires.")
+    parser.add_argument("--swaps", type=int, default=60_000, help="Events Swap du pool simulé (défaut: 60000).")
+    parser.add_argument("--chunk-size", type=int, default=2_000, help="Blocs par tranche au départ (défaut: 2000).")
+    parser.add_argument("--concurrency", type=int, default=4, help="Tranches en vol (défaut: 4).")
+    parser.add_argument("--grow-after", type=int, default=4,
+                        help="Succès consécutifs avant de doubler la taille des tranches (défaut: 4).")
+    parser.add_argument("--max-log-range", type=int, default=250, help="Plage maximale du nœud simulé (défaut: 250).")
+    parser.add_argument("--max-logs", type=int, default=1_000, help="Logs maximum par réponse (défaut: 1000).")
+    parser.add_argument("--error-rate", type=float, default=0.5, help="Fraction de requêtes en 503 (défaut: 0.5).")
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats.")
+    args = parser.parse_args()
+
+    pool = MockPool(list(iter_swap_rows(args.swaps, START_BLOCK, SWAPS_PER_BLOCK)))
+    args.last_block = START_BLOCK + (args.swaps - 1) // SWAPS_PER_BLOCK
+    with MockNode(pool=pool) as node:
+        reference, _, _ = fetch(node, args)
+
+    n_chunks = (args.last_block - START_BLOCK) // args.chunk_size + 1
+    results = [
+        scenario("plage", pool, reference, args, True, max_log_range=args.max_log_range),
+        scenario("résultats", pool, reference, args, True, max_logs=args.max_logs),
+        scenario("limite levée", pool, reference, args, True, lift_after=max(1, n_chunks // 4),
+                 max_log_range=args.max_log_range),
+        scenario("erreurs 503", pool, reference, args, False, retries=10, error_rate=args.error_rate),
+    ]
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    failures = sum(not result['ok'] for result in results)
+    if failures:
+        print(f"ERREUR: {failures} comparaison(s) en échec", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Vérification du lecteur de rounds Chainlink (RoundDataReader, scripts/chainlink_rounds.py)
+contre un nœud simulé dont une partie des appels échoue.
+
+Les rounds demandés dans chaque phase dépassent le dernier round publié
+(sous-appels aggregate3 en revert, autorisés à échouer), et certains rounds
+font échouer l'eth_call entier, comme un lot trop grand pour le gas du nœud
+(`multicall_limit`). Le lecteur doit alors couper le lot en deux jusqu'à
+isoler ces rounds. Pour chaque scénario :
+  - les rounds décodés sont ceux du flux simulé, None pour les rounds absents
+    ou en échec ;
+  - `probes` compte les rounds demandés, `calls` les eth_call reçus par le
+    nœud (lots coupés compris, calculés à partir des règles du nœud) ;
+  - une seconde lecture des mêmes rounds est servie par le cache
+    (`cache_hits`), sans aucun eth_call.
+
+    python3 benchmarks/compare_round_reader.py
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+
+from web3 import Web3
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.normpath(os.path.join(HERE, os.pardir, 'scripts')))
+sys.path.insert(0, HERE)
+from chainlink_dicho import ABI  # noqa: E402
+from chainlink_rounds import RoundDataReader  # noqa: E402
+from mock_node import FEED_ADDRESS, MockFeed, MockNode, Revert  # noqa: E402
+
+
+def expected_round(feed, round_id, failing_rounds):
+    """
+    Données du round sur le flux simulé, ou None s'il n'existe pas ou fait échouer l'appel.
+    """
+    if round_id in failing_rounds:
+        return None
+    try:
+        return feed.get_round_data(round_id)
+    except Revert:
+        return None
+
+
+def expected_calls(round_ids, batch_size, multicall_limit, failing_rounds, use_multicall):
+    """
+    eth_call attendus : un par lot, plus ceux des moitiés de chaque lot refusé par le nœud.
+    """
+    if not use_multicall:
+        return len(round_ids)
+
+    def aggregate(ids):
+        refused = len(ids) > (multicall_limit or len(ids)) or any(rid in failing_rounds for rid in ids)
+        if not refused or len(ids) == 1:
+            return 1
+        half = len(ids) // 2
+        return 1 + aggregate(ids[:half]) + aggregate(ids[half:])
+
+    return sum(aggregate(round_ids[i:i + batch_size]) for i in range(0, len(round_ids), batch_size))
+
+
+def run(label, feed, requested, args, use_multicall=True):
+    """
+    Deux lectures de `requested` ({phase: roundIds globaux}) ; retourne les mesures et le verdict.
+    """
+    failing = {(phase << 64) | i for phase in feed.phases for i in args.failing}
+    with MockNode(feed=feed, multicall_limit=args.multicall_limit, failing_rounds=failing) as node:
+        web3 = Web3(Web3.HTTPProvider(node.url))
+        contract = web3.eth.contract(address=Web3.to_checksum_address(FEED_ADDRESS), abi=ABI)
+        reader = RoundDataReader(web3, FEED_ADDRESS, contract=contract, batch_size=args.batch_size,
+                                 use_multicall=use_multicall)
+        wrong, expected = 0, {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            for phase, round_ids in requested.items():
+                rounds = reader.get_rounds(round_ids)
+                wrong += sum(rounds[rid] != expected_round(feed, rid, failing) for rid in round_ids)
+                expected[phase] = expected_calls(round_ids, args.batch_size, args.multicall_limit, failing, use_multicall)
+            first_pass_calls = node.calls['eth_call']
+            for phase, round_ids in requested.items():
+                cached = reader.get_rounds(round_ids)
+                wrong += sum(cached[rid] != expected_round(feed, rid, failing) for rid in round_ids)
+        node_calls = node.calls['eth_call']
+
+    counters_ok = all(
+        reader.probes[phase] == len(round_ids) and reader.cache_hits[phase] == len(round_ids)
+        and reader.calls[phase] == expected[phase]
+        for phase, round_ids in requested.items()
+    )
+    ok = not wrong and counters_ok and node_calls == first_pass_calls == sum(expected.values())
+    print(f"{label:<22} | rounds faux {wrong} | sondés {dict(reader.probes)} | en cache {dict(reader.cache_hits)} "
+          f"| appels {dict(reader.calls)} (attendus {expected}, reçus {node_calls}) | {'OK' if ok else 'ÉCHEC'}")
+    return {'case': label, 'wrong_rounds': wrong, 'probes': dict(reader.probes), 'cache_hits': dict(reader.cache_hits),
+            'calls': dict(reader.calls), 'expected_calls': expected, 'node_calls': node_calls, 'ok': ok}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RoundDataReader : sous-appels en revert et lots refusés par le nœud.")
+    parser.add_argument("--rounds-per-phase", type=int, nargs='+', default=[150, 260],
+                        help="Rounds publiés par phase (défaut: 150 260).")
+    parser.add_argument("--extra", type=int, default=25, help="Rounds demandés au-delà du dernier publié (défaut: 25).")
+    parser.add_argument("--failing", type=int, nargs='*', default=[7, 100, 101],
+                        help="aggregatorRoundIds qui font échouer l'eth_call entier, dans chaque phase (défaut: 7 100 101).")
+    parser.add_argument("--batch-size", type=int, default=128, help="Rounds par appel aggregate3 (défaut: 128).")
+    parser.add_argument("--multicall-limit", type=int, default=48,
+                        help="Sous-appels acceptés par aggregate3 sur le nœud simulé (défaut: 48).")
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats.")
+    args = parser.parse_args()
+
+    feed = MockFeed.synthetic(tuple(args.rounds_per_phase))
+    requested = {phase: [(phase << 64) | i for i in range(1, len(rounds) + args.extra + 1)]
+                 for phase, rounds in feed.phases.items()}
+    results = [
+        run("multicall", feed, requested, args),
+        run("appels directs", feed, requested, args, use_multicall=False),
+    ]
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    failures = sum(not result['ok'] for result in results)
+    if failures:
+        print(f"ERREUR: {failures} comparaison(s) en échec", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Vérification du décodeur vectorisé des events Swap (scripts/swap_decoder.py)
+contre le moteur de référence mpmath (decode_swap_event / calculate_price).
+
+Les mêmes champs `data` sont décodés par les deux moteurs :
+  - mots aléatoires : montants int256 de signes et d'ordres de grandeur
+    variés, sqrtPriceX96 tiré entre MIN_SQRT_RATIO et MAX_SQRT_RATIO ;
+  - cas limites : montants négatifs extrêmes (-1, -2**255), amount0 ou
+    amount1 nul, sqrtPriceX96 à MIN_SQRT_RATIO / MAX_SQRT_RATIO (et ± 1),
+    sqrtPriceX96 nul, data sans préfixe 0x ou avec les mots liquidity / tick ;
+  - data mal formées : trop courtes, vides, caractères non hexadécimaux.
+Chaque ligne doit être acceptée ou rejetée par les deux moteurs, et l'écart
+relatif des lignes acceptées rester inférieur à REFERENCE_RTOL sur chaque
+colonne, pour les paramètres du pool par défaut et de chaque pool du registre.
+
+    python3 benchmarks/compare_swap_engines.py --rows 20000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.normpath(os.path.join(HERE, os.pardir, 'scripts')))
+sys.path.insert(0, HERE)
+import Uniswap_process_logs as uniswap  # noqa: E402
+from registry import Registry  # noqa: E402
+from swap_decoder import REFERENCE_RTOL, decode_swap_batch  # noqa: E402
+from synthetic_logs import encode_swap_data  # noqa: E402
+
+MIN_SQRT_RATIO = 4_295_128_739  # Bornes de sqrtPriceX96 d'Uniswap V3 (TickMath)
+MAX_SQRT_RATIO = 1_461_446_703_485_210_103_287_273_052_203_988_822_378_723_970_342
+COLUMNS = ('usdc_amount', 'eth_amount', 'price_usdc_per_eth', 'volume_usdc')
+
+
+def random_words(n_rows, seed):
+    """
+    Champs data aléatoires : montants de 1 à 2**255, sqrtPriceX96 log-uniforme dans ses bornes.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n_rows):
+        amount0, amount1 = (rng.choice((-1, 1)) * rng.getrandbits(rng.randint(1, 255)) for _ in range(2))
+        exponent = rng.uniform(math.log2(MIN_SQRT_RATIO), math.log2(MAX_SQRT_RATIO))
+        sqrt_price = min(max(int(2**exponent), MIN_SQRT_RATIO), MAX_SQRT_RATIO)
+        rows.append(encode_swap_data(amount0, amount1, sqrt_price, rng.getrandbits(128), rng.randint(-887_272, 887_272)))
+    return rows
+
+
+def edge_case_words():
+    """
+    Cas limites (valides pour les deux moteurs, sauf sqrtPriceX96 nul) puis data mal formées.
+    """
+    price = 1_987_000_000_000_000_000_000_000_000_000_000  # ~ 1 600 USDC par ETH
+    valid = [
+        encode_swap_data(-1, 1, price, 1, 0),
+        encode_swap_data(-2**255, 2**255 - 1, price, 1, 0),
+        encode_swap_data(2**255 - 1, -2**255, price, 1, 0),
+        encode_swap_data(0, -10**18, price, 1, 0),
+        encode_swap_data(-10**6, 0, price, 1, 0),
+        encode_swap_data(0, 0, price, 1, 0),
+        encode_swap_data(-10**9, 10**18, MIN_SQRT_RATIO, 1, -887_272),
+        encode_swap_data(-10**9, 10**18, MIN_SQRT_RATIO + 1, 1, -887_272),
+        encode_swap_data(-10**9, 10**18, MAX_SQRT_RATIO, 1, 887_272),
+        encode_swap_data(-10**9, 10**18, MAX_SQRT_RATIO - 1, 1, 887_272),
+        encode_swap_data(-10**9, 10**18, 0, 1, 0),
+        encode_swap_data(-10**9, 10**18, price, 1, 0)[2:],
+        encode_swap_data(-10**9, 10**18, price, 1, 0)[:2 + 192],
+    ]
+    word = encode_swap_data(-10**9, 10**18, price, 1, 0)
+    malformed = [
+        word[:2 + 191],
+        word[:2 + 128],
+        word[:2 + 64],
+        '0x',
+        '',
+        word[:40] + 'zz' + word[42:],
+        word[:130] + 'g' + word[131:],
+    ]
+    return valid + malformed
+
+
+def reference_rows(data, pool):
+    """
+    Décodage ligne par ligne du moteur de référence ; None pour une ligne rejetée.
+    """
+    rows = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for data_hex in data:
+            try:
+                usdc, eth, sqrt_price_x96 = uniswap.decode_swap_event(data_hex, pool)
+                price, volume = uniswap.calculate_price(sqrt_price_x96, eth, usdc, pool)
+                rows.append((float(usdc), float(eth), float(price), float(volume)))
+            except Exception:
+                rows.append(None)
+    return rows
+
+
+def relative_errors(expected, actual):
+    """
+    Écart relatif |a - e| / |e| (nul quand les deux valeurs sont nulles).
+    """
+    scale = np.abs(expected)
+    return np.where(scale == 0, np.abs(actual - expected), np.abs(actual - expected) / np.where(scale == 0, 1, scale))
+
+
+def compare(data, pool, label):
+    """
+    Compare les deux moteurs sur `data` ; retourne les mesures et le verdict.
+    """
+    reference = reference_rows(data, pool)
+    batch = decode_swap_batch(pd.Series(data), *uniswap.swap_parameters(pool))
+    accepted = np.array([row is not None for row in reference])
+    same_rows = bool((batch['valid'].to_numpy() == accepted).all())
+
+    expected = np.array([row for row in reference if row is not None], dtype=np.float64).reshape(-1, len(COLUMNS))
+    actual = batch.loc[accepted, list(COLUMNS)].to_numpy(dtype=np.float64) if same_rows else expected
+    errors = {column: float(relative_errors(expected[:, i], actual[:, i]).max(initial=0.0))
+              for i, column in enumerate(COLUMNS)}
+    ok = same_rows and max(errors.values()) < REFERENCE_RTOL
+    result = {'case': label, 'rows': len(data), 'accepted': int(accepted.sum()), 'same_rows': same_rows,
+              'max_relative_error': errors, 'ok': ok}
+    print(f"{label:<32} | {len(data):>6} lignes | {int(accepted.sum()):>6} acceptées "
+          f"| rejets identiques : {'oui' if same_rows else 'NON'} "
+          f"| écart max {max(errors.values()):.2e} (tolérance {REFERENCE_RTOL:g}) | {'OK' if ok else 'ÉCHEC'}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare le décodeur vectorisé des events Swap au moteur mpmath.")
+    parser.add_argument("--rows", type=int, default=5_000, help="Champs data aléatoires (défaut: 5000).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats.")
+    args = parser.parse_args()
+
+    pools = [(None, 'défaut')] + [(pool, pool.name) for pool in Registry.load().pools.values()]
+    random_data, edge_data = random_words(args.rows, args.seed), edge_case_words()
+    results = []
+    for pool, name in pools:
+        results.append(compare(random_data, pool, f"aléatoires / {name}"))
+        results.append(compare(edge_data, pool, f"cas limites / {name}"))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    failures = sum(not result['ok'] for result in results)
+    if failures:
+        print(f"ERREUR: {failures} comparaison(s) en échec", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
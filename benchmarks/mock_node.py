@@ -0,0 +1,568 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Nœud JSON-RPC local simulé pour les benchmarks (aucun appel réseau externe).
+
+Répond à `eth_blockNumber`, `eth_chainId` et `eth_getBlockByNumber` (requêtes
+simples et batch) sur une chaîne synthétique à slots de 12 secondes, à
+`eth_call` pour un flux Chainlink simulé (`getRoundData`, `latestRoundData`,
+`phaseAggregators`), appelé directement ou via `aggregate3` sur Multicall3,
+et à `eth_getLogs` pour les événements AnswerUpdated de ses agrégateurs et
+les events Swap d'un ou plusieurs pools Uniswap simulés.
+
+Avec `live`, la tête de chaîne avance en temps réel (bloc du slot courant) :
+seuls les rounds Chainlink publiés à la date du bloc demandé existent, ce qui
+permet de suivre la chaîne comme sur un vrai nœud (scripts/follow_chain.py).
+
+Pour éprouver la bascule entre endpoints, le nœud peut aussi répondre par des
+erreurs : une fraction des requêtes en HTTP 503 (`error_rate`), et HTTP 429
+avec Retry-After au-delà de `rate_limit` requêtes par seconde. Des blocs
+désignés (`block_failures`) peuvent aussi échouer individuellement dans une
+requête batch, par une erreur JSON-RPC ou une réponse absente, et un appel
+aggregate3 peut échouer en entier (`multicall_limit`, `failing_rounds`).
+
+Utilisable seul, pour lancer les scripts contre le nœud simulé :
+
+    python3 benchmarks/mock_node.py --port 8545 --latency 0.01 --swaps 100000
+    RPC=http://127.0.0.1:8545 python3 scripts/Uniswap_process_logs.py --from-block 18000000 --to-block 18040000
+"""
+
+import argparse
+import json
+import random
+from bisect import bisect_left, bisect_right
+import threading
+import time
+from collections import Counter, deque
+from itertools import accumulate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from eth_abi import decode, encode
+from web3 import Web3
+
+from synthetic_logs import POOL_ADDRESS, SWAP_TOPIC0, iter_swap_rows
+
+GENESIS_BLOCK = 15_537_394        # Premier bloc post-Merge
+GENESIS_TIMESTAMP = 1_663_224_179
+SLOT_SECONDS = 12
+
+
+class MockChain:
+    """
+    Chaîne synthétique : un bloc par slot de 12 s à partir de GENESIS_BLOCK.
+    live : la tête est le bloc du slot de l'heure courante (un nouveau bloc toutes les 12 s).
+    missed_slots : {bloc: slots manqués juste avant ce bloc} (bloc > GENESIS_BLOCK) ;
+    chaque slot manqué décale de 12 s ce bloc et tous les suivants.
+    irregular_pow : avant le Merge, intervalles irréguliers de 10 ou 15 s entre
+    blocs (preuve de travail) au lieu du prolongement des slots de 12 s.
+    """
+
+    def __init__(self, head_block=20_000_000, live=False, missed_slots=None, irregular_pow=False):
+        self._head_block = head_block
+        self.live = live
+        self.irregular_pow = irregular_pow
+        self._missed_blocks = sorted(missed_slots or {})
+        self._missed_before = list(accumulate((missed_slots or {})[bn] for bn in self._missed_blocks))
+
+    @property
+    def head_block(self) -> int:
+        return self.block_at(int(time.time())) if self.live else self._head_block
+
+    def _missed(self, block_number: int) -> int:
+        """
+        Slots manqués depuis GENESIS_BLOCK jusqu'au bloc inclus.
+        """
+        i = bisect_right(self._missed_blocks, block_number)
+        return self._missed_before[i - 1] if i else 0
+
+    def block_timestamp(self, block_number: int) -> int:
+        if block_number < GENESIS_BLOCK and self.irregular_pow:
+            # 10 ou 15 s selon le bloc : strictement croissant, jamais aligné sur 12 s
+            return GENESIS_TIMESTAMP - 14 * (GENESIS_BLOCK - block_number) + (block_number * 2_654_435_761) % 5 - 4
+        return GENESIS_TIMESTAMP + SLOT_SECONDS * (block_number - GENESIS_BLOCK + self._missed(block_number))
+
+    def block_at(self, timestamp: int) -> int:
+        """
+        Dernier bloc dont le timestamp est <= `timestamp` (bloc du slot qui le
+        contient si aucun slot n'est manqué ni la preuve de travail irrégulière).
+        """
+        block = GENESIS_BLOCK + (timestamp - GENESIS_TIMESTAMP) // SLOT_SECONDS
+        if timestamp >= GENESIS_TIMESTAMP:
+            # Chaque slot manqué jusqu'à `block` recule le résultat d'au plus un bloc
+            lo, hi = block - self._missed(block), block
+        elif self.irregular_pow:
+            # Au moins 10 s entre deux blocs pré-Merge
+            lo, hi = GENESIS_BLOCK - (GENESIS_TIMESTAMP - timestamp) // 10 - 2, GENESIS_BLOCK - 1
+        else:
+            return block
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.block_timestamp(mid) <= timestamp:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+    def get_block(self, block_number: int):
+        if block_number > self.head_block:
+            return None
+        return {
+            'number': hex(block_number),
+            'hash': f"0x{block_number:064x}",
+            'timestamp': hex(self.block_timestamp(block_number)),
+            'transactions': [],
+        }
+
+
+FEED_ADDRESS = "0x5f4ec3df9cbd43714fe2740f5e3616155c5b8419"
+MULTICALL3_ADDRESS = "0xca11bde05977b3631167028862be2a173976ca11"
+
+_SELECTORS = {
+    bytes(Web3.keccak(text=signature)[:4]): name
+    for name, signature in (
+        ("getRoundData", "getRoundData(uint80)"),
+        ("latestRoundData", "latestRoundData()"),
+        ("aggregate3", "aggregate3((address,bool,bytes)[])"),
+        ("phaseAggregators", "phaseAggregators(uint16)"),
+        ("decimals", "decimals()"),
+    )
+}
+_ROUND_DATA_TYPES = ['uint80', 'int256', 'uint256', 'uint256', 'uint80']
+ANSWER_UPDATED_TOPIC = "0x" + bytes(Web3.keccak(text="AnswerUpdated(int256,uint256,uint256)")).hex()
+
+
+class Revert(Exception):
+    """
+    Exécution annulée (revert) d'un appel simulé.
+    """
+
+
+class MockFeed:
+    """
+    Proxy Chainlink simulé : `phases[phase]` est la liste des rounds
+    (answer, updatedAt) de la phase, aggregatorRoundId commençant à 1.
+    decimals : décimales des réponses (valeur de decimals()).
+    """
+
+    def __init__(self, phases, decimals=8):
+        self.phases = phases
+        self.decimals = decimals
+        self._blocks = {}
+
+    @staticmethod
+    def aggregator_address(phase: int) -> str:
+        """
+        Adresse (minuscules) de l'agrégateur simulé d'une phase.
+        """
+        return f"0x{0xa66e:04x}{phase:036x}"
+
+    @classmethod
+    def synthetic(cls, rounds_per_phase=(2_000, 3_000), start_ts=1_600_000_000, interval=3_600, base_answer=None,
+                  decimals=8):
+        """
+        Flux régulier : un round toutes les `interval` secondes, phases consécutives.
+        base_answer : première réponse (défaut: 2000 avec `decimals` décimales).
+        """
+        if base_answer is None:
+            base_answer = 2_000 * 10**decimals
+        phases, ts = {}, start_ts
+        for phase, n_rounds in enumerate(rounds_per_phase, start=1):
+            rounds = []
+            for i in range(n_rounds):
+                rounds.append((base_answer + (i % 500) * 10**(decimals - 2), ts))
+                ts += interval
+            phases[phase] = rounds
+        return cls(phases, decimals)
+
+    def get_round_data(self, round_id: int, timestamp=None):
+        """
+        timestamp : date du bloc de l'appel ; un round publié après n'existe pas encore.
+        """
+        phase, aggregator_id = round_id >> 64, round_id & 0xFFFFFFFFFFFFFFFF
+        rounds = self.phases.get(phase, [])
+        if not 1 <= aggregator_id <= len(rounds):
+            raise Revert("No data present")
+        answer, updated_at = rounds[aggregator_id - 1]
+        if timestamp is not None and updated_at > timestamp:
+            raise Revert("No data present")
+        return (round_id, answer, updated_at, updated_at, round_id)
+
+    def latest_round_data(self, timestamp=None):
+        for phase in sorted(self.phases, reverse=True):
+            rounds = self.phases[phase]
+            n_rounds = len(rounds) if timestamp is None else bisect_right([u for _, u in rounds], timestamp)
+            if n_rounds:
+                return self.get_round_data((phase << 64) | n_rounds)
+        raise Revert("No data present")
+
+    def call(self, data: bytes, timestamp=None) -> bytes:
+        name = _SELECTORS.get(data[:4])
+        if name == "getRoundData":
+            (round_id,) = decode(['uint80'], data[4:])
+            return encode(_ROUND_DATA_TYPES, list(self.get_round_data(round_id, timestamp)))
+        if name == "latestRoundData":
+            return encode(_ROUND_DATA_TYPES, list(self.latest_round_data(timestamp)))
+        if name == "phaseAggregators":
+            (phase,) = decode(['uint16'], data[4:])
+            address = self.aggregator_address(phase) if phase in self.phases else "0x" + "00" * 20
+            return encode(['address'], [address])
+        if name == "decimals":
+            return encode(['uint8'], [self.decimals])
+        raise Revert("unknown selector")
+
+    def answer_updated_logs(self, chain, addresses, from_block: int, to_block: int) -> list:
+        """
+        Événements AnswerUpdated des agrégateurs `addresses` entre deux blocs ;
+        chaque round est émis dans le bloc du slot qui contient son updatedAt.
+        """
+        logs = []
+        for phase, rounds in sorted(self.phases.items()):
+            address = self.aggregator_address(phase)
+            if address not in addresses:
+                continue
+            if phase not in self._blocks:
+                self._blocks[phase] = [chain.block_at(updated_at) for _, updated_at in rounds]
+            blocks = self._blocks[phase]
+            log_index = {}
+            for i in range(bisect_left(blocks, from_block), bisect_right(blocks, to_block)):
+                answer, updated_at = rounds[i]
+                block = blocks[i]
+                log_index[block] = log_index.get(block, -1) + 1
+                logs.append({
+                    'address': address,
+                    'topics': [
+                        ANSWER_UPDATED_TOPIC,
+                        "0x" + encode(['int256'], [answer]).hex(),
+                        "0x" + encode(['uint256'], [i + 1]).hex(),
+                    ],
+                    'data': "0x" + encode(['uint256'], [updated_at]).hex(),
+                    'blockNumber': hex(block),
+                    'transactionHash': f"0x{(phase << 64) | (i + 1):064x}",
+                    'logIndex': hex(log_index[block]),
+                    'removed': False,
+                })
+        return logs
+
+
+class MockPool:
+    """
+    Pool Uniswap simulé : events Swap (lignes au format cryo, triées par bloc).
+    """
+
+    def __init__(self, rows, address=POOL_ADDRESS):
+        self.rows = sorted(rows, key=lambda row: (row['block_number'], row['log_index']))
+        self._blocks = [row['block_number'] for row in self.rows]
+        self.address = address.lower()
+
+    @classmethod
+    def synthetic(cls, n_rows, start_block=18_000_000, swaps_per_block=3, base_price=3000.0, seed=0,
+                  address=POOL_ADDRESS):
+        return cls(list(iter_swap_rows(n_rows, start_block, swaps_per_block, base_price, seed, address)), address)
+
+    def swap_logs(self, from_block: int, to_block: int) -> list:
+        return [
+            {
+                'address': row['address'],
+                'topics': [row['topic0']],
+                'data': row['data'],
+                'blockNumber': hex(row['block_number']),
+                'transactionHash': row['transaction_hash'],
+                'transactionIndex': hex(row['transaction_index']),
+                'logIndex': hex(row['log_index']),
+                'removed': False,
+            }
+            for row in self.rows[bisect_left(self._blocks, from_block):bisect_right(self._blocks, to_block)]
+        ]
+
+
+class MockNode:
+    """
+    Serveur HTTP JSON-RPC dans un thread. S'utilise comme gestionnaire de contexte :
+
+        with MockNode(latency=0.005) as node:
+            client = JsonRpcClient(node.url)
+
+    pools : pools simulés servis ensemble (remplace `pool`), filtrés par les adresses de la requête.
+    latency : délai (secondes) ajouté à chaque requête HTTP.
+    host / port : adresse d'écoute (port 0 : port libre choisi par le système).
+    max_log_range / max_logs : limites d'eth_getLogs (plage de blocs, nombre de
+    résultats) au-delà desquelles le nœud répond par une erreur, comme les fournisseurs RPC.
+    error_rate : fraction des requêtes HTTP rejetées par un 503 (tirage reproductible, graine `seed`).
+    rate_limit : requêtes HTTP par seconde acceptées ; au-delà, 429 avec Retry-After: 1.
+    block_failures : {bloc: échecs avant succès (None : toujours)} pour eth_getBlockByNumber.
+    block_failure_mode : 'error' (erreur JSON-RPC pour l'appel) ou 'drop' (appel absent
+    de la réponse batch ; une requête seule reçoit l'erreur).
+    multicall_limit : nombre maximal de sous-appels d'aggregate3 ; au-delà, l'appel entier échoue (gas).
+    failing_rounds : roundIds dont getRoundData fait échouer l'eth_call entier, direct ou
+    via aggregate3 (erreur du nœud, et non revert d'un sous-appel autorisé à échouer).
+    calls : compteur des appels par méthode ; http_statuses : réponses HTTP par code.
+    """
+
+    def __init__(self, chain=None, feed=None, pool=None, latency=0.0, max_log_range=None, max_logs=None,
+                 host='127.0.0.1', port=0, error_rate=0.0, rate_limit=None, seed=0, pools=None,
+                 block_failures=None, block_failure_mode='error', multicall_limit=None, failing_rounds=()):
+        self.chain = chain or MockChain()
+        self.feed = feed or MockFeed.synthetic()
+        self.pools = list(pools) if pools else [pool or MockPool([])]
+        self.latency = latency
+        self.max_log_range = max_log_range
+        self.max_logs = max_logs
+        self.address = (host, port)
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.block_failures = dict(block_failures or {})
+        self.block_failure_mode = block_failure_mode
+        self.multicall_limit = multicall_limit
+        self.failing_rounds = set(failing_rounds)
+        self._random = random.Random(seed)
+        self._recent = deque()
+        self.calls = Counter()
+        self.http_statuses = Counter()
+        self.http_requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _block_fails(self, block_number: int) -> bool:
+        """
+        Vrai si cet appel eth_getBlockByNumber doit échouer (décompte des échecs restants).
+        """
+        with self._lock:
+            if block_number not in self.block_failures:
+                return False
+            remaining = self.block_failures[block_number]
+            if remaining is None:
+                return True
+            if remaining <= 0:
+                return False
+            self.block_failures[block_number] = remaining - 1
+            return True
+
+    def handle(self, request: dict, in_batch=False):
+        """
+        Réponse JSON-RPC à un appel ; None si l'appel est omis de la réponse batch.
+        """
+        method = request.get('method')
+        params = request.get('params') or []
+        with self._lock:
+            self.calls[method] += 1
+        reply = {'jsonrpc': '2.0', 'id': request.get('id')}
+        if method == 'eth_blockNumber':
+            reply['result'] = hex(self.chain.head_block)
+        elif method == 'eth_chainId':
+            reply['result'] = hex(1)
+        elif method == 'web3_clientVersion':
+            reply['result'] = "MockNode/1.0"
+        elif method == 'eth_call':
+            try:
+                reply['result'] = '0x' + self.eth_call(*params[:2]).hex()
+            except Revert as e:
+                reply['error'] = {'code': 3, 'message': f"execution reverted: {e}"}
+        elif method == 'eth_getLogs':
+            try:
+                reply['result'] = self.get_logs(params[0])
+            except Revert as e:
+                reply['error'] = {'code': -32005, 'message': str(e)}
+        elif method == 'eth_getBlockByNumber':
+            tag = params[0]
+            block_number = self.chain.head_block if tag == 'latest' else int(tag, 16)
+            if self._block_fails(block_number):
+                if in_batch and self.block_failure_mode == 'drop':
+                    return None
+                reply['error'] = {'code': -32000, 'message': "header not found"}
+            else:
+                reply['result'] = self.chain.get_block(block_number)
+        else:
+            reply['error'] = {'code': -32601, 'message': f"Method not found: {method}"}
+        return reply
+
+    def _block_number(self, tag) -> int:
+        return self.chain.head_block if tag in (None, 'latest') else int(tag, 16)
+
+    def get_logs(self, log_filter: dict) -> list:
+        from_block = self._block_number(log_filter.get('fromBlock'))
+        to_block = self._block_number(log_filter.get('toBlock'))
+        if self.chain.live:
+            to_block = min(to_block, self.chain.head_block)
+        if self.max_log_range is not None and to_block - from_block + 1 > self.max_log_range:
+            raise Revert(f"block range too large (max {self.max_log_range})")
+        addresses = log_filter.get('address') or []
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        addresses = {a.lower() for a in addresses}
+        topics = log_filter.get('topics') or []
+        topic0 = topics[0] if topics else None
+        topic0 = None if topic0 is None else set(topic0 if isinstance(topic0, list) else [topic0])
+
+        logs = []
+        if topic0 is None or ANSWER_UPDATED_TOPIC in topic0:
+            logs.extend(self.feed.answer_updated_logs(self.chain, addresses, from_block, to_block))
+        if topic0 is None or SWAP_TOPIC0 in topic0:
+            swaps = [pool.swap_logs(from_block, to_block) for pool in self.pools if pool.address in addresses]
+            logs.extend(swaps[0] if len(swaps) == 1 else sorted(
+                (log for pool_logs in swaps for log in pool_logs), key=lambda log: int(log['blockNumber'], 16)))
+        if self.max_logs is not None and len(logs) > self.max_logs:
+            raise Revert(f"query returned more than {self.max_logs} results")
+        return logs
+
+    def eth_call(self, tx: dict, tag='latest') -> bytes:
+        to = (tx.get('to') or '').lower()
+        data = bytes.fromhex((tx.get('data') or tx.get('input') or '0x')[2:])
+        # Chaîne en temps réel : l'état du flux est celui de la date du bloc demandé
+        timestamp = None
+        if self.chain.live:
+            block = min(self._block_number(tag if isinstance(tag, str) and tag.startswith('0x') else None),
+                        self.chain.head_block)
+            timestamp = self.chain.block_timestamp(block)
+        if to == FEED_ADDRESS:
+            self._check_rounds([data])
+            return self.feed.call(data, timestamp)
+        if to == MULTICALL3_ADDRESS and _SELECTORS.get(data[:4]) == "aggregate3":
+            (calls,) = decode(['(address,bool,bytes)[]'], data[4:])
+            if self.multicall_limit is not None and len(calls) > self.multicall_limit:
+                raise Revert("out of gas")
+            self._check_rounds([call_data for _, _, call_data in calls])
+            results = []
+            for target, allow_failure, call_data in calls:
+                try:
+                    if target.lower() != FEED_ADDRESS:
+                        raise Revert("no contract")
+                    results.append((True, self.feed.call(call_data, timestamp)))
+                except Revert:
+                    if not allow_failure:
+                        raise Revert("Multicall3: call failed")
+                    results.append((False, b''))
+            return encode(['(bool,bytes)[]'], [results])
+        raise Revert("no contract")
+
+    def _check_rounds(self, calls_data):
+        """
+        Échec de l'appel entier si un getRoundData porte sur un round de `failing_rounds`.
+        """
+        for data in calls_data:
+            if self.failing_rounds and _SELECTORS.get(data[:4]) == "getRoundData":
+                (round_id,) = decode(['uint80'], data[4:])
+                if round_id in self.failing_rounds:
+                    raise Revert(f"execution timeout (round {round_id})")
+
+    def _rejection(self):
+        """
+        Code HTTP d'erreur simulée pour la requête en cours, ou None.
+        """
+        with self._lock:
+            if self.rate_limit is not None:
+                now = time.monotonic()
+                while self._recent and self._recent[0] <= now - 1:
+                    self._recent.popleft()
+                if len(self._recent) >= self.rate_limit:
+                    return 429
+                self._recent.append(now)
+            if self.error_rate and self._random.random() < self.error_rate:
+                return 503
+        return None
+
+    def _make_handler(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with node._lock:
+                    node.http_requests += 1
+                if node.latency:
+                    time.sleep(node.latency)
+                status = node._rejection()
+                with node._lock:
+                    node.http_statuses[status or 200] += 1
+                if status is not None:
+                    self.send_response(status)
+                    if status == 429:
+                        self.send_header('Retry-After', '1')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if isinstance(body, list):
+                    reply = [r for r in (node.handle(request, in_batch=True) for request in body) if r is not None]
+                else:
+                    reply = node.handle(body)
+                payload = json.dumps(reply).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(self.address, self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Nœud JSON-RPC simulé (chaîne, flux Chainlink et pool Uniswap synthétiques).")
+    parser.add_argument("--host", default='127.0.0.1', help="Adresse d'écoute (défaut: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8545, help="Port d'écoute (défaut: 8545).")
+    parser.add_argument("--latency", type=float, default=0.0, help="Délai ajouté à chaque requête HTTP, en secondes (défaut: 0).")
+    parser.add_argument("--rounds-per-phase", type=int, nargs='+', default=[2_000, 3_000],
+                        help="Rounds Chainlink par phase (défaut: 2000 3000).")
+    parser.add_argument("--swaps", type=int, default=0, help="Events Swap du pool simulé, à partir du bloc 18000000 (défaut: 0).")
+    parser.add_argument("--max-log-range", type=int, default=None, help="Plage de blocs maximale d'eth_getLogs.")
+    parser.add_argument("--max-logs", type=int, default=None, help="Nombre maximal de résultats d'eth_getLogs.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction des requêtes rejetées par un HTTP 503 (défaut: 0).")
+    parser.add_argument("--rate-limit", type=float, default=None,
+                        help="Requêtes par seconde acceptées ; au-delà, HTTP 429 avec Retry-After (défaut: aucune limite).")
+    parser.add_argument("--live", action="store_true",
+                        help="Tête de chaîne en temps réel (un bloc toutes les 12 s) ; swaps à partir de la tête "
+                             "et rounds Chainlink répartis autour de l'heure courante.")
+    parser.add_argument("--round-interval", type=int, default=3_600,
+                        help="Secondes entre deux rounds Chainlink simulés (défaut: 3600).")
+    args = parser.parse_args()
+
+    chain = MockChain(live=args.live)
+    if args.live:
+        # La moitié des rounds est déjà publiée, l'autre le sera au fil du temps
+        n_rounds = sum(args.rounds_per_phase)
+        feed = MockFeed.synthetic(tuple(args.rounds_per_phase), start_ts=int(time.time()) - args.round_interval * (n_rounds // 2),
+                                  interval=args.round_interval)
+        pool = MockPool.synthetic(args.swaps, start_block=chain.head_block)
+    else:
+        feed = MockFeed.synthetic(tuple(args.rounds_per_phase), interval=args.round_interval)
+        pool = MockPool.synthetic(args.swaps)
+    node = MockNode(
+        chain=chain, feed=feed, pool=pool,
+        latency=args.latency, max_log_range=args.max_log_range, max_logs=args.max_logs,
+        host=args.host, port=args.port, error_rate=args.error_rate, rate_limit=args.rate_limit
+    ).start()
+    print(f"Nœud simulé à l'écoute sur {node.url} (Ctrl+C pour arrêter)")
+    try:
+        node._thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        node.stop()
+        print(f"Appels par méthode : {dict(node.calls)}")
+        print(f"Réponses HTTP : {dict(node.http_statuses)}")
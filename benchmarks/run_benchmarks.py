@@ -0,0 +1,350 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Suite de benchmarks du pipeline, étape par étape, sans RPC réel.
+
+Chaque scénario s'exécute dans un processus enfant (pic de mémoire propre)
+contre un nœud JSON-RPC simulé (mock_node.py, latence réglable) alimenté
+par des données synthétiques (synthetic_logs.py) :
+
+    decode_vectorized  décodage vectorisé des events Swap (swap_decoder)
+    decode_reference   décodage de référence mpmath (decode_swap_event / calculate_price)
+    uniswap_cryo       fichier cryo → prix (timestamps de blocs par eth_getBlockByNumber)
+    uniswap_rpc        eth_getLogs → prix
+    chainlink_search   recherche d'un round par timestamp (interpolation)
+    chainlink_kary     même recherche, k-aire
+    chainlink_extract  extraction complète chainlink_dicho.py (moteur logs)
+    bars               barres OHLCV / VWAP 1m, 1h et 1d
+    asof_join          jointure as-of swaps / rounds Chainlink
+
+Pour chaque scénario : lignes traitées, durée, lignes/s, appels RPC par
+méthode et pic de mémoire résidente. Les résultats sont écrits en JSON
+(--output) ; --compare compare à un fichier de résultats précédent et
+échoue si le débit baisse ou si le nombre d'appels RPC augmente au-delà
+de --tolerance.
+
+    python3 benchmarks/run_benchmarks.py --output results.json
+    python3 benchmarks/run_benchmarks.py --latency 0.005 --compare results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.normpath(os.path.join(HERE, os.pardir, 'scripts'))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from mock_node import FEED_ADDRESS, MockChain, MockFeed, MockNode, MockPool  # noqa: E402
+from synthetic_logs import synthetic_swaps, write_cryo_csv  # noqa: E402
+
+START_BLOCK = 18_000_000
+SWAPS_PER_BLOCK = 3
+MIN_COMPARABLE_SECONDS = 0.2  # En dessous, le débit mesuré est trop bruité pour être comparé
+SCENARIOS = [
+    'decode_vectorized', 'decode_reference', 'uniswap_cryo', 'uniswap_rpc',
+    'chainlink_search', 'chainlink_kary', 'chainlink_extract', 'bars', 'asof_join',
+]
+
+
+def _block_times(df):
+    """
+    {bloc: datetime UTC} des blocs d'un DataFrame de logs, d'après la chaîne simulée.
+    """
+    chain = MockChain()
+    return {bn: datetime.fromtimestamp(chain.block_timestamp(bn), tz=timezone.utc) for bn in df['block_number'].unique()}
+
+
+def scenario_decode(args, engine):
+    import pandas as pd
+    import Uniswap_process_logs as uniswap
+    df = pd.read_csv(args.cryo_path, nrows=args.reference_rows if engine == 'reference' else None)
+    blocks = _block_times(df)
+    start = time.perf_counter()
+    prices = uniswap.decode_log_chunk(df, blocks, engine)
+    return len(prices), time.perf_counter() - start, {}
+
+
+def scenario_uniswap_cryo(args):
+    from rpc_client import JsonRpcClient
+    import Uniswap_process_logs as uniswap
+    rpc = JsonRpcClient(args.rpc)
+    start = time.perf_counter()
+    rows = sum(len(prices) for prices, _, _ in uniswap.iter_uniswap_prices(args.cryo_path, rpc, block_index=None))
+    return rows, time.perf_counter() - start, {}
+
+
+def scenario_uniswap_rpc(args):
+    from rpc_client import JsonRpcClient
+    import Uniswap_process_logs as uniswap
+    rpc = JsonRpcClient(args.rpc)
+    last_block = START_BLOCK + (args.swaps - 1) // SWAPS_PER_BLOCK
+    start = time.perf_counter()
+    rows = sum(len(prices) for prices, _, _ in uniswap.iter_rpc_uniswap_prices(rpc, START_BLOCK, last_block, block_index=None))
+    return rows, time.perf_counter() - start, {}
+
+
+def scenario_chainlink_search(args, method):
+    from web3 import Web3
+    from chainlink_rounds import RoundDataReader
+    from range_search import find_last_before, find_last_true
+
+    feed = MockFeed.synthetic(tuple(args.rounds_per_phase))
+    phase = max(feed.phases)
+    rounds = feed.phases[phase]
+    web3 = Web3(Web3.HTTPProvider(args.rpc))
+    step = max(1, len(rounds) // args.searches)
+    targets = [rounds[i][1] + 1 for i in range(step // 2, len(rounds), step)][:args.searches]
+
+    probes = 0
+    start = time.perf_counter()
+    for target in targets:
+        # Lecteur neuf à chaque recherche : le cache ne profite pas aux suivantes
+        reader = RoundDataReader(web3, FEED_ADDRESS)
+
+        def get_timestamps(ids):
+            stamps = reader.get_timestamps([(phase << 64) | i for i in ids])
+            return {i: stamps[(phase << 64) | i] for i in ids}
+
+        if method == 'kary':
+            found = find_last_true(
+                lambda ids: {i: ts is not None and ts < target for i, ts in get_timestamps(ids).items()},
+                1, len(rounds)
+            )
+        else:
+            found = find_last_before(get_timestamps, 1, len(rounds), target)
+        if found is None or rounds[found - 1][1] >= target:
+            raise RuntimeError(f"recherche incorrecte pour {target}: {found}")
+        probes += sum(reader.probes.values())
+    return len(targets), time.perf_counter() - start, {'probes_per_search': round(probes / len(targets), 1)}
+
+
+def scenario_chainlink_extract(args):
+    feed = MockFeed.synthetic(tuple(args.rounds_per_phase))
+    debut = feed.phases[1][0][1]
+    workdir = os.path.join(args.workdir, 'chainlink')
+    os.makedirs(os.path.join(workdir, 'data'), exist_ok=True)
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, os.path.join(SCRIPTS_DIR, 'chainlink_dicho.py'), '--debut', str(debut), '--engine', 'logs'],
+        cwd=workdir, env=dict(os.environ, RPC=args.rpc), check=True, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+    with open(os.path.join(workdir, 'data', 'chainlink_eth_usd_last.csv'), encoding='utf-8') as f:
+        rows = sum(1 for _ in f) - 1
+    return rows, elapsed, {}
+
+
+def scenario_bars(args):
+    from bars import aggregate_bars
+    swaps = synthetic_swaps(args.swaps)
+    start = time.perf_counter()
+    counts = {interval: len(aggregate_bars(swaps, interval)) for interval in ('1m', '1h', '1d')}
+    return len(swaps), time.perf_counter() - start, {'bars': counts}
+
+
+def scenario_asof_join(args):
+    from asof_join import asof_join
+    from bench_asof_join import synthetic_rounds
+    swaps = synthetic_swaps(args.swaps)
+    uniswap_path = os.path.join(args.workdir, 'swaps.csv')
+    chainlink_path = os.path.join(args.workdir, 'rounds.csv')
+    synthetic_rounds(swaps).to_csv(chainlink_path, index=False)
+    swaps.to_csv(uniswap_path, index=False)
+    del swaps
+    start = time.perf_counter()
+    rows = asof_join(uniswap_path, chainlink_path, os.path.join(args.workdir, 'joined.csv'))
+    return rows, time.perf_counter() - start, {}
+
+
+def run_child(args):
+    """
+    Exécute un scénario dans le processus courant et retourne ses mesures.
+    """
+    runners = {
+        'decode_vectorized': lambda: scenario_decode(args, 'vectorized'),
+        'decode_reference': lambda: scenario_decode(args, 'reference'),
+        'uniswap_cryo': lambda: scenario_uniswap_cryo(args),
+        'uniswap_rpc': lambda: scenario_uniswap_rpc(args),
+        'chainlink_search': lambda: scenario_chainlink_search(args, 'interpolation'),
+        'chainlink_kary': lambda: scenario_chainlink_search(args, 'kary'),
+        'chainlink_extract': lambda: scenario_chainlink_extract(args),
+        'bars': lambda: scenario_bars(args),
+        'asof_join': lambda: scenario_asof_join(args),
+    }
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            rows, elapsed, extra = runners[args.child]()
+        finally:
+            sys.stdout = stdout
+    peak_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return {
+        'scenario': args.child,
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows / elapsed) if elapsed else None,
+        'peak_rss_mb': round(peak_kb / 1024, 1),
+        **extra,
+    }
+
+
+def make_node(scenario, args):
+    """
+    Nœud simulé d'un scénario (None si le scénario n'appelle pas le RPC).
+    """
+    if scenario in ('bars', 'asof_join'):
+        return None
+    pool = MockPool.synthetic(args.swaps, START_BLOCK, SWAPS_PER_BLOCK) if scenario == 'uniswap_rpc' else None
+    return MockNode(feed=MockFeed.synthetic(tuple(args.rounds_per_phase)), pool=pool, latency=args.latency)
+
+
+def run_scenario(scenario, args, cryo_path, workdir):
+    """
+    Lance un scénario dans un processus enfant et ajoute les appels RPC comptés par le nœud.
+    """
+    node = make_node(scenario, args)
+    if node is not None:
+        node.start()
+    try:
+        command = [
+            sys.executable, __file__, '--child', scenario, '--cryo-path', cryo_path, '--workdir', workdir,
+            '--swaps', str(args.swaps), '--reference-rows', str(args.reference_rows),
+            '--searches', str(args.searches), '--rounds-per-phase', *map(str, args.rounds_per_phase),
+        ]
+        if node is not None:
+            command += ['--rpc', node.url]
+        out = subprocess.run(command, capture_output=True, text=True)
+        if out.returncode != 0:
+            raise RuntimeError(f"scénario {scenario} en échec :\n{out.stderr[-2000:]}")
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+    finally:
+        if node is not None:
+            node.stop()
+    result['rpc_calls'] = dict(node.calls) if node is not None else {}
+    result['http_requests'] = node.http_requests if node is not None else 0
+    return result
+
+
+def git_revision():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def compare(results, parameters, baseline, tolerance):
+    """
+    Compare aux résultats de référence ; retourne la liste des régressions.
+    """
+    previous = {r['scenario']: r for r in baseline.get('results', [])}
+    regressions = []
+    print(f"\nComparaison avec {baseline.get('meta', {}).get('git_revision') or 'la référence'} :")
+    if baseline.get('meta', {}).get('parameters') != parameters:
+        print("Attention : paramètres différents de ceux de la référence, comparaison indicative")
+    for result in results:
+        old = previous.get(result['scenario'])
+        if old is None:
+            continue
+        speed = None
+        if old.get('rows_per_second') and min(result['seconds'], old['seconds']) >= MIN_COMPARABLE_SECONDS:
+            speed = result['rows_per_second'] / old['rows_per_second']
+        calls, old_calls = sum(result['rpc_calls'].values()), sum(old.get('rpc_calls', {}).values())
+        line = f"{result['scenario']:>18} | débit x{speed:.2f}" if speed else f"{result['scenario']:>18} | débit non comparé (trop court)"
+        line += f" | appels RPC {old_calls} → {calls}"
+        if speed is not None and speed < 1 - tolerance:
+            regressions.append(f"{result['scenario']}: débit x{speed:.2f}")
+            line += "  <-- régression"
+        if old_calls and calls > old_calls * (1 + tolerance):
+            regressions.append(f"{result['scenario']}: appels RPC {old_calls} → {calls}")
+            line += "  <-- appels RPC"
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks du pipeline contre un nœud JSON-RPC simulé.")
+    parser.add_argument("--scenarios", nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--swaps", type=int, default=200_000, help="Events Swap synthétiques (défaut: 200000).")
+    parser.add_argument("--reference-rows", type=int, default=5_000,
+                        help="Lignes décodées par le moteur de référence, lent (défaut: 5000).")
+    parser.add_argument("--rounds-per-phase", type=int, nargs='+', default=[3_000, 20_000],
+                        help="Rounds Chainlink simulés par phase (défaut: 3000 20000).")
+    parser.add_argument("--searches", type=int, default=20, help="Recherches de round par scénario chainlink_* (défaut: 20).")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence du nœud simulé par requête HTTP, en secondes (défaut: 0).")
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats.")
+    parser.add_argument("--compare", help="Résultats JSON de référence (exécution précédente).")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Écart toléré avant de signaler une régression (défaut: 0.2, soit 20 %%).")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--cryo-path", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    parser.add_argument("--rpc", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args)))
+        return
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cryo_path = os.path.join(tmp, 'ethereum__logs.csv')
+        write_cryo_csv(cryo_path, args.swaps, START_BLOCK, SWAPS_PER_BLOCK)
+        for scenario in args.scenarios:
+            workdir = os.path.join(tmp, scenario)
+            os.makedirs(workdir)
+            try:
+                result = run_scenario(scenario, args, cryo_path, workdir)
+            except RuntimeError as e:
+                print(f"ERREUR: {e}", file=sys.stderr)
+                sys.exit(1)
+            results.append(result)
+            extra = f" | {result['probes_per_search']} sondes/recherche" if 'probes_per_search' in result else ""
+            print(f"{scenario:>18} | {result['rows']:>8} lignes | {result['seconds']:7.2f} s "
+                  f"| {result['rows_per_second']:>9} lignes/s | pic RSS {result['peak_rss_mb']:7.1f} Mo "
+                  f"| RPC {sum(result['rpc_calls'].values())} appels / {result['http_requests']} requêtes{extra}")
+
+    parameters = {
+        'swaps': args.swaps, 'reference_rows': args.reference_rows,
+        'rounds_per_phase': args.rounds_per_phase, 'searches': args.searches, 'latency': args.latency,
+    }
+    report = {
+        'meta': {
+            'git_revision': git_revision(),
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'parameters': parameters,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nRésultats écrits dans {args.output}")
+
+    if baseline is not None:
+        regressions = compare(results, parameters, baseline, args.tolerance)
+        if regressions:
+            print(f"ERREUR: {len(regressions)} régression(s) : {'; '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Génération de fichiers de logs cryo synthétiques pour les benchmarks.
+
+Les événements Swap produits ont un encodage ABI valide (amount0, amount1,
+sqrtPriceX96, liquidity, tick) et des prix réalistes autour de `base_price`.
+`synthetic_swaps` produit directement des swaps décodés (format de
+uniswap_eth_usd.csv), vectorisés, pour les étapes en aval du décodage.
+"""
+
+import argparse
+import csv
+import math
+import random
+
+import numpy as np
+import pandas as pd
+
+SWAP_TOPIC0 = "0xc42079f94a6350d7e6235f29174924f928cc2ac818eb64fed8004e115fbcca67"
+POOL_ADDRESS = "0x88e6a0c2ddd26feeb64f039a2c41296fcb3f5640"
+CRYO_COLUMNS = [
+    'block_number', 'transaction_index', 'log_index', 'transaction_hash', 'address',
+    'topic0', 'topic1', 'topic2', 'topic3', 'data', 'n_data_bytes', 'chain_id'
+]
+
+
+def _word(value: int) -> str:
+    """
+    Mot ABI de 32 octets (complément à deux pour les négatifs).
+    """
+    return format(value % (1 << 256), '064x')
+
+
+def encode_swap_data(amount0: int, amount1: int, sqrt_price_x96: int, liquidity: int, tick: int) -> str:
+    return '0x' + ''.join(_word(v) for v in (amount0, amount1, sqrt_price_x96, liquidity, tick))
+
+
+def sqrt_price_x96_for(price_usdc_per_eth: float) -> int:
+    """
+    sqrtPriceX96 du pool USDC/WETH pour un prix donné en USDC par ETH.
+    """
+    return int(2**96 * math.sqrt(1e12 / price_usdc_per_eth))
+
+
+def iter_swap_rows(n_rows, start_block=18_000_000, swaps_per_block=3, base_price=3000.0, seed=0,
+                   address=POOL_ADDRESS):
+    """
+    Lignes cryo synthétiques (dict) : marche aléatoire du prix, `swaps_per_block` swaps par bloc.
+    address : adresse du pool émetteur (pool USDC/WETH par défaut).
+    """
+    rng = random.Random(seed)
+    price = base_price
+    for i in range(n_rows):
+        block_number = start_block + i // swaps_per_block
+        log_index = i % swaps_per_block
+        price *= math.exp(rng.gauss(0.0, 0.0005))
+        eth = rng.uniform(0.01, 50.0) * rng.choice((-1, 1))
+        amount1 = int(eth * 10**18)
+        amount0 = -int(eth * price * 10**6)
+        yield {
+            'block_number': block_number,
+            'transaction_index': log_index,
+            'log_index': log_index,
+            'transaction_hash': f"0x{rng.getrandbits(256):064x}",
+            'address': address,
+            'topic0': SWAP_TOPIC0,
+            'topic1': '',
+            'topic2': '',
+            'topic3': '',
+            'data': encode_swap_data(amount0, amount1, sqrt_price_x96_for(price), 10**18, -200_000),
+            'n_data_bytes': 160,
+            'chain_id': 1,
+        }
+
+
+def write_cryo_csv(path, n_rows, start_block=18_000_000, swaps_per_block=3, base_price=3000.0, seed=0):
+    """
+    Écrit un fichier CSV au format cryo logs. Retourne (premier bloc, dernier bloc).
+    """
+    last_block = start_block
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CRYO_COLUMNS)
+        writer.writeheader()
+        for row in iter_swap_rows(n_rows, start_block, swaps_per_block, base_price, seed):
+            writer.writerow(row)
+            last_block = row['block_number']
+    return start_block, last_block
+
+
+def synthetic_swaps(n_swaps, start_block=18_000_000, start_ts=1_692_775_451, swaps_per_block=3.0,
+                    base_price=3000.0, seed=0):
+    """
+    Swaps décodés synthétiques : blocs de 12 s, prix en marche aléatoire.
+    """
+    rng = np.random.default_rng(seed)
+    blocks = start_block + np.cumsum(rng.random(n_swaps) < 1 / swaps_per_block)
+    price = base_price * np.exp(np.cumsum(rng.normal(0, 2e-4, n_swaps)))
+    eth_amount = rng.lognormal(0, 1.5, n_swaps) * np.where(rng.random(n_swaps) < 0.5, -1, 1)
+    usdc_amount = -eth_amount * price
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(start_ts + 12 * (blocks - start_block), unit='s', utc=True),
+        'price_usdc_per_eth': price,
+        'usdc_amount': usdc_amount,
+        'eth_amount': eth_amount,
+        'volume_usdc': np.abs(usdc_amount),
+        'block_number': blocks,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère un fichier de logs cryo synthétique.")
+    parser.add_argument("path", help="Fichier CSV à écrire.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Nombre d'événements Swap (défaut: 100000).")
+    parser.add_argument("--start-block", type=int, default=18_000_000, help="Premier bloc (défaut: 18000000).")
+    parser.add_argument("--swaps-per-block", type=int, default=3, help="Swaps par bloc (défaut: 3).")
+    parser.add_argument("--seed", type=int, default=0, help="Graine aléatoire (défaut: 0).")
+    args = parser.parse_args()
+    first, last = write_cryo_csv(args.path, args.rows, args.start_block, args.swaps_per_block, seed=args.seed)
+    print(f"{args.rows} swaps écrits dans {args.path} (blocs {first}..{last})")
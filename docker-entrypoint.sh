@@ -6,6 +6,10 @@ cd /app || exit 1
 RPC=${RPC:-"https://ethereum-rpc.publicnode.com"}
 export RPC
 
+# Métriques de chaque exécution (JSON + fichier texte Prometheus), à côté des logs
+METRICS_DIR=${METRICS_DIR:-"/app/logs"}
+export METRICS_DIR
+
 # Gérer le paramètre d'intervalle en jours
 INTERVAL_DAYS=${INTERVAL_DAYS:-0}  # Valeur par défaut: 0 (exécution unique)
 
@@ -17,6 +21,16 @@ fi
 # Convertir en secondes
 INTERVAL=$(( INTERVAL_DAYS * 24 * 60 * 60 ))
 
+# Suivi continu de la chaîne après la mise à jour initiale (FOLLOW=1), au lieu de la boucle INTERVAL_DAYS
+FOLLOW=${FOLLOW:-0}
+CONFIRMATIONS=${CONFIRMATIONS:-3}
+POLL_INTERVAL=${POLL_INTERVAL:-2}
+
+if [[ ! "$CONFIRMATIONS" =~ ^[0-9]+$ ]]; then
+  echo "ERREUR: CONFIRMATIONS doit être un nombre de blocs positif ou nul" >&2
+  exit 1
+fi
+
 # Arret propre du conteneur
 trap "echo 'Arrêt du conteneur'; exit 0" SIGTERM SIGINT
 
@@ -24,6 +38,14 @@ trap "echo 'Arrêt du conteneur'; exit 0" SIGTERM SIGINT
 echo "=== Démarrage initial ==="
 ./scripts/update.sh
 
+if [[ "$FOLLOW" == "1" ]]; then
+  # exec : le démon reçoit directement SIGTERM (docker stop) et écrit ses lignes en attente avant de s'arrêter
+  echo "=== Suivi de la chaîne ($CONFIRMATIONS confirmations) ==="
+  BAR_INTERVALS=${BAR_INTERVALS:-"1m 1h 1d"}
+  exec python3 ./scripts/follow_chain.py --confirmations "$CONFIRMATIONS" --poll-interval "$POLL_INTERVAL" \
+    --output-format "${OUTPUT_FORMAT:-csv}" --metrics-dir "$METRICS_DIR" ${BAR_INTERVALS:+--bars $BAR_INTERVALS}
+fi
+
 # Boucle principale pour les exécutions périodiques
 while [[ "$INTERVAL" -gt 0 ]]; do
   echo "=== Prochaine exécution dans $INTERVAL_DAYS jours ==="
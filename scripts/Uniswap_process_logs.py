@@ -1,34 +1,60 @@
 # SPDX-License-Identifier: CC-BY-4.0
 # © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
 
+import argparse
+import numpy as np
 import pandas as pd
-from web3 import Web3
 from datetime import datetime
-from mpmath import mp
 import os
 import sys
 import glob
 import pytz
-
-mp.dps = 50  # Applique une haute précision pour les calculs décimaux
-
-# Lecture de la variable d'environnement RPC
-RPC_URL = os.environ.get("RPC", "")
-if not RPC_URL:
-    print("ERREUR: la variable d'environnement 'RPC' n'est pas définie.", file=sys.stderr)
-    sys.exit(1)
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from swap_decoder import ETH_DECIMALS, USDC_DECIMALS, decode_swap_batch
+from rpc_client import PooledRpcClient, RpcError, rate_limit_from_env
+from block_timestamps import BlockTimestampError, block_at_timestamp
+from block_index import DEFAULT_INDEX_PATH, BlockTimestampIndex, get_block_timestamps
+from checkpoint import DEFAULT_MANIFEST_PATH, ProcessingManifest, block_range_from_filename
+from columnar_store import DEFAULT_PARQUET_DIR, PARTITION_FORMATS, append_partitioned
+from dataset_manifest import dataset_stats
+from log_fetcher import LogFetcher
+from bars import DEFAULT_PREFIX as BARS_PREFIX, INTERVALS as BAR_INTERVALS, bars_path, update_bars_file
+from metrics import DEFAULT_PROGRESS_INTERVAL, METRICS, ProgressLogger, export_at_exit
+from registry import DEFAULT_POOL, DEFAULT_REGISTRY_PATH, Registry
 
 # Constants
 EXPECTED_TOPIC0 = "0xc42079f94a6350d7e6235f29174924f928cc2ac818eb64fed8004e115fbcca67" # Event Swap
+POOL_ADDRESS = "0x88e6A0c2dDD26FEEb64F039a2c41296FcB3f5640"  # Pool Uniswap V3 WETH/USDC 0.05 %
+SWAP_KEY = ['block_number', 'transaction_hash', 'log_index']  # Identifiant unique d'un event Swap
+DEFAULT_CHUNK_SIZE = 100_000  # Lignes de logs lues par morceau en mode flux
+DEFAULT_LOG_CHUNK_SIZE = 2_000  # Blocs par requête eth_getLogs (réduit automatiquement si le nœud refuse)
 
 # gestion des chemins
 here = os.path.dirname(__file__)
 data_dir = os.path.join(here, os.pardir, 'data', 'output')
 data_dir = os.path.normpath(data_dir)
 pattern = os.path.join(data_dir, '*.csv')
-csv_files = glob.glob(pattern)
 
-def decode_swap_event(data_hex):
+def high_precision():
+    """
+    Contexte mpmath à 50 décimales du moteur de référence. Import différé :
+    mpmath n'est chargé que si ce moteur est utilisé.
+    """
+    from mpmath import mp
+    mp.dps = 50  # Applique une haute précision pour les calculs décimaux
+    return mp
+
+def swap_parameters(pool=None):
+    """
+    (décimales de token0, décimales de token1, invert) d'un pool du registre ;
+    sans pool, ceux du pool USDC/WETH coté en USDC par ETH.
+    """
+    if pool is None:
+        return USDC_DECIMALS, ETH_DECIMALS, True
+    return pool.decimals0, pool.decimals1, pool.invert
+
+def decode_swap_event(data_hex, pool=None):
     """
     Décode les données de l'événement Swap depuis le format hex
 
@@ -38,10 +64,15 @@ def decode_swap_event(data_hex):
     sqrtPriceX96 : uint160 → 160 bits
     liquidity : uint128 → 128 bits
     tick : int24 → 24 bits (rempli sur 256 bits, car les types dans Ethereum sont alignés sur 32 octets)
+
+    Retourne (montant du jeton de cotation, montant du jeton de base,
+    sqrtPriceX96) : USDC puis ETH pour le pool par défaut.
     """
     try:
-        # Enlever le préfixe '0x' s'il existe
-        data = data_hex.replace('0x', '')
+        # Enlever le préfixe '0x' s'il existe ; les trois premiers mots doivent être complets
+        data = data_hex[2:] if data_hex.startswith('0x') else data_hex
+        if len(data) < 192:
+            raise ValueError(f"data trop courte ({len(data)} caractères hex, 192 attendus)")
 
         amount0_hex = data[0:64]            # Premier 32 octets (int256)
         amount1_hex = data[64:128]          # Deuxième 32 octets (int256)
@@ -52,9 +83,12 @@ def decode_swap_event(data_hex):
         amount1 = int.from_bytes(bytes.fromhex(amount1_hex), byteorder='big', signed=True)        
         sqrtPriceX96 = int(sqrtPriceX96_hex, 16)
         
-        # Conversion des montants avec décimales
-        usdc_amount = mp.mpf(amount0) / 10**6   # USDC a 6 décimales
-        eth_amount = mp.mpf(amount1) / 10**18   # ETH a 18 décimales
+        # Conversion des montants avec décimales (USDC : 6, ETH : 18 pour le pool par défaut)
+        decimals0, decimals1, invert = swap_parameters(pool)
+        mp = high_precision()
+        token0_amount = mp.mpf(amount0) / 10**decimals0
+        token1_amount = mp.mpf(amount1) / 10**decimals1
+        usdc_amount, eth_amount = (token0_amount, token1_amount) if invert else (token1_amount, token0_amount)
         
         return usdc_amount, eth_amount, sqrtPriceX96
     
@@ -64,12 +98,14 @@ def decode_swap_event(data_hex):
         raise
 
 
-def calculate_price(sqrtPriceX96, eth_amount, usdc_amount):
+def calculate_price(sqrtPriceX96, eth_amount, usdc_amount, pool=None):
     """
     Calcule le prix de 1 ETH en USDC à partir de sqrtPriceX96
+    (pour un autre pool : du jeton de base en jeton de cotation)
     """
     try:
         # Conversion en nombre décimal de haute précision
+        mp = high_precision()
         sqrtPriceX96 = mp.mpf(sqrtPriceX96)
         
         # Calcul du prix brut (ETH par USDC)
@@ -77,10 +113,11 @@ def calculate_price(sqrtPriceX96, eth_amount, usdc_amount):
         price_eth_per_usdc = sqrt_price ** 2  # token1 (ETH) par token0 (USDC)
 
         # Ajustement des décimales (USDC:6, ETH:18 → écart 12 décimales)
-        price_eth_per_usdc_adj = price_eth_per_usdc * mp.mpf("1e-12")
+        decimals0, decimals1, invert = swap_parameters(pool)
+        price_eth_per_usdc_adj = price_eth_per_usdc * mp.mpf(f"1e{decimals0 - decimals1}")
 
         # Inversion pour obtenir USDC par ETH
-        price_usdc_per_eth = 1 / price_eth_per_usdc_adj
+        price_usdc_per_eth = 1 / price_eth_per_usdc_adj if invert else price_eth_per_usdc_adj
 
         #print(f"1 ETH = {mp.nstr(price_usdc_per_eth, 6)} USDC")
 
@@ -94,152 +131,846 @@ def calculate_price(sqrtPriceX96, eth_amount, usdc_amount):
         print(f"sqrtPriceX96 reçu: {sqrtPriceX96}") 
         raise
 
-def process_uniswap_logs(csv_path, web3):
+def process_rows_reference(df, blocks, pool=None):
+    """
+    Moteur de référence : décodage ligne par ligne en haute précision (mpmath).
+    Lent, mais sert d'étalon pour valider le moteur vectorisé.
+    pool : pool du registre dont les décimales et le sens de cotation sont appliqués (défaut: USDC/WETH).
+    """
+    # Création des listes pour stocker les résultats
+    usdc_amounts = []
+    eth_amounts = []
+    timestamps = []
+    prices = []
+    volumes = []
+    processed_block_numbers = []
+    tx_hashes = []
+
+    # Progression limitée dans le temps : une ligne affichée par ligne traitée coûtait plus que le calcul
+    progress = ProgressLogger("Décodage (référence)", total=len(df))
+    not_swaps = 0
+    for index, row in df.iterrows():
+        progress.update()
+        try:
+            # Vérifier que topic0 correspond à la signature de l'event Swap attendue
+            if row['topic0'] != EXPECTED_TOPIC0:
+                not_swaps += 1
+                continue
+
+            # Décodage du prix
+            usdc, eth, sqrtPriceX96 = decode_swap_event(row['data'], pool)
+
+            # Calcul du prix et volume
+            price, volume = calculate_price(sqrtPriceX96, eth, usdc, pool)
+
+            # Récupération du timestamp
+            timestamp = blocks.get(row['block_number'])
+
+            # Enregistrement des données valides
+            if timestamp:
+                usdc_amounts.append(usdc)
+                eth_amounts.append(eth)
+                volumes.append(volume)
+                timestamps.append(timestamp)
+                prices.append(price)
+                processed_block_numbers.append(row['block_number'])
+                tx_hashes.append(row['transaction_hash'])
+
+        except Exception as e:
+            print(f"Erreur lors du traitement de la ligne {index}: {e}")
+            continue
+
+    if not_swaps:
+        print(f"{not_swaps} lignes ignorées (signature différente de l'event Swap)")
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'price_usdc_per_eth': prices,
+        'usdc_amount': usdc_amounts,
+        'eth_amount': eth_amounts,
+        'volume_usdc': volumes,
+        'block_number': processed_block_numbers,
+        'transaction_hash': tx_hashes
+    })
+
+def process_rows_vectorized(df, blocks, pool=None):
+    """
+    Moteur vectorisé : filtre, décode et calcule prix/volume sur toute la colonne `data` à la fois.
+    Les résultats concordent avec process_rows_reference à REFERENCE_RTOL près.
+    """
+    # Ne garder que les events Swap
+    is_swap = df['topic0'] == EXPECTED_TOPIC0
+    if (~is_swap).any():
+        print(f"{int((~is_swap).sum())} lignes ignorées (signature différente de l'event Swap)")
+    swaps = df[is_swap]
+
+    decoded = decode_swap_batch(swaps['data'], *swap_parameters(pool))
+    if (~decoded['valid']).any():
+        print(f"{int((~decoded['valid']).sum())} lignes ignorées (data invalide ou prix non calculable)")
+
+    # Récupération des timestamps
+    timestamps = swaps['block_number'].map(blocks)
+    keep = decoded['valid'] & timestamps.notna()
+
+    return pd.DataFrame({
+        'timestamp': timestamps[keep],
+        'price_usdc_per_eth': decoded.loc[keep, 'price_usdc_per_eth'],
+        'usdc_amount': decoded.loc[keep, 'usdc_amount'],
+        'eth_amount': decoded.loc[keep, 'eth_amount'],
+        'volume_usdc': decoded.loc[keep, 'volume_usdc'],
+        'block_number': swaps.loc[keep, 'block_number'],
+        'transaction_hash': swaps.loc[keep, 'transaction_hash']
+    }).reset_index(drop=True)
+
+def drop_processed_rows(df, manifest=None):
+    """
+    Retire les doublons (block_number, transaction_hash, log_index) et,
+    si un manifeste est fourni, les lignes de blocs déjà traités lors d'une exécution précédente.
+    manifest peut aussi être un dictionnaire {adresse du pool en minuscules:
+    manifeste} : les lignes de chaque pool sont comparées à son manifeste.
+    """
+    if all(col in df.columns for col in SWAP_KEY):
+        df = df.drop_duplicates(subset=SWAP_KEY)
+    if isinstance(manifest, dict):
+        blocks = df['block_number'].to_numpy()
+        addresses = df['address'].str.lower().to_numpy()
+        covered = np.zeros(len(df), dtype=bool)
+        for address, pool_manifest in manifest.items():
+            rows = addresses == address
+            if pool_manifest is not None and rows.any():
+                covered[rows] = pool_manifest.covered_mask(blocks[rows])
+    else:
+        covered = manifest.covered_mask(df['block_number'].to_numpy()) if manifest is not None else None
+    if covered is not None:
+        if covered.any():
+            print(f"{int(covered.sum())} lignes ignorées (blocs déjà traités)")
+            df = df[~covered]
+    return df.reset_index(drop=True)
+
+def iter_log_chunks(csv_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Lit un CSV cryo par morceaux d'environ `chunk_size` lignes.
+
+    Les lignes du dernier bloc de chaque morceau sont reportées au morceau
+    suivant : un bloc n'est jamais coupé en deux (les fichiers cryo sont triés
+    par bloc), ce qui permet de marquer chaque morceau comme traité.
+    """
+    carry = None
+    with pd.read_csv(csv_path, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            if 'data' not in chunk.columns:
+                raise ValueError("La colonne 'data' n'existe pas dans le CSV")
+            if carry is not None:
+                chunk = pd.concat([carry, chunk], ignore_index=True)
+            last_block = chunk['block_number'].iloc[-1]
+            in_last_block = (chunk['block_number'] == last_block).to_numpy()
+            carry = chunk[in_last_block]
+            if (~in_last_block).any():
+                yield chunk[~in_last_block]
+    if carry is not None and not carry.empty:
+        yield carry
+
+def logs_to_frame(logs):
+    """
+    Convertit des logs eth_getLogs en DataFrame aux colonnes des fichiers cryo.
+    """
+    return pd.DataFrame({
+        'block_number': [int(log['blockNumber'], 16) for log in logs],
+        'transaction_index': [int(log['transactionIndex'], 16) if log.get('transactionIndex') else None for log in logs],
+        'log_index': [int(log['logIndex'], 16) for log in logs],
+        'transaction_hash': [log['transactionHash'] for log in logs],
+        'address': [log['address'] for log in logs],
+        'topic0': [log['topics'][0] if log['topics'] else None for log in logs],
+        'data': [log['data'] for log in logs],
+    })
+
+def iter_rpc_log_chunks(rpc, from_block, to_block, log_chunk_size=DEFAULT_LOG_CHUNK_SIZE, concurrency=4,
+                        address=POOL_ADDRESS):
+    """
+    Lit les events Swap du pool directement par eth_getLogs, sans passer par
+    des fichiers cryo. Les plages de blocs sont découpées en tranches
+    (coupées en deux si le nœud renvoie trop de résultats) et lues en
+    parallèle ; chaque tranche contient des blocs complets.
+    address : adresse du pool, ou liste d'adresses lues par les mêmes requêtes.
+
+    Produit des tuples (DataFrame des logs, premier bloc, dernier bloc de la tranche).
+    """
+    fetcher = LogFetcher(rpc, chunk_size=log_chunk_size, concurrency=concurrency)
+    for first_block, last_block, logs in fetcher.iter_chunks(address, [EXPECTED_TOPIC0], from_block, to_block):
+        yield logs_to_frame([log for log in logs if not log.get('removed')]), first_block, last_block
+
+def resolve_block_range(rpc, manifest=None, from_block=None, to_block=None, since=None):
+    """
+    Plage de blocs [premier, dernier] à lire par eth_getLogs :
+    --from-block, sinon le premier bloc dont le timestamp est >= --since,
+    sinon le bloc qui suit le dernier bloc couvert par le manifeste.
+    Le dernier bloc est --to-block, ou la tête de chaîne.
+    Retourne None si aucun point de départ n'est connu.
+    """
+    head_block = int(rpc.call("eth_blockNumber", []), 16)
+    last_block = head_block if to_block is None else min(to_block, head_block)
+    if from_block is not None:
+        return from_block, last_block
+    if since is not None:
+        return block_at_timestamp(rpc, since - 1, head_block) + 1, last_block
+    if manifest is not None and manifest.covered:
+        return manifest.covered[-1][1] + 1, last_block
+    return None
+
+def enrich_log_chunk(df, rpc, batch_size=100, concurrency=4, block_index=None, use_slots=True, manifest=None):
+    """
+    Prépare un morceau de logs pour le décodage : dédoublonnage et timestamps de blocs.
+    Retourne (lignes à décoder, {bloc: datetime UTC}) ; les lignes peuvent être vides.
+
+    Lève BlockTimestampError si des timestamps de blocs restent introuvables
+    après les nouvelles tentatives (plutôt que de perdre silencieusement les lignes).
+    """
+    df = drop_processed_rows(df, manifest)
+    if df.empty:
+        return df, {}
+
+    # Récupérer tous les numéros de blocs uniques
+    block_numbers = list(set(df['block_number'].tolist()))
+
+    # Lire l'index persistant, puis récupérer les blocs manquants par requêtes batch parallèles
+    timestamps, failed_blocks = get_block_timestamps(
+        rpc, block_numbers, index=block_index, use_slots=use_slots,
+        batch_size=batch_size, concurrency=concurrency
+    )
+    if failed_blocks:
+        affected = int(df['block_number'].isin(failed_blocks).sum())
+        print(f"Erreur: {len(failed_blocks)} bloc(s) sans timestamp ({affected} lignes concernées): {failed_blocks}", file=sys.stderr)
+        raise BlockTimestampError(failed_blocks)
+    blocks = {bn: datetime.fromtimestamp(ts, tz=pytz.UTC) for bn, ts in timestamps.items()}
+    return df, blocks
+
+def decode_log_chunk(df, blocks, engine="vectorized", pool=None):
+    """
+    Décodage et calcul des prix d'un morceau déjà enrichi (sans accès réseau :
+    peut s'exécuter dans un processus de travail).
+    """
+    if df.empty:
+        return pd.DataFrame()
+    if engine == "reference":
+        return process_rows_reference(df, blocks, pool)
+    return process_rows_vectorized(df, blocks, pool)
+
+def decode_pools_chunk(df, blocks, engine="vectorized", pools=()):
+    """
+    Décode un morceau de logs de plusieurs pools, chacun avec ses décimales
+    et son sens de cotation ; les timestamps de blocs sont communs.
+    Retourne {nom du pool: prix}. Avec un seul pool, toutes les lignes lui
+    sont attribuées (fichiers cryo d'un seul pool, sans colonne address).
+    """
+    if len(pools) == 1 or df.empty:
+        return {pool.name: decode_log_chunk(df, blocks, engine, pool) for pool in pools}
+    addresses = df['address'].str.lower()
+    return {pool.name: decode_log_chunk(df[addresses == pool.address.lower()], blocks, engine, pool) for pool in pools}
+
+def price_rows(prices):
+    """
+    Nombre de prix d'un morceau décodé (DataFrame, ou {pool: DataFrame}).
+    """
+    return sum(map(len, prices.values())) if isinstance(prices, dict) else len(prices)
+
+def process_log_chunk(df, rpc, engine="vectorized", batch_size=100, concurrency=4, block_index=None,
+                      use_slots=True, manifest=None):
+    """
+    Traite un morceau de logs : dédoublonnage, timestamps de blocs, décodage et prix.
+
+    Lève BlockTimestampError si des timestamps de blocs restent introuvables
+    après les nouvelles tentatives (plutôt que de perdre silencieusement les lignes).
+    """
+    df, blocks = enrich_log_chunk(
+        df, rpc, batch_size=batch_size, concurrency=concurrency, block_index=block_index,
+        use_slots=use_slots, manifest=manifest
+    )
+    return decode_log_chunk(df, blocks, engine)
+
+def iter_decoded_chunks(chunks, rpc, engine="vectorized", executor=None, max_pending=8, pools=None, **enrich_options):
+    """
+    Décode une suite de morceaux (DataFrame, premier bloc, dernier bloc) et
+    produit (prix, premier bloc, dernier bloc, lignes lues) dans le même ordre.
+    pools : pools du registre dont les logs sont mêlés dans les morceaux ;
+    les prix sont alors un dictionnaire {nom du pool: DataFrame} (voir decode_pools_chunk).
+
+    executor : ProcessPoolExecutor optionnel. Le processus parent lit les
+    morceaux et les enrichit (timestamps de blocs) ; le décodage et le calcul
+    des prix, limités par le CPU, sont répartis entre les processus de
+    travail. Les résultats sont rendus dans l'ordre des blocs : la sortie est
+    identique à celle du mode série. Au plus `max_pending` morceaux sont en
+    attente de décodage, ce qui borne la mémoire.
+
+    Métriques : temps des étapes fetch_timestamps et decode (avec un executor,
+    decode est le temps d'attente des résultats dans le processus parent) ;
+    lignes lues, ignorées (doublons, blocs déjà traités, events invalides) et décodées.
+    """
+    def collect(prices, n_rows):
+        METRICS.rows("uniswap", "read", n_rows)
+        METRICS.rows("uniswap", "skipped", n_rows - price_rows(prices))
+        METRICS.rows("uniswap", "decoded", price_rows(prices))
+        return prices
+
+    def decode(df, blocks):
+        return decode_pools_chunk(df, blocks, engine, pools) if pools is not None else decode_log_chunk(df, blocks, engine)
+
+    if executor is None:
+        for chunk, first_block, last_block in chunks:
+            with METRICS.stage("fetch_timestamps"):
+                df, blocks = enrich_log_chunk(chunk, rpc, **enrich_options) if not chunk.empty else (chunk, {})
+            with METRICS.stage("decode"):
+                prices = decode(df, blocks)
+            yield collect(prices, len(chunk)), first_block, last_block, len(chunk)
+        return
+
+    pending = deque()
+
+    def next_result():
+        future, first, last, n_rows = pending.popleft()
+        with METRICS.stage("decode"):
+            prices = future.result()
+        return collect(prices, n_rows), first, last, n_rows
+
+    for chunk, first_block, last_block in chunks:
+        with METRICS.stage("fetch_timestamps"):
+            df, blocks = enrich_log_chunk(chunk, rpc, **enrich_options) if not chunk.empty else (chunk, {})
+        task = (decode_pools_chunk, df, blocks, engine, pools) if pools is not None else (decode_log_chunk, df, blocks, engine)
+        pending.append((executor.submit(*task), first_block, last_block, len(chunk)))
+        while len(pending) > max_pending:
+            yield next_result()
+    while pending:
+        yield next_result()
+
+def iter_uniswap_prices(csv_path, rpc, chunk_size=DEFAULT_CHUNK_SIZE, executor=None, max_pending=8,
+                        progress_interval=DEFAULT_PROGRESS_INTERVAL, **options):
+    """
+    Version en flux de process_uniswap_logs : lit, enrichit et décode le fichier
+    morceau par morceau. La mémoire utilisée est bornée par `chunk_size`,
+    quelle que soit la taille du fichier.
+
+    executor : ProcessPoolExecutor optionnel pour décoder les morceaux en parallèle
+    (au plus `max_pending` morceaux en attente).
+    progress_interval : secondes minimales entre deux lignes de progression.
+
+    Produit des tuples (prix, premier bloc, dernier bloc) ; les blocs du
+    morceau sont complets, la plage peut donc être marquée comme traitée
+    dès que les prix sont écrits.
+    """
+    print(f"Lecture du fichier: {csv_path}")
+    chunks = (
+        (chunk, int(chunk['block_number'].min()), int(chunk['block_number'].max()))
+        for chunk in METRICS.timed_iter(iter_log_chunks(csv_path, chunk_size), "read")
+    )
+    progress = ProgressLogger(os.path.basename(csv_path), interval=progress_interval)
+    valid = 0
+    for prices, first_block, last_block, n_rows in iter_decoded_chunks(
+        chunks, rpc, executor=executor, max_pending=max_pending, **options
+    ):
+        valid += price_rows(prices)
+        progress.update(n_rows, f"{valid} prix valides, bloc {last_block}")
+        yield prices, first_block, last_block
+    progress.done(f"{valid} prix valides")
+
+def iter_rpc_uniswap_prices(rpc, from_block, to_block, log_chunk_size=DEFAULT_LOG_CHUNK_SIZE, executor=None,
+                            max_pending=8, progress_interval=DEFAULT_PROGRESS_INTERVAL, **options):
+    """
+    Équivalent de iter_uniswap_prices pour la source RPC : les logs de chaque
+    tranche de blocs sont décodés dès leur réception, sans écriture sur disque.
+    Avec `pools`, les logs de tous les pools sont lus par les mêmes requêtes
+    eth_getLogs et leurs timestamps de blocs récupérés une seule fois.
+
+    Produit des tuples (prix, premier bloc, dernier bloc de la tranche).
+    """
+    print(f"Lecture des events Swap par eth_getLogs, blocs {from_block}..{to_block}")
+    concurrency = options.get('concurrency', 4)
+    pools = options.get('pools')
+    address = POOL_ADDRESS if not pools else pools[0].address if len(pools) == 1 else [pool.address for pool in pools]
+    chunks = METRICS.timed_iter(
+        iter_rpc_log_chunks(rpc, from_block, to_block, log_chunk_size, concurrency, address), "fetch_logs"
+    )
+    progress = ProgressLogger("eth_getLogs", total=to_block - from_block + 1, unit="blocs", interval=progress_interval)
+    logs, valid = 0, 0
+    for prices, first_block, last_block, n_rows in iter_decoded_chunks(
+        chunks, rpc, executor=executor, max_pending=max_pending, **options
+    ):
+        logs += n_rows
+        valid += price_rows(prices)
+        progress.update(last_block - first_block + 1, f"{logs} logs reçus, {valid} prix valides")
+        yield prices, first_block, last_block
+    progress.done(f"{logs} logs reçus, {valid} prix valides")
+
+def process_uniswap_logs(csv_path, rpc, engine="vectorized", batch_size=100, concurrency=4, block_index=None,
+                         use_slots=True, manifest=None):
     """
     Traite les logs Uniswap et crée un nouveau CSV avec timestamps et prix
+
+    engine : "vectorized" (par défaut) ou "reference" (calcul mpmath ligne par ligne)
+    batch_size, concurrency : taille des requêtes batch JSON-RPC et nombre de lots en parallèle
+    block_index : BlockTimestampIndex persistant consulté avant le RPC (optionnel)
+    use_slots : timestamps post-Merge déduits des slots de 12 s, vérifiés par quelques en-têtes
+    manifest : ProcessingManifest dont les blocs déjà couverts sont ignorés (optionnel)
+
+    Le fichier est chargé entièrement en mémoire ; voir iter_uniswap_prices pour le mode en flux.
+    Retourne le DataFrame des prix (vide si aucun nouveau prix), ou None en cas d'erreur de lecture.
+
+    Lève BlockTimestampError si des timestamps de blocs restent introuvables
+    après les nouvelles tentatives (plutôt que de perdre silencieusement les lignes).
     """
     try:
         # Lecture du CSV
         print(f"Lecture du fichier: {csv_path}")
         df = pd.read_csv(csv_path)
         print(f"Nombre de lignes dans le CSV: {len(df)}")
-        print("Colonnes disponibles:", df.columns.tolist())
-        
+
         # Vérifier que la colonne 'data' existe
         if 'data' not in df.columns:
             print("Erreur: La colonne 'data' n'existe pas dans le CSV")
-            return pd.DataFrame()
-        
-        # Création des listes pour stocker les résultats
-        usdc_amounts = []
-        eth_amounts = []
-        timestamps = []
-        prices = []
-        volumes = []
-        processed_block_numbers = []
-        tx_hashes = []
-
-        # Récupérer tous les numéros de blocs uniques
-        block_numbers = list(set(df['block_number'].tolist()))
-        print(f"Nombre de blocs uniques à récupérer : {len(block_numbers)}")
-
-        # Récupérer tous les blocs en une seule passe
-        blocks = {}
-        for bn in block_numbers:
-            try:
-                block = web3.eth.get_block(bn)
-                blocks[bn] = datetime.fromtimestamp(block['timestamp'], tz=pytz.UTC)
-            except Exception as e:
-                print(f"Erreur sur le bloc {bn} : {e}")
-                blocks[bn] = None
-        
-        total_rows = len(df)
-        for index, row in df.iterrows():
-            try:
-                # Afficher la progression
-                print(f"\nTraitement de la ligne {index + 1}/{total_rows}")
+            return None
 
-                # Vérifier que topic0 correspond à la signature de l'event Swap attendue
-                if row['topic0'] != EXPECTED_TOPIC0:
-                    print("Signature de l'événement ne correspond pas à un event de type Swap.")
-                    continue
-                
-                # Décodage du prix
-                usdc, eth, sqrtPriceX96 = decode_swap_event(row['data'])
-                #sqrtPriceX96 = decode_swap_event(row['data'])
-
-                 # Calcul du prix et volume
-                price, volume = calculate_price(sqrtPriceX96, eth, usdc)
-                #price = calculate_price(sqrtPriceX96)
-                
-                # Récupération du timestamp
-                timestamp = blocks.get(row['block_number'])
-                                
-                # Enregistrement des données valides
-                if timestamp:
-                    usdc_amounts.append(usdc)
-                    eth_amounts.append(eth)
-                    volumes.append(volume)
-                    timestamps.append(timestamp)
-                    prices.append(price)
-                    processed_block_numbers.append(row['block_number'])
-                    tx_hashes.append(row['transaction_hash'])
-                
-            except Exception as e:
-                print(f"Erreur lors du traitement de la ligne {index}: {e}")
-                continue
-        
-        print(f"\nNombre de prix valides collectés: {len(prices)}")
-        
-        if len(prices) == 0:
+        result_df = process_log_chunk(
+            df, rpc, engine=engine, batch_size=batch_size, concurrency=concurrency,
+            block_index=block_index, use_slots=use_slots, manifest=manifest
+        )
+
+        print(f"\nNombre de prix valides collectés: {len(result_df)}")
+
+        if result_df.empty:
             print("Aucun prix valide n'a été collecté")
             return pd.DataFrame()
-        
-        # Création du nouveau DataFrame
-        result_df = pd.DataFrame({
-            'timestamp': timestamps,
-            'price_usdc_per_eth': prices,
-            'usdc_amount': usdc_amounts,
-            'eth_amount': eth_amounts,
-            'volume_usdc': volumes,
-            'block_number': processed_block_numbers,
-            'transaction_hash': tx_hashes
-        })
-        
-        print(f"DataFrame créé avec {len(result_df)} lignes")
-        print("\nAperçu des prix:")
-        print(result_df['price_usdc_per_eth'].describe())
-        
+
         return result_df
         
+    except BlockTimestampError:
+        raise
     except Exception as e:
         print(f"Erreur générale dans process_uniswap_logs: {e}")
-        return pd.DataFrame()
+        return None
 
-def main(output_filename='uniswap_eth_usd_last.csv'):
+class PriceWriter:
     """
-    Fonction principale pour traiter tous les fichiers CSV du dossier output
+    Écriture des prix décodés morceau par morceau : ajout en fin de CSV, jeu
+    Parquet partitionné et barres OHLCV / VWAP ; les blocs du morceau sont
+    ensuite marqués comme traités dans le manifeste (s'il y en a un).
+    track_stats : tenir à jour le manifeste annexe du CSV (dataset_manifest.py),
+    pour un jeu de données cumulé. bars_prefix : nom du pool dans celui des
+    fichiers de barres (<préfixe>_bars_<intervalle>.csv).
     """
-    
-    if not csv_files:
-        print("Aucun fichier CSV trouvé dans le dossier 'output'")
-        return None
-    
-    print(f"Fichiers CSV trouvés: {len(csv_files)}")
-    for f in csv_files:
-        print(f"- {f}")
-    
-    # Initialisation de la connexion Web3
-    web3 = Web3(Web3.HTTPProvider(RPC_URL))
-    if not web3.is_connected():
-        print(f"ERREUR: impossible de se connecter à l'endpoint RPC '{RPC_URL}'", file=sys.stderr)
-        sys.exit(1)
 
-    print(f"Connexion au réseau établie: {web3.is_connected()}")
-    
-    all_prices = pd.DataFrame()
-    
-    for csv_file in csv_files:
-        prices = process_uniswap_logs(csv_file, web3)
+    def __init__(self, output_path, output_format="csv", parquet_dir=os.path.join(DEFAULT_PARQUET_DIR, 'uniswap'),
+                 partition="month", bar_intervals=(), manifest=None, track_stats=False, bars_prefix=BARS_PREFIX):
+        self.output_path = output_path
+        self.write_csv = output_format in ("csv", "both")
+        self.write_parquet = output_format in ("parquet", "both")
+        self.parquet_dir = parquet_dir
+        self.partition = partition
+        self.bar_intervals = tuple(bar_intervals)
+        self.bars_dir = os.path.dirname(output_path)
+        self.manifest = manifest
+        self.track_stats = track_stats and self.write_csv
+        self.bars_prefix = bars_prefix
+
+    def bars_path(self, interval):
+        return bars_path(interval, self.bars_dir, self.bars_prefix)
+
+    def reset(self):
+        """
+        Supprime le CSV et les fichiers de barres existants (sortie réécrite).
+        """
+        if self.write_csv and os.path.exists(self.output_path):
+            os.remove(self.output_path)
+        for interval in self.bar_intervals:
+            if os.path.exists(self.bars_path(interval)):
+                os.remove(self.bars_path(interval))
+
+    def write(self, prices, first_block, last_block):
+        """
+        Écrit un morceau de prix puis marque ses blocs comme traités. Retourne le nombre de lignes écrites.
+        """
+        # Ajout en fin de fichier : l'en-tête n'est écrit que pour un fichier nouveau
         if not prices.empty:
-            all_prices = pd.concat([all_prices, prices])
-    
-    if all_prices.empty:
-        print("Aucune donnée n'a été traitée.")
-        return None
-    
+            with METRICS.stage("write"):
+                if self.write_csv:
+                    write_header = not os.path.exists(self.output_path) or os.path.getsize(self.output_path) == 0
+                    prices.to_csv(self.output_path, mode='a', header=write_header, index=False)
+                    if self.track_stats:
+                        dataset_stats(self.output_path)
+                if self.write_parquet:
+                    append_partitioned(prices, self.parquet_dir, 'uniswap', self.partition)
+            if self.bar_intervals:
+                with METRICS.stage("bars"):
+                    # Barres : seule la barre ouverte est réécrite, les suivantes sont ajoutées
+                    for interval in self.bar_intervals:
+                        update_bars_file(self.bars_path(interval), prices, interval)
+            METRICS.rows("uniswap", "written", len(prices))
+
+        # Les blocs du morceau sont marqués comme traités une fois les lignes écrites
+        if self.manifest is not None:
+            self.manifest.cover(first_block, last_block)
+        return len(prices)
+
+def main(output_filename='uniswap_eth_usd_last.csv', engine="vectorized", batch_size=100, concurrency=4,
+         block_index_path=DEFAULT_INDEX_PATH, use_slots=True, manifest_path=DEFAULT_MANIFEST_PATH,
+         chunk_size=DEFAULT_CHUNK_SIZE, output_format="csv",
+         parquet_dir=os.path.join(DEFAULT_PARQUET_DIR, 'uniswap'), partition="month",
+         source="rpc", from_block=None, to_block=None, since=None, log_chunk_size=DEFAULT_LOG_CHUNK_SIZE,
+         workers=1, bar_intervals=(), progress_interval=DEFAULT_PROGRESS_INTERVAL, rpc=None,
+         pools=None, registry_path=DEFAULT_REGISTRY_PATH):
+    """
+    Fonction principale : lit les events Swap et écrit les prix.
+
+    source : "rpc" (par défaut) lit les logs du pool par eth_getLogs, tranche de
+    blocs par tranche ; "cryo" traite les fichiers CSV du dossier output.
+    Dans les deux cas le traitement est en flux (tranches de `log_chunk_size`
+    blocs, ou morceaux de `chunk_size` lignes) et chaque morceau est écrit dès
+    qu'il est prêt : la mémoire reste bornée.
+    output_format : "csv" (par défaut), "parquet" (jeu partitionné sous parquet_dir) ou "both".
+    workers : nombre de processus de décodage (1 : tout dans le processus courant).
+    Le processus parent garde la lecture, les timestamps de blocs et l'écriture ;
+    la sortie est identique quel que soit le nombre de processus.
+    bar_intervals : intervalles des barres OHLCV / VWAP (ex. ("1m", "1h", "1d"))
+    mises à jour avec chaque morceau écrit, dans data/uniswap_eth_usd_bars_<intervalle>.csv.
+    progress_interval : secondes minimales entre deux lignes de progression.
+    rpc : PooledRpcClient déjà ouvert, partagé avec les autres étapes du
+    pipeline (défaut: pool créé depuis la variable d'environnement RPC).
+
+    pools : noms de pools du registre (registry_path, voir registry.py)
+    extraits en une seule passe : les mêmes requêtes eth_getLogs (ou la même
+    lecture des fichiers cryo) servent à tous les pools, les timestamps de
+    blocs sont récupérés une fois, puis chaque pool est décodé avec ses
+    décimales et son sens de cotation. Chaque pool a ses propres fichiers
+    (data/<pool>_last.csv, barres, jeu Parquet) et son propre manifeste ;
+    output_filename et parquet_dir sont alors ignorés, manifest_path à None
+    désactive les manifestes. since peut être un dictionnaire {pool: timestamp}.
+    Sans pools : le pool par défaut du registre, avec les chemins donnés.
+
+    Source RPC : la plage lue va de from_block (ou du premier bloc après le
+    timestamp `since`, ou du bloc qui suit le dernier bloc couvert par le
+    manifeste) jusqu'à to_block ou la tête de chaîne.
+
+    Mode incrémental (manifest_path défini) : les fichiers et blocs déjà traités
+    sont ignorés et les nouveaux prix sont ajoutés à la fin du fichier de sortie.
+    Sans manifeste, la sortie est réécrite.
+    Retourne le nombre de lignes écrites.
+    """
+    try:
+        registry = Registry.load(registry_path)
+        selected = [registry.pool(name) for name in (pools or [DEFAULT_POOL])]
+    except ValueError as e:
+        print(f"ERREUR: {e}", file=sys.stderr)
+        sys.exit(1)
+    if pools is None:
+        manifests = [ProcessingManifest(manifest_path) if manifest_path else None]
+    else:
+        manifests = [ProcessingManifest(pool.manifest_path) if manifest_path else None for pool in selected]
+    # Un seul pool : son manifeste ; plusieurs : les lignes sont rapprochées de leur manifeste par l'adresse
+    manifest = manifests[0] if len(selected) == 1 else {
+        pool.address.lower(): pool_manifest for pool, pool_manifest in zip(selected, manifests)
+    } if manifest_path else None
+
+    if source == "cryo":
+        csv_files = glob.glob(pattern)
+        if not csv_files:
+            print("Aucun fichier CSV trouvé dans le dossier 'output'")
+            return None
+
+        # Un fichier est à traiter tant qu'un des pools ne l'a pas enregistré
+        pending_files = sorted(f for f in csv_files if not all(m is not None and m.is_processed(f) for m in manifests))
+
+        print(f"Fichiers CSV trouvés: {len(csv_files)}, à traiter: {len(pending_files)}")
+        for f in pending_files:
+            print(f"- {f}")
+
+        if not pending_files:
+            print("Tous les fichiers ont déjà été traités.")
+            return 0
+
+    # Lecture de la variable d'environnement RPC (un endpoint, ou plusieurs séparés par des virgules)
+    RPC_URL = os.environ.get("RPC", "")
+    if rpc is None and not RPC_URL:
+        print("ERREUR: la variable d'environnement 'RPC' n'est pas définie.", file=sys.stderr)
+        sys.exit(1)
+
+    # Initialisation du client JSON-RPC (pool d'endpoints : limites de débit, bascule sur 429 / 5xx)
+    try:
+        if rpc is None:
+            rpc = PooledRpcClient(RPC_URL, pool_size=concurrency, rate=rate_limit_from_env())
+        rpc.call("eth_blockNumber", [])
+    except ValueError as e:
+        print(f"ERREUR: variable RPC ou RPC_RATE_LIMIT invalide: {e}", file=sys.stderr)
+        sys.exit(1)
+    except RpcError as e:
+        print(f"ERREUR: impossible de se connecter à l'endpoint RPC '{RPC_URL}': {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print("Connexion au réseau établie: True")
+
+    # Index persistant des timestamps de blocs (désactivé si block_index_path est None)
+    block_index = BlockTimestampIndex(block_index_path) if block_index_path else None
 
     # Construction du chemin vers le dossier `data/`
     here2 = os.path.dirname(__file__)
     data_dir2 = os.path.normpath(os.path.join(here2, os.pardir, 'data'))
     output_path = os.path.join(data_dir2, output_filename)
 
-    all_prices.to_csv(output_path, index=False)
+    if pools is None:
+        writers = [PriceWriter(output_path, output_format, parquet_dir, partition, bar_intervals, manifests[0])]
+    else:
+        writers = [
+            PriceWriter(pool.last_path, output_format, pool.parquet_dir, partition, bar_intervals, pool_manifest,
+                        bars_prefix=pool.name)
+            for pool, pool_manifest in zip(selected, manifests)
+        ]
+    for writer in writers:
+        if writer.manifest is None:
+            writer.reset()
+
+    def write_prices(prices, first_block, last_block, starts=None):
+        """
+        Écrit les prix de chaque pool ; starts : premier bloc à écrire par pool
+        (les blocs antérieurs de la passe commune ne le concernent pas).
+        Retourne le nombre de lignes écrites par pool.
+        """
+        rows = [0] * len(selected)
+        for i, (pool, writer) in enumerate(zip(selected, writers)):
+            start = first_block if starts is None else max(first_block, starts[i])
+            if start > last_block:
+                continue
+            pool_prices = prices[pool.name]
+            if start > first_block and not pool_prices.empty:
+                pool_prices = pool_prices[pool_prices['block_number'] >= start]
+            rows[i] = writer.write(pool_prices, start, last_block)
+        return rows
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    if executor is not None:
+        print(f"Décodage parallèle : {workers} processus")
+    options = dict(
+        engine=engine, batch_size=batch_size, concurrency=concurrency,
+        block_index=block_index, use_slots=use_slots, manifest=manifest,
+        executor=executor, max_pending=2 * workers, progress_interval=progress_interval, pools=selected
+    )
+    total_rows = 0
+    try:
+        if source == "rpc":
+            try:
+                # Plage de chaque pool ; la passe commune va du premier bloc le plus ancien au dernier bloc commun
+                block_ranges = []
+                for pool, pool_manifest in zip(selected, manifests):
+                    pool_since = since.get(pool.name) if isinstance(since, dict) else since
+                    block_range = resolve_block_range(rpc, pool_manifest, from_block, to_block, pool_since)
+                    if block_range is None:
+                        print(f"ERREUR: aucun point de départ pour {pool.name} "
+                              "(--from-block, --since ou manifeste avec des blocs couverts).", file=sys.stderr)
+                        sys.exit(1)
+                    block_ranges.append(block_range)
+                starts = [first for first, _ in block_ranges]
+                first_block, last_block = min(starts), min(last for _, last in block_ranges)
+                if first_block > last_block:
+                    print(f"Aucun nouveau bloc à lire (dernier bloc: {last_block}).")
+                    return 0
+                for prices, chunk_first, chunk_last in iter_rpc_uniswap_prices(
+                    rpc, first_block, last_block, log_chunk_size=log_chunk_size, **options
+                ):
+                    total_rows += sum(write_prices(prices, chunk_first, chunk_last, starts))
+            except (BlockTimestampError, RpcError) as e:
+                # Les tranches déjà écrites restent marquées dans le manifeste : la reprise repartira d'ici
+                print(f"ERREUR: lecture des logs par eth_getLogs: {e}", file=sys.stderr)
+                sys.exit(1)
+        else:
+            for csv_file in pending_files:
+                file_rows = [0] * len(selected)
+                try:
+                    for prices, first_block, last_block in iter_uniswap_prices(csv_file, rpc, chunk_size=chunk_size, **options):
+                        file_rows = [a + b for a, b in zip(file_rows, write_prices(prices, first_block, last_block))]
+                except BlockTimestampError as e:
+                    print(f"ERREUR: {csv_file}: {e}", file=sys.stderr)
+                    sys.exit(1)
+                except Exception as e:
+                    print(f"Erreur générale sur {csv_file}: {e}")
+                    print(f"Fichier ignoré (non enregistré dans le manifeste): {csv_file}")
+                    continue
+
+                total_rows += sum(file_rows)
+                block_range = block_range_from_filename(csv_file)
+                first_block, last_block = block_range if block_range is not None else (None, None)
+                for pool_manifest, pool_rows in zip(manifests, file_rows):
+                    if pool_manifest is not None:
+                        pool_manifest.record(csv_file, first_block, last_block, pool_rows)
+    finally:
+        # Aussi sur les sorties en erreur (sys.exit) : les processus de travail sont arrêtés
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if total_rows == 0:
+        print("Aucune donnée n'a été traitée.")
+        return 0
 
-    print(f"\nFichier CSV créé: {output_path}")
-    print(f"Nombre total d'événements traités: {len(all_prices)}")
+    for writer in writers:
+        if writer.write_csv:
+            print(f"\nFichier CSV mis à jour: {writer.output_path}")
+        if writer.write_parquet:
+            print(f"\nJeu de données Parquet mis à jour: {writer.parquet_dir}")
+        for interval in bar_intervals:
+            print(f"Barres {interval} mises à jour: {writer.bars_path(interval)}")
+    print(f"Nombre total d'événements traités: {total_rows}")
     
-    return all_prices
+    return total_rows
 
 if __name__ == "__main__":
-    prices_df = main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Traitement des events Swap Uniswap V3 (eth_getLogs ou fichiers cryo).")
+    parser.add_argument(
+        "--source",
+        choices=["rpc", "cryo"],
+        default="rpc",
+        help="Lecture des logs par eth_getLogs (par défaut) ou des fichiers cryo de data/output."
+    )
+    parser.add_argument(
+        "--from-block",
+        type=int,
+        default=None,
+        help="Source RPC : premier bloc à lire (défaut: bloc suivant le dernier bloc couvert par le manifeste)."
+    )
+    parser.add_argument(
+        "--to-block",
+        type=int,
+        default=None,
+        help="Source RPC : dernier bloc à lire (défaut: tête de chaîne)."
+    )
+    parser.add_argument(
+        "--since",
+        type=int,
+        default=None,
+        help="Source RPC : timestamp UNIX de début, converti en numéro de bloc (ignoré avec --from-block)."
+    )
+    parser.add_argument(
+        "--log-chunk-size",
+        type=int,
+        default=DEFAULT_LOG_CHUNK_SIZE,
+        help=f"Source RPC : blocs par requête eth_getLogs, réduit si le nœud refuse (défaut: {DEFAULT_LOG_CHUNK_SIZE})."
+    )
+    parser.add_argument(
+        "--pools",
+        nargs='+',
+        default=None,
+        help="Pools du registre extraits en une seule passe, chacun dans data/<pool>_last.csv "
+             "avec son manifeste (défaut: le pool ETH/USDC, sorties et manifeste historiques)."
+    )
+    parser.add_argument(
+        "--registry",
+        default=DEFAULT_REGISTRY_PATH,
+        help="Registre des pools et des flux (défaut: scripts/registry.json)."
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["vectorized", "reference"],
+        default="vectorized",
+        help="Moteur de décodage : vectorisé (par défaut) ou référence mpmath ligne par ligne."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processus de décodage en parallèle (défaut: 1, tout dans le processus courant)."
+    )
+    parser.add_argument(
+        "--bars",
+        nargs='+',
+        choices=list(BAR_INTERVALS),
+        default=[],
+        help="Intervalles des barres OHLCV / VWAP à tenir à jour (ex. --bars 1m 1h 1d ; défaut: aucune)."
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100,
+        help="Nombre d'appels eth_getBlockByNumber par requête batch JSON-RPC (défaut: 100)."
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Nombre de requêtes batch envoyées en parallèle (défaut: 4)."
+    )
+    parser.add_argument(
+        "--block-index",
+        default=DEFAULT_INDEX_PATH,
+        help=f"Index SQLite persistant bloc → timestamp (défaut: {DEFAULT_INDEX_PATH})."
+    )
+    parser.add_argument(
+        "--no-block-index",
+        action="store_true",
+        help="Ne pas utiliser l'index persistant (tous les timestamps sont demandés au RPC)."
+    )
+    parser.add_argument(
+        "--no-slot-resolver",
+        action="store_true",
+        help="Récupérer chaque bloc par RPC au lieu de déduire les timestamps post-Merge des slots de 12 s."
+    )
+    parser.add_argument(
+        "--manifest",
+        default=DEFAULT_MANIFEST_PATH,
+        help=f"Manifeste des fichiers cryo déjà traités (défaut: {DEFAULT_MANIFEST_PATH})."
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignorer le manifeste : retraiter tous les fichiers et réécrire la sortie."
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Lignes de logs lues par morceau ; borne la mémoire utilisée (défaut: {DEFAULT_CHUNK_SIZE})."
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=["csv", "parquet", "both"],
+        default="csv",
+        help="Format de sortie : CSV (par défaut), Parquet partitionné, ou les deux."
+    )
+    parser.add_argument(
+        "--parquet-dir",
+        default=os.path.join(DEFAULT_PARQUET_DIR, 'uniswap'),
+        help="Répertoire du jeu de données Parquet (défaut: data/parquet/uniswap)."
+    )
+    parser.add_argument(
+        "--partition",
+        choices=sorted(PARTITION_FORMATS),
+        default="month",
+        help="Granularité des partitions Parquet (défaut: month)."
+    )
+    parser.add_argument(
+        "--metrics-dir",
+        default=None,
+        help="Répertoire où écrire metrics_uniswap.json et metrics_uniswap.prom en fin d'exécution (défaut: aucun)."
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=DEFAULT_PROGRESS_INTERVAL,
+        help=f"Secondes minimales entre deux lignes de progression (défaut: {DEFAULT_PROGRESS_INTERVAL:g})."
+    )
+    args = parser.parse_args()
+    if args.metrics_dir:
+        export_at_exit(args.metrics_dir, "uniswap")
+    written_rows = main(
+        engine=args.engine,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        block_index_path=None if args.no_block_index else args.block_index,
+        use_slots=not args.no_slot_resolver,
+        manifest_path=None if args.full else args.manifest,
+        chunk_size=args.chunk_size,
+        output_format=args.output_format,
+        parquet_dir=args.parquet_dir,
+        partition=args.partition,
+        source=args.source,
+        from_block=args.from_block,
+        to_block=args.to_block,
+        since=args.since,
+        log_chunk_size=args.log_chunk_size,
+        workers=args.workers,
+        bar_intervals=args.bars,
+        progress_interval=args.progress_interval,
+        pools=args.pools,
+        registry_path=args.registry
+    )
\ No newline at end of file
@@ -0,0 +1,225 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Jointure « as-of » des prix Uniswap avec les rounds Chainlink.
+
+À chaque swap (ou à chaque barre de bars.py) est associé le dernier round
+Chainlink publié à ou avant son timestamp, avec :
+
+    oracle_round_id   : global_round_id du round
+    oracle_price      : prix Chainlink du round
+    oracle_updated_at : datetime_utc du round
+    staleness_s       : âge du round au moment du swap, en secondes
+    deviation_bps     : (prix Uniswap - prix Chainlink) / prix Chainlink × 10 000
+
+Les deux CSV étant triés par temps, la jointure se fait en une seule passe
+(fusion triée) : les swaps sont lus par morceaux, les rounds au fur et à
+mesure, et seuls les rounds encore utiles (à partir du dernier round
+associé) restent en mémoire. La mémoire ne dépend pas de la taille des
+fichiers. Les swaps antérieurs au premier round n'ont pas de valeurs oracle.
+
+Avec --pool, les prix d'un pool du registre (registry.py) sont joints aux
+rounds de son flux Chainlink de référence.
+
+    python3 scripts/asof_join.py
+    python3 scripts/asof_join.py --bars 1h
+    python3 scripts/asof_join.py --pool uniswap_btc_usd
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bars import DATA_DIR, INTERVALS, bars_path, epoch_seconds
+from registry import DEFAULT_REGISTRY_PATH, Registry
+
+DEFAULT_CHAINLINK_PATH = os.path.join(DATA_DIR, 'chainlink_eth_usd.csv')
+DEFAULT_UNISWAP_PATH = os.path.join(DATA_DIR, 'uniswap_eth_usd.csv')
+DEFAULT_CHUNK_SIZE = 200_000  # Swaps (ou barres) joints par morceau
+
+ORACLE_COLUMNS = ['oracle_round_id', 'oracle_price', 'oracle_updated_at', 'staleness_s', 'deviation_bps']
+
+
+class RoundStream:
+    """
+    Rounds Chainlink lus par morceaux dans l'ordre du temps ; seuls les rounds
+    encore nécessaires à la jointure sont conservés.
+    """
+
+    def __init__(self, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._reader = pd.read_csv(
+            path, usecols=['global_round_id', 'datetime_utc', 'price'], chunksize=chunk_size,
+            dtype={'global_round_id': str, 'datetime_utc': str}, float_precision='round_trip'
+        )
+        self.seconds = np.empty(0, dtype=np.int64)
+        self.prices = np.empty(0, dtype=np.float64)
+        self.round_ids = np.empty(0, dtype=object)
+        self.updated_at = np.empty(0, dtype=object)
+        self.exhausted = False
+
+    def close(self) -> None:
+        self._reader.close()
+
+    def load_until(self, seconds: int) -> None:
+        """
+        Lit des rounds jusqu'à en avoir un postérieur à `seconds` (ou jusqu'à la fin du fichier) :
+        tous les rounds publiés à ou avant `seconds` sont alors en mémoire.
+        """
+        while not self.exhausted and (len(self.seconds) == 0 or self.seconds[-1] <= seconds):
+            try:
+                chunk = next(self._reader)
+            except StopIteration:
+                self.exhausted = True
+                break
+            chunk_seconds = epoch_seconds(chunk['datetime_utc'])
+            previous = self.seconds[-1:] if len(self.seconds) else chunk_seconds[:1]
+            if np.any(np.diff(np.concatenate((previous, chunk_seconds))) < 0):
+                raise ValueError("les rounds Chainlink ne sont pas triés par datetime_utc")
+            self.seconds = np.concatenate((self.seconds, chunk_seconds))
+            self.prices = np.concatenate((self.prices, chunk['price'].to_numpy(dtype=np.float64)))
+            self.round_ids = np.concatenate((self.round_ids, chunk['global_round_id'].to_numpy(dtype=object)))
+            self.updated_at = np.concatenate((self.updated_at, chunk['datetime_utc'].to_numpy(dtype=object)))
+
+    def discard_before(self, index: int) -> None:
+        """
+        Oublie les rounds d'indice < index (plus aucun swap à venir ne peut les utiliser).
+        """
+        if index > 0:
+            self.seconds = self.seconds[index:]
+            self.prices = self.prices[index:]
+            self.round_ids = self.round_ids[index:]
+            self.updated_at = self.updated_at[index:]
+
+
+def join_chunk(chunk: pd.DataFrame, seconds: np.ndarray, prices: np.ndarray, rounds: RoundStream) -> pd.DataFrame:
+    """
+    Ajoute les colonnes oracle à un morceau trié par temps (seconds : secondes UNIX
+    des lignes, prices : prix Uniswap comparés au prix Chainlink).
+    """
+    rounds.load_until(int(seconds[-1]))
+    # Dernier round publié à ou avant chaque timestamp (à égalité, le dernier du fichier)
+    position = np.searchsorted(rounds.seconds, seconds, side='right') - 1
+    matched = position >= 0
+    index = np.clip(position, 0, None)
+
+    out = chunk.copy()
+    if len(rounds.seconds) == 0:
+        for column in ORACLE_COLUMNS:
+            out[column] = np.nan
+        return out
+
+    oracle_price = np.where(matched, rounds.prices[index], np.nan)
+    out['oracle_round_id'] = np.where(matched, rounds.round_ids[index], None)
+    out['oracle_price'] = oracle_price
+    out['oracle_updated_at'] = np.where(matched, rounds.updated_at[index], None)
+    out['staleness_s'] = pd.array(seconds - rounds.seconds[index], dtype='Int64')
+    out.loc[~matched, 'staleness_s'] = pd.NA
+    out['deviation_bps'] = (prices - oracle_price) / oracle_price * 10_000
+
+    # Le dernier round associé peut encore servir au morceau suivant
+    rounds.discard_before(int(position[-1]) if matched.any() else 0)
+    return out
+
+
+def asof_join(uniswap_path: str, chainlink_path: str, output_path: str, interval=None,
+              chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Écrit dans output_path les lignes de uniswap_path (swaps, ou barres de
+    l'intervalle `interval`) complétées des colonnes oracle. Une barre est
+    jointe au dernier round publié avant sa fin et comparée à son prix de clôture.
+    Lève ValueError si l'un des fichiers n'est pas trié par temps.
+    Retourne le nombre de lignes écrites.
+    """
+    if interval is None:
+        time_column, price_column, offset = 'timestamp', 'price_usdc_per_eth', 0
+    else:
+        time_column, price_column, offset = 'bar_start', 'close', INTERVALS[interval] - 1
+
+    rounds = RoundStream(chainlink_path, chunk_size)
+    tmp_path = output_path + '.tmp'
+    rows, last_seconds = 0, None
+    try:
+        with pd.read_csv(uniswap_path, chunksize=chunk_size, dtype={time_column: str},
+                         float_precision='round_trip') as reader:
+            for chunk in reader:
+                seconds = epoch_seconds(chunk[time_column]) + offset
+                if np.any(np.diff(seconds) < 0) or (last_seconds is not None and seconds[0] < last_seconds):
+                    raise ValueError(f"{uniswap_path} n'est pas trié par {time_column}")
+                last_seconds = seconds[-1]
+                prices = pd.to_numeric(chunk[price_column], errors='coerce').to_numpy(dtype=np.float64)
+                joined = join_chunk(chunk, seconds, prices, rounds)
+                joined.to_csv(tmp_path, mode='w' if rows == 0 else 'a', header=rows == 0, index=False)
+                rows += len(joined)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        rounds.close()
+
+    if rows:
+        os.replace(tmp_path, output_path)
+    return rows
+
+
+def default_output_path(interval=None, pool=None) -> str:
+    """
+    data/uniswap_chainlink_asof.csv, ou data/uniswap_chainlink_asof_bars_<intervalle>.csv ;
+    pour un pool du registre : data/<pool>_<flux>_asof[_bars_<intervalle>].csv.
+    """
+    suffix = '' if interval is None else f'_bars_{interval}'
+    if pool is not None:
+        return os.path.join(pool.data_dir, f'{pool.name}_{pool.feed}_asof{suffix}.csv')
+    return os.path.join(DATA_DIR, f'uniswap_chainlink_asof{suffix}.csv')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Jointure as-of des prix Uniswap avec les rounds Chainlink.")
+    parser.add_argument("--uniswap", default=None,
+                        help="CSV des swaps (défaut: data/uniswap_eth_usd.csv, ou le fichier de barres avec --bars).")
+    parser.add_argument("--chainlink", default=None,
+                        help="CSV des rounds Chainlink (défaut: data/chainlink_eth_usd.csv, ou le flux du pool avec --pool).")
+    parser.add_argument("--pool", default=None,
+                        help="Pool du registre : ses swaps (ou ses barres) et les rounds de son flux Chainlink.")
+    parser.add_argument("--registry", default=DEFAULT_REGISTRY_PATH,
+                        help="Registre des pools et des flux (défaut: scripts/registry.json).")
+    parser.add_argument("--bars", choices=list(INTERVALS), default=None,
+                        help="Joindre les barres de cet intervalle (prix de clôture) au lieu des swaps.")
+    parser.add_argument("--output", default=None,
+                        help="CSV de sortie (défaut: data/uniswap_chainlink_asof.csv ou data/uniswap_chainlink_asof_bars_<intervalle>.csv).")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Lignes lues par morceau ; borne la mémoire utilisée (défaut: {DEFAULT_CHUNK_SIZE}).")
+    args = parser.parse_args()
+
+    pool = chainlink_path = None
+    if args.pool is not None:
+        try:
+            registry = Registry.load(args.registry)
+            pool = registry.pool(args.pool)
+            if pool.feed is None:
+                raise ValueError(f"pool {pool.name} sans flux Chainlink de référence")
+            chainlink_path = registry.feed(pool.feed).dataset_path
+        except ValueError as e:
+            print(f"ERREUR: {e}", file=sys.stderr)
+            sys.exit(1)
+        swaps_path = pool.dataset_path if args.bars is None else bars_path(args.bars, pool.data_dir, pool.name)
+    else:
+        swaps_path = DEFAULT_UNISWAP_PATH if args.bars is None else bars_path(args.bars)
+    uniswap_path = args.uniswap or swaps_path
+    args.chainlink = args.chainlink or chainlink_path or DEFAULT_CHAINLINK_PATH
+    output_path = args.output or default_output_path(args.bars, pool)
+    for path in (uniswap_path, args.chainlink):
+        if not os.path.exists(path):
+            print(f"ERREUR: fichier {path} introuvable.", file=sys.stderr)
+            sys.exit(1)
+
+    try:
+        written = asof_join(uniswap_path, args.chainlink, output_path, args.bars, args.chunk_size)
+    except ValueError as e:
+        print(f"ERREUR: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Terminé. {written} lignes écrites dans {output_path}.")
@@ -0,0 +1,252 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Barres OHLCV / VWAP des swaps Uniswap décodés.
+
+Pour chaque intervalle (1m, 1h, 1d…) une barre regroupe les swaps dont le
+timestamp tombe dans [bar_start, bar_start + intervalle) :
+
+    open, high, low, close : prix du premier, plus haut, plus bas et dernier swap
+    vwap                   : somme(prix × |eth_amount|) / somme(|eth_amount|)
+    swap_count             : nombre de swaps
+    volume_usdc, volume_eth: volumes échangés
+    last_block             : bloc du dernier swap agrégé dans la barre
+
+L'agrégation est vectorisée (bornes des barres par np.diff, réductions par
+ufunc.reduceat). La mise à jour est incrémentale : seule la dernière barre
+du fichier (la barre ouverte) est relue et réécrite, les nouvelles barres
+sont ajoutées en fin de fichier. Les swaps dont le bloc est déjà couvert
+par `last_block` sont ignorés : rejouer une plage ne compte rien deux fois.
+
+Fichiers écrits à côté des swaps bruts :
+    data/uniswap_eth_usd_bars_1h.csv
+
+Reconstruction depuis le CSV des swaps :
+    python3 scripts/bars.py --input data/uniswap_eth_usd.csv --intervals 1m 1h 1d --rebuild
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from csv_tail import read_last_record, remove_last_line
+
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), os.pardir, 'data'))
+DEFAULT_PREFIX = 'uniswap_eth_usd'
+DEFAULT_CHUNK_SIZE = 1_000_000  # Swaps lus par morceau lors d'une reconstruction
+
+# Durée des intervalles, en secondes
+INTERVALS = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "1h": 3_600,
+    "4h": 14_400,
+    "1d": 86_400,
+}
+
+BAR_COLUMNS = ['bar_start', 'open', 'high', 'low', 'close', 'vwap', 'swap_count',
+               'volume_usdc', 'volume_eth', 'last_block']
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S+00:00'  # Même format que la colonne timestamp des swaps
+
+
+def bars_path(interval: str, directory: str = DATA_DIR, prefix: str = DEFAULT_PREFIX) -> str:
+    """
+    Chemin du fichier de barres d'un intervalle : <directory>/<prefix>_bars_<interval>.csv.
+    """
+    return os.path.join(directory, f"{prefix}_bars_{interval}.csv")
+
+
+def epoch_seconds(timestamps) -> np.ndarray:
+    """
+    Timestamps (datetime, Timestamp ou texte ISO) → secondes UNIX (int64).
+    """
+    parsed = pd.Series(timestamps)
+    # Colonne déjà en datetime64 : pas de conversion (to_datetime coûte cher sur des millions de lignes)
+    if not isinstance(parsed.dtype, pd.DatetimeTZDtype):
+        parsed = pd.to_datetime(parsed, utc=True, format='ISO8601')
+    return parsed.dt.tz_convert(None).to_numpy(dtype='datetime64[s]').astype(np.int64)
+
+
+def aggregate_bars(swaps: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Barres de l'intervalle pour un DataFrame de swaps (colonnes timestamp,
+    price_usdc_per_eth, eth_amount, volume_usdc, block_number).
+
+    bar_start est en secondes UNIX ; la colonne price_volume (somme de
+    prix × |eth_amount|) sert à fusionner la barre ouverte avec la suivante.
+    """
+    width = INTERVALS[interval]
+    seconds = epoch_seconds(swaps['timestamp'])
+    price = pd.to_numeric(swaps['price_usdc_per_eth'], errors='coerce').to_numpy(dtype=np.float64)
+    volume_eth = np.abs(pd.to_numeric(swaps['eth_amount'], errors='coerce').to_numpy(dtype=np.float64))
+    volume_usdc = pd.to_numeric(swaps['volume_usdc'], errors='coerce').to_numpy(dtype=np.float64)
+    blocks = swaps['block_number'].to_numpy(dtype=np.int64)
+
+    valid = np.isfinite(price) & np.isfinite(volume_eth) & np.isfinite(volume_usdc)
+    if not valid.all():
+        seconds, price, volume_eth, volume_usdc, blocks = (
+            a[valid] for a in (seconds, price, volume_eth, volume_usdc, blocks)
+        )
+    if len(seconds) == 0:
+        return pd.DataFrame(columns=BAR_COLUMNS + ['price_volume'])
+
+    # Les swaps arrivent dans l'ordre de la chaîne ; tri stable seulement si besoin
+    if np.any(np.diff(seconds) < 0):
+        order = np.argsort(seconds, kind='stable')
+        seconds, price, volume_eth, volume_usdc, blocks = (
+            a[order] for a in (seconds, price, volume_eth, volume_usdc, blocks)
+        )
+
+    starts = seconds - seconds % width
+    first = np.concatenate(([0], np.flatnonzero(np.diff(starts)) + 1))
+    last = np.concatenate((first[1:] - 1, [len(starts) - 1]))
+
+    price_volume = np.add.reduceat(price * volume_eth, first)
+    total_eth = np.add.reduceat(volume_eth, first)
+    close = price[last]
+    return pd.DataFrame({
+        'bar_start': starts[first],
+        'open': price[first],
+        'high': np.maximum.reduceat(price, first),
+        'low': np.minimum.reduceat(price, first),
+        'close': close,
+        'vwap': _vwap(price_volume, total_eth, close),
+        'swap_count': last - first + 1,
+        'volume_usdc': np.add.reduceat(volume_usdc, first),
+        'volume_eth': total_eth,
+        'last_block': np.maximum.reduceat(blocks, first),
+        'price_volume': price_volume,
+    })
+
+
+def _vwap(price_volume, volume_eth, close):
+    """
+    VWAP ; prix de clôture pour une barre sans volume.
+    """
+    vwap = np.array(close, dtype=np.float64, copy=True)
+    np.divide(price_volume, volume_eth, out=vwap, where=volume_eth > 0)
+    return vwap
+
+
+def _merge_open_bar(open_bar: dict, bars: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fusionne la barre ouverte lue dans le fichier avec la première nouvelle barre (même bar_start).
+    """
+    bars = bars.copy()
+    row = bars.index[0]
+    volume_eth = float(open_bar['volume_eth'])
+    bars.at[row, 'open'] = float(open_bar['open'])
+    bars.at[row, 'high'] = max(float(open_bar['high']), bars.at[row, 'high'])
+    bars.at[row, 'low'] = min(float(open_bar['low']), bars.at[row, 'low'])
+    bars.at[row, 'swap_count'] += int(open_bar['swap_count'])
+    bars.at[row, 'volume_usdc'] += float(open_bar['volume_usdc'])
+    bars.at[row, 'volume_eth'] += volume_eth
+    bars.at[row, 'price_volume'] += float(open_bar['vwap']) * volume_eth
+    bars['vwap'] = _vwap(bars['price_volume'].to_numpy(), bars['volume_eth'].to_numpy(), bars['close'].to_numpy())
+    return bars
+
+
+def format_bars(bars: pd.DataFrame) -> pd.DataFrame:
+    """
+    Barres au format du fichier CSV (bar_start en texte UTC, sans colonne de travail).
+    """
+    out = bars[BAR_COLUMNS].copy()
+    out['bar_start'] = pd.to_datetime(out['bar_start'].to_numpy(dtype=np.int64), unit='s', utc=True).strftime(TIMESTAMP_FORMAT)
+    return out
+
+
+def update_bars_file(path: str, swaps: pd.DataFrame, interval: str) -> int:
+    """
+    Ajoute des swaps au fichier de barres : la dernière barre est réécrite si elle
+    reçoit de nouveaux swaps, les barres suivantes sont ajoutées en fin de fichier.
+    Les swaps d'un bloc déjà couvert (<= last_block de la dernière barre) sont ignorés.
+    Retourne le nombre de barres écrites (barre ouverte réécrite comprise).
+    """
+    open_bar = read_last_record(path) if os.path.exists(path) else None
+    if open_bar is not None:
+        swaps = swaps[swaps['block_number'].to_numpy(dtype=np.int64) > int(open_bar['last_block'])]
+    if swaps.empty:
+        return 0
+
+    bars = aggregate_bars(swaps, interval)
+    if bars.empty:
+        return 0
+
+    if open_bar is not None:
+        open_start = int(epoch_seconds([open_bar['bar_start']])[0])
+        late = bars['bar_start'] < open_start
+        if late.any():
+            print(f"Barres {interval} : {int(bars.loc[late, 'swap_count'].sum())} swap(s) antérieurs "
+                  f"à la barre ouverte ignorés")
+            bars = bars[~late].reset_index(drop=True)
+            if bars.empty:
+                return 0
+        if bars['bar_start'].iat[0] == open_start:
+            bars = _merge_open_bar(open_bar, bars)
+            remove_last_line(path)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+    format_bars(bars).to_csv(path, mode='a', header=write_header, index=False)
+    return len(bars)
+
+
+def build_bars(swaps_path: str, intervals, directory: str = DATA_DIR, prefix: str = DEFAULT_PREFIX,
+               chunk_size: int = DEFAULT_CHUNK_SIZE, rebuild: bool = False) -> dict:
+    """
+    Met à jour (ou reconstruit avec rebuild=True) les fichiers de barres depuis
+    le CSV des swaps, lu par morceaux de chunk_size lignes.
+    Retourne {intervalle: nombre de barres écrites}.
+    """
+    paths = {interval: bars_path(interval, directory, prefix) for interval in intervals}
+    if rebuild:
+        for path in paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+
+    written = dict.fromkeys(intervals, 0)
+    columns = ['timestamp', 'price_usdc_per_eth', 'eth_amount', 'volume_usdc', 'block_number']
+    carry = None
+    with pd.read_csv(swaps_path, usecols=columns, chunksize=chunk_size, float_precision='round_trip') as reader:
+        for chunk in reader:
+            if carry is not None:
+                chunk = pd.concat([carry, chunk], ignore_index=True)
+            # Les swaps du dernier bloc passent au morceau suivant : un bloc n'est jamais coupé
+            last_block = chunk['block_number'].iat[-1]
+            tail = chunk['block_number'] == last_block
+            carry, chunk = chunk[tail], chunk[~tail]
+            for interval, path in paths.items():
+                written[interval] += update_bars_file(path, chunk, interval)
+    if carry is not None:
+        for interval, path in paths.items():
+            written[interval] += update_bars_file(path, carry, interval)
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Barres OHLCV / VWAP à partir du CSV des swaps Uniswap.")
+    parser.add_argument("--input", default=os.path.join(DATA_DIR, f"{DEFAULT_PREFIX}.csv"),
+                        help="CSV des swaps décodés (défaut: data/uniswap_eth_usd.csv).")
+    parser.add_argument("--intervals", nargs='+', choices=list(INTERVALS), default=["1m", "1h", "1d"],
+                        help="Intervalles des barres (défaut: 1m 1h 1d).")
+    parser.add_argument("--output-dir", default=DATA_DIR, help="Répertoire des fichiers de barres (défaut: data).")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Swaps lus par morceau (défaut: {DEFAULT_CHUNK_SIZE}).")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Supprimer les fichiers de barres existants et tout recalculer.")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"ERREUR: fichier {args.input} introuvable.", file=sys.stderr)
+        sys.exit(1)
+
+    written = build_bars(args.input, args.intervals, args.output_dir, chunk_size=args.chunk_size, rebuild=args.rebuild)
+    for interval, count in written.items():
+        print(f"Barres {interval} : {count} écrites dans {bars_path(interval, args.output_dir)}")
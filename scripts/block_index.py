@@ -0,0 +1,169 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Index persistant numéro de bloc → timestamp, partagé entre les exécutions.
+
+Stocké dans une table SQLite (mode WAL : lectures concurrentes possibles
+pendant une écriture). Seuls les blocs effectivement récupérés sont
+enregistrés, les trous dans la plage de blocs ne posent donc aucun problème.
+
+Pré-remplissage d'une plage de blocs :
+    python3 scripts/block_index.py --from 18000000 --to 18100000
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+
+from block_timestamps import fetch_block_timestamps, resolve_block_timestamps
+from metrics import METRICS
+
+DEFAULT_INDEX_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), os.pardir, 'data', 'block_timestamps.sqlite')
+)
+
+# Nombre maximal de paramètres liés par requête SQLite
+_SQL_CHUNK = 500
+
+
+class BlockTimestampIndex:
+    """
+    Table SQLite `blocks(number, timestamp)`.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blocks (number INTEGER PRIMARY KEY, timestamp INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def get_many(self, block_numbers) -> dict:
+        """
+        Retourne {bloc: timestamp} pour les blocs déjà présents dans l'index.
+        """
+        block_numbers = sorted({int(bn) for bn in block_numbers})
+        found = {}
+        for i in range(0, len(block_numbers), _SQL_CHUNK):
+            chunk = block_numbers[i:i + _SQL_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT number, timestamp FROM blocks WHERE number IN ({placeholders})", chunk
+            )
+            found.update(rows)
+        return found
+
+    def put_many(self, timestamps: dict) -> None:
+        """
+        Enregistre {bloc: timestamp} (écrase les entrées existantes).
+        """
+        if not timestamps:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO blocks (number, timestamp) VALUES (?, ?)",
+                ((int(bn), int(ts)) for bn, ts in timestamps.items())
+            )
+
+    def missing_in_range(self, first_block: int, last_block: int) -> list:
+        """
+        Blocs de [first_block, last_block] absents de l'index.
+        """
+        known = {
+            row[0] for row in self._conn.execute(
+                "SELECT number FROM blocks WHERE number BETWEEN ? AND ?", (first_block, last_block)
+            )
+        }
+        return [bn for bn in range(first_block, last_block + 1) if bn not in known]
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM blocks").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def get_block_timestamps(client, block_numbers, index=None, use_slots=True, **fetch_kwargs):
+    """
+    Timestamps des blocs demandés : lus dans l'index, puis obtenus par RPC
+    pour les blocs manquants, qui sont ensuite écrits dans l'index.
+
+    use_slots : résout les blocs post-Merge par arithmétique de slots
+    (resolve_block_timestamps) au lieu d'un appel par bloc.
+    Retourne (timestamps, failed) comme fetch_block_timestamps.
+    """
+    block_numbers = {int(bn) for bn in block_numbers}
+    known = index.get_many(block_numbers) if index is not None else {}
+    missing = block_numbers - known.keys()
+    if index is not None:
+        METRICS.count("block_timestamps_total", len(known), source="index")
+
+    if not missing:
+        fetched, failed = {}, []
+    elif use_slots:
+        # Les blocs déjà indexés servent de points d'ancrage
+        fetched, failed = resolve_block_timestamps(client, missing, anchors=known, **fetch_kwargs)
+    else:
+        fetched, failed = fetch_block_timestamps(client, missing, **fetch_kwargs)
+    if index is not None:
+        index.put_many({bn: ts for bn, ts in fetched.items() if bn not in known})
+
+    known.update(fetched)
+    return known, failed
+
+
+def prefill(index, client, first_block, last_block, chunk_size=10_000, **fetch_kwargs):
+    """
+    Remplit l'index pour toute la plage [first_block, last_block], par tranches.
+    Retourne la liste des blocs en échec.
+    """
+    failed_total = []
+    for start in range(first_block, last_block + 1, chunk_size):
+        end = min(start + chunk_size - 1, last_block)
+        missing = index.missing_in_range(start, end)
+        if not missing:
+            continue
+        fetched, failed = fetch_block_timestamps(client, missing, **fetch_kwargs)
+        index.put_many(fetched)
+        failed_total.extend(failed)
+        print(f"Blocs {start}..{end} : {len(fetched)} ajoutés, {len(failed)} en échec")
+    return failed_total
+
+
+if __name__ == "__main__":
+    from rpc_client import PooledRpcClient, rate_limit_from_env
+
+    parser = argparse.ArgumentParser(description="Pré-remplit l'index persistant bloc → timestamp.")
+    parser.add_argument("--from", dest="first_block", type=int, required=True, help="Premier bloc de la plage.")
+    parser.add_argument("--to", dest="last_block", type=int, required=True, help="Dernier bloc de la plage (inclus).")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help=f"Chemin de l'index SQLite (défaut: {DEFAULT_INDEX_PATH}).")
+    parser.add_argument("--batch-size", type=int, default=100, help="Appels par requête batch JSON-RPC (défaut: 100).")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requêtes batch en parallèle (défaut: 4).")
+    args = parser.parse_args()
+
+    if args.first_block > args.last_block:
+        parser.error("--from doit être inférieur ou égal à --to")
+
+    rpc_url = os.environ.get("RPC", "")
+    if not rpc_url:
+        print("ERREUR: la variable d'environnement 'RPC' n'est pas définie.", file=sys.stderr)
+        sys.exit(1)
+
+    index = BlockTimestampIndex(args.index)
+    failed = prefill(
+        index, PooledRpcClient(rpc_url, pool_size=args.concurrency, rate=rate_limit_from_env()), args.first_block, args.last_block,
+        batch_size=args.batch_size, concurrency=args.concurrency
+    )
+    print(f"Index {args.index} : {len(index)} blocs")
+    index.close()
+    if failed:
+        print(f"ERREUR: {len(failed)} bloc(s) non récupérés: {failed[:20]}", file=sys.stderr)
+        sys.exit(1)
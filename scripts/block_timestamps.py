@@ -0,0 +1,195 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Récupération des timestamps de blocs par requêtes JSON-RPC batch.
+
+Les appels `eth_getBlockByNumber` (sans les transactions) sont regroupés
+par lots de `batch_size`, et jusqu'à `concurrency` lots sont envoyés en
+parallèle. Les blocs en échec sont retentés individuellement ; ceux qui
+échouent encore après `retries` tentatives sont retournés à l'appelant.
+
+Après le Merge, resolve_block_timestamps évite la plupart de ces appels en
+calculant les timestamps à partir des slots de 12 secondes.
+"""
+
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import METRICS
+from range_search import find_last_before
+from rpc_client import RpcError
+
+
+class BlockTimestampError(Exception):
+    """
+    Des timestamps de blocs n'ont pas pu être récupérés.
+    """
+
+    def __init__(self, blocks):
+        self.blocks = sorted(blocks)
+        preview = ", ".join(str(bn) for bn in self.blocks[:10])
+        suffix = "..." if len(self.blocks) > 10 else ""
+        super().__init__(f"{len(self.blocks)} bloc(s) sans timestamp: {preview}{suffix}")
+
+
+def _fetch_batch(client, block_numbers):
+    """
+    Un lot d'appels eth_getBlockByNumber. Retourne ({bloc: timestamp}, [blocs en échec]).
+    """
+    calls = [("eth_getBlockByNumber", [hex(bn), False]) for bn in block_numbers]
+    try:
+        replies = client.batch(calls)
+    except RpcError as e:
+        print(f"Erreur sur le lot de blocs {block_numbers[0]}..{block_numbers[-1]} : {e}")
+        return {}, list(block_numbers)
+
+    timestamps, failed = {}, []
+    for bn, reply in zip(block_numbers, replies):
+        block = reply.get("result") if reply else None
+        if block and block.get("timestamp") is not None:
+            timestamps[bn] = int(block["timestamp"], 16)
+        else:
+            failed.append(bn)
+    return timestamps, failed
+
+
+def fetch_block_timestamps(client, block_numbers, batch_size=100, concurrency=4, retries=3, backoff=0.5):
+    """
+    Récupère les timestamps UNIX d'un ensemble de blocs.
+
+    Retourne (timestamps, failed) : un dict {numéro de bloc: timestamp} et la
+    liste triée des blocs toujours en échec après `retries` nouvelles tentatives.
+    """
+    pending = sorted({int(bn) for bn in block_numbers})
+    timestamps = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            if attempt:
+                print(f"Nouvelle tentative ({attempt}/{retries}) pour {len(pending)} bloc(s)")
+                METRICS.rpc_retry("eth_getBlockByNumber", len(pending))
+                time.sleep(backoff * 2 ** (attempt - 1))
+
+            batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+            failed = []
+            for batch_timestamps, batch_failed in pool.map(lambda b: _fetch_batch(client, b), batches):
+                timestamps.update(batch_timestamps)
+                failed.extend(batch_failed)
+            pending = sorted(failed)
+
+    return timestamps, pending
+
+
+def block_at_timestamp(client, timestamp: int, head_block: int, width: int = 32) -> int:
+    """
+    Dernier bloc dont le timestamp est <= `timestamp` (recherche par
+    interpolation sur les timestamps de blocs, presque linéaires).
+    """
+    def get_timestamps(block_numbers):
+        timestamps, failed = fetch_block_timestamps(client, block_numbers)
+        if failed:
+            raise BlockTimestampError(failed)
+        return {bn: timestamps[bn] for bn in block_numbers}
+    block = find_last_before(get_timestamps, 0, head_block, timestamp, inclusive=True, width=width)
+    return 0 if block is None else block
+
+
+# Depuis le Merge (bloc 15537394), chaque bloc occupe un slot de 12 secondes :
+# timestamp = genèse beacon + 12 * slot, avec des slots strictement croissants.
+MERGE_BLOCK = 15537394
+SLOT_SECONDS = 12
+
+
+def _is_linear(lo, hi, timestamps):
+    """
+    Vrai si aucun slot n'a été manqué entre les blocs lo et hi.
+    Chaque bloc avance d'au moins un slot : l'écart vaut exactement
+    12 * (hi - lo) si et seulement si tous les blocs intermédiaires sont consécutifs.
+    """
+    return timestamps[hi] - timestamps[lo] == SLOT_SECONDS * (hi - lo)
+
+
+def resolve_block_timestamps(client, block_numbers, anchors=None, **fetch_kwargs):
+    """
+    Résout les timestamps des blocs par arithmétique de slots après le Merge.
+
+    Seuls les blocs aux bords de chaque plage sont récupérés par RPC ; une
+    plage dont les extrémités sont alignées sur des slots consécutifs est
+    calculée directement, sinon elle est coupée en deux (un en-tête de plus)
+    jusqu'à isoler les slots manqués. Le coût est O(log n) appels par trou
+    au lieu d'un appel par bloc. Les blocs antérieurs au Merge sont
+    récupérés normalement.
+
+    anchors : {bloc: timestamp} déjà connus (ex. index persistant), utilisés comme bornes.
+    Retourne (timestamps, failed) comme fetch_block_timestamps ; `timestamps`
+    contient aussi les en-têtes intermédiaires récupérés.
+    """
+    wanted = sorted({int(bn) for bn in block_numbers})
+    known = {int(bn): int(ts) for bn, ts in (anchors or {}).items()}
+
+    pre_merge = [bn for bn in wanted if bn < MERGE_BLOCK and bn not in known]
+    post_merge = [bn for bn in wanted if bn >= MERGE_BLOCK]
+
+    fetched, failed = fetch_block_timestamps(client, pre_merge, **fetch_kwargs) if pre_merge else ({}, [])
+    known.update(fetched)
+    failed = set(failed)
+    if not post_merge:
+        return known, sorted(failed)
+
+    # Les extrémités de la plage demandée sont toujours lues sur la chaîne
+    edges = [bn for bn in (post_merge[0], post_merge[-1]) if bn not in known]
+    fetched, edge_failed = fetch_block_timestamps(client, edges, **fetch_kwargs) if edges else ({}, [])
+    known.update(fetched)
+    headers_fetched = len(fetched)
+
+    resolved_count = len(post_merge)
+    fallback = set()
+    if edge_failed:
+        # Sans bornes fiables, on récupère chaque bloc individuellement
+        fallback.update(bn for bn in post_merge if bn not in known)
+        post_merge = []
+
+    # Plages initiales : entre deux points connus consécutifs couvrant des blocs demandés
+    points = sorted(bn for bn in known if post_merge and post_merge[0] <= bn <= post_merge[-1])
+    pending = set(post_merge) - known.keys()
+    intervals = list(zip(points, points[1:]))
+
+    while intervals and pending:
+        next_intervals, mids = [], {}
+        sorted_pending = sorted(pending)
+        for lo, hi in intervals:
+            inside = sorted_pending[bisect_right(sorted_pending, lo):bisect_left(sorted_pending, hi)]
+            if not inside:
+                continue
+            if _is_linear(lo, hi, known):
+                for bn in inside:
+                    known[bn] = known[lo] + SLOT_SECONDS * (bn - lo)
+                    pending.discard(bn)
+            else:
+                mids[(lo + hi) // 2] = (lo, hi)
+
+        # Tous les milieux d'un même niveau sont récupérés en une seule passe batch
+        fetched, mid_failed = fetch_block_timestamps(client, mids.keys(), **fetch_kwargs) if mids else ({}, [])
+        known.update(fetched)
+        headers_fetched += len(fetched)
+        for mid, (lo, hi) in mids.items():
+            if mid in fetched:
+                pending.discard(mid)
+                next_intervals.extend([(lo, mid), (mid, hi)])
+            else:
+                fallback.update(bn for bn in sorted_pending if lo < bn < hi)
+        pending -= fallback
+        intervals = next_intervals
+
+    if fallback:
+        fetched, fallback_failed = fetch_block_timestamps(client, fallback, **fetch_kwargs)
+        known.update(fetched)
+        headers_fetched += len(fetched)
+        failed.update(fallback_failed)
+
+    METRICS.count("block_timestamps_total", max(0, resolved_count - headers_fetched), source="slots")
+    return known, sorted(failed)
@@ -0,0 +1,193 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Collecte concurrente des rounds Chainlink (asyncio + client JSON-RPC aiohttp).
+
+Les plages [first_agg, last_agg] de toutes les phases sont découpées en
+lots de `batch_size` rounds ; chaque lot est un appel `aggregate3`
+(Multicall3) et jusqu'à `concurrency` lots sont en vol en même temps.
+Un lot en échec est retenté avec un délai exponentiel ; les rounds en
+échec dans un lot sont ensuite retentés un par un. Les résultats sont
+remis dans l'ordre (phase, aggregatorRoundId). Les rounds déjà connus
+(cache des recherches de bornes) ne sont pas relus.
+
+Les requêtes passent par un EndpointPool (rpc_client) : limite de débit et
+répartition entre endpoints, pause d'un endpoint qui répond 429 / 5xx ; la
+nouvelle tentative part alors vers un autre endpoint.
+"""
+
+import asyncio
+import itertools
+import time
+
+import aiohttp
+from eth_abi import decode, encode
+from web3 import Web3
+
+from chainlink_rounds import MULTICALL3_ADDRESS, decode_round_data, encode_get_round_data
+from metrics import METRICS
+from rpc_client import FAILOVER_STATUS, EndpointPool, RpcError, is_rate_limit_error, parse_retry_after
+
+AGGREGATE3_SELECTOR = bytes(Web3.keccak(text="aggregate3((address,bool,bytes)[])")[:4])
+
+
+def to_round_id(phase: int, aggregator_id: int) -> int:
+    return (phase << 64) | aggregator_id
+
+
+class Reverted(RpcError):
+    """
+    L'appel a été annulé par le contrat : inutile de le retenter.
+    """
+
+
+class AsyncRoundCollector:
+    """
+    Lecture concurrente de getRoundData sur un proxy Chainlink.
+    endpoints : EndpointPool, ou URL / liste "url1,url2#rps=10" (voir rpc_client).
+    """
+
+    def __init__(self, endpoints, feed_address, batch_size=500, concurrency=8, retries=3, backoff=0.5,
+                 use_multicall=True, multicall_address=MULTICALL3_ADDRESS, timeout=60.0):
+        self.pool = endpoints if isinstance(endpoints, EndpointPool) else EndpointPool.from_spec(endpoints)
+        self.feed_address = Web3.to_checksum_address(feed_address)
+        self.multicall_address = Web3.to_checksum_address(multicall_address)
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.use_multicall = use_multicall
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+
+    async def _eth_call(self, session, semaphore, to, data: bytes) -> bytes:
+        payload = {
+            "jsonrpc": "2.0",
+            "id": next(self._ids),
+            "method": "eth_call",
+            "params": [{"to": to, "data": "0x" + data.hex()}, "latest"],
+        }
+        async with semaphore:
+            endpoint, delay = self.pool.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            start = time.perf_counter()
+            try:
+                async with session.post(endpoint.url, json=payload) as response:
+                    if response.status in FAILOVER_STATUS:
+                        status = "rate_limited" if response.status == 429 else "error"
+                        self.pool.failure(endpoint, parse_retry_after(response.headers.get("Retry-After")), status)
+                        raise RpcError(f"eth_call: HTTP {response.status} de {endpoint.name}")
+                    response.raise_for_status()
+                    reply = await response.json(content_type=None)
+            except aiohttp.ClientResponseError as e:
+                # Erreur HTTP non transitoire : l'endpoint n'est pas mis en pause
+                METRICS.rpc_request(["eth_call"], time.perf_counter() - start, error=True)
+                raise RpcError(f"eth_call: {e!r}") from e
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                METRICS.rpc_request(["eth_call"], time.perf_counter() - start, error=True)
+                self.pool.failure(endpoint)
+                raise RpcError(f"eth_call: {e!r}") from e
+            except RpcError:
+                METRICS.rpc_request(["eth_call"], time.perf_counter() - start, error=True)
+                raise
+        error = reply.get("error")
+        METRICS.rpc_request(["eth_call"], time.perf_counter() - start, error=bool(error))
+        if is_rate_limit_error(reply):
+            self.pool.failure(endpoint, status="rate_limited")
+            raise RpcError(f"eth_call: {endpoint.name}: {error}")
+        self.pool.success(endpoint)
+        if error:
+            if "revert" in str(error.get("message", "")).lower():
+                raise Reverted(str(error))
+            raise RpcError(str(error))
+        return bytes.fromhex(reply["result"][2:])
+
+    async def _with_retries(self, coro_factory, label):
+        for attempt in range(self.retries + 1):
+            try:
+                return await coro_factory()
+            except Reverted:
+                raise
+            except RpcError as e:
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * 2 ** attempt
+                METRICS.rpc_retry("eth_call")
+                print(f"Erreur sur {label} ({e}), nouvelle tentative dans {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def _get_round(self, session, semaphore, round_id):
+        """
+        Un round lu directement sur le proxy ; None si annulé ou toujours en échec.
+        """
+        try:
+            raw = await self._with_retries(
+                lambda: self._eth_call(session, semaphore, self.feed_address, encode_get_round_data(round_id)),
+                f"round {round_id}"
+            )
+        except RpcError as e:
+            print(f"Erreur sur {round_id}: {e}")
+            return None
+        return decode_round_data(raw)
+
+    async def _get_batch(self, session, semaphore, round_ids):
+        """
+        Un lot de rounds : un appel aggregate3, puis les rounds en échec un par un.
+        """
+        rounds = {}
+        if self.use_multicall:
+            calls = [(self.feed_address, True, encode_get_round_data(rid)) for rid in round_ids]
+            data = AGGREGATE3_SELECTOR + encode(['(address,bool,bytes)[]'], [calls])
+            label = f"lot {round_ids[0]}..{round_ids[-1]}"
+            try:
+                raw = await self._with_retries(
+                    lambda: self._eth_call(session, semaphore, self.multicall_address, data), label
+                )
+                (results,) = decode(['(bool,bytes)[]'], raw)
+                for rid, (success, return_data) in zip(round_ids, results):
+                    if success:
+                        rounds[rid] = decode_round_data(return_data)
+            except RpcError as e:
+                print(f"Erreur sur le {label}: {e}, lecture round par round")
+
+        missing = [rid for rid in round_ids if rounds.get(rid) is None]
+        singles = await asyncio.gather(*(self._get_round(session, semaphore, rid) for rid in missing))
+        rounds.update(zip(missing, singles))
+        return rounds
+
+    async def collect_async(self, phase_ranges: dict, known=None) -> dict:
+        """
+        phase_ranges : {phase: (first_agg, last_agg)}.
+        known : {roundId global: données du round} déjà lues (les valeurs None sont relues).
+        Retourne {(phase, aggregatorRoundId): données du round ou None}, trié.
+        """
+        known = known or {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        cached, to_fetch = {}, []
+        for phase, (first_agg, last_agg) in sorted(phase_ranges.items()):
+            for agg in range(first_agg, last_agg + 1):
+                rid = to_round_id(phase, agg)
+                if known.get(rid) is not None:
+                    cached[rid] = known[rid]
+                else:
+                    to_fetch.append(rid)
+        batches = [to_fetch[i:i + self.batch_size] for i in range(0, len(to_fetch), self.batch_size)]
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            results = await asyncio.gather(*(self._get_batch(session, semaphore, batch) for batch in batches))
+
+        rounds = {}
+        for batch_rounds in [cached] + results:
+            for rid, rd in batch_rounds.items():
+                rounds[(rid >> 64, rid & 0xFFFFFFFFFFFFFFFF)] = rd
+        return dict(sorted(rounds.items()))
+
+    def collect(self, phase_ranges: dict, known=None) -> dict:
+        """
+        Version synchrone de collect_async.
+        """
+        return asyncio.run(self.collect_async(phase_ranges, known))
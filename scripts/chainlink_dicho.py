@@ -2,37 +2,156 @@
 # © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
 
 import csv
+import json
 import time
 import argparse
 import os
 import sys
-from web3 import Web3
 from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from range_search import find_last_before, find_last_true
+from block_timestamps import BlockTimestampError
+from log_fetcher import LogFetcher
+from rpc_client import PooledRpcClient, RpcError, rate_limit_from_env, web3_provider
+from csv_tail import read_last_record
+from metrics import METRICS, export_at_exit
+from registry import DEFAULT_FEED, DEFAULT_REGISTRY_PATH, Registry
 
-# Définir l'argument début
-parser = argparse.ArgumentParser(description="Timestamp de début.")
-parser.add_argument(
-    "--debut",
-    type=int,
-    required=True,
-    help="Timestamp UNIX de début (ex. 1744610424)."
-)
-args = parser.parse_args()
 
-# Lecture de la variable d'environnement RPC
-RPC_URL = os.environ.get("RPC", "")
-if not RPC_URL:
-    print("ERREUR: la variable d'environnement 'RPC' n'est pas définie.", file=sys.stderr)
-    sys.exit(1)
-
-CONTRACT_ADDRESS = '0x5f4ec3df9cbd43714fe2740f5e3616155c5b8419' # Contrat Chainlink pour la pair ETH/USD sur Ethereum Mainnet
-FILENAME = "data/chainlink_eth_usd_last.csv"
-
-TIMESTAMP_DEBUT = args.debut        # Timestamp de début
-TIMESTAMP_FIN   = int(time.time())  # timestamp actuel
+# ABI minimum pour lire latestRoundData et getRoundData
+ABI = '''[
+  {"inputs":[],"name":"latestRoundData","outputs":[
+    {"internalType":"uint80","name":"roundId","type":"uint80"},
+    {"internalType":"int256","name":"answer","type":"int256"},
+    {"internalType":"uint256","name":"startedAt","type":"uint256"},
+    {"internalType":"uint256","name":"updatedAt","type":"uint256"},
+    {"internalType":"uint80","name":"answeredInRound","type":"uint80"}
+  ],"stateMutability":"view","type":"function"},
+  {"inputs":[{"internalType":"uint80","name":"_roundId","type":"uint80"}],
+   "name":"getRoundData","outputs":[
+     {"internalType":"uint80","name":"roundId","type":"uint80"},
+     {"internalType":"int256","name":"answer","type":"int256"},
+     {"internalType":"uint256","name":"startedAt","type":"uint256"},
+     {"internalType":"uint256","name":"updatedAt","type":"uint256"},
+     {"internalType":"uint80","name":"answeredInRound","type":"uint80"}
+   ],"stateMutability":"view","type":"function"}
+]'''
 
-if TIMESTAMP_DEBUT > TIMESTAMP_FIN:
-    parser.error("Le paramètre --debut doit être inférieur ou égal au timestamp actuel !")
+def build_parser() -> argparse.ArgumentParser:
+    # Définir l'argument début
+    parser = argparse.ArgumentParser(description="Timestamp de début.")
+    parser.add_argument(
+        "--debut",
+        type=int,
+        help="Timestamp UNIX de début (ex. 1744610424). Facultatif avec --resume si le jeu de données existe."
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reprend après le dernier global_round_id du jeu de données existant "
+             "(--dataset, ou le jeu Parquet --parquet-dir avec --output-format parquet)."
+    )
+    parser.add_argument(
+        "--feed",
+        default=DEFAULT_FEED,
+        help=f"Flux Chainlink du registre : adresse du proxy, décimales et fichiers (défaut: {DEFAULT_FEED})."
+    )
+    parser.add_argument(
+        "--registry",
+        default=DEFAULT_REGISTRY_PATH,
+        help="Registre des pools et des flux (défaut: scripts/registry.json)."
+    )
+    parser.add_argument(
+        "--dataset",
+        default=None,
+        help="CSV cumulé lu par --resume (défaut: data/<flux>.csv, ex. data/chainlink_eth_usd.csv)."
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="CSV des nouveaux rounds (défaut: data/<flux>_last.csv)."
+    )
+    parser.add_argument(
+        "--phases-file",
+        default="data/chainlink_phases.json",
+        help="Fichier des aggregatorRoundId max des phases clôturées (défaut: data/chainlink_phases.json)."
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=["csv", "parquet", "both"],
+        default="csv",
+        help="Format de sortie : CSV (par défaut), Parquet partitionné, ou les deux."
+    )
+    parser.add_argument(
+        "--parquet-dir",
+        default=None,
+        help="Répertoire du jeu de données Parquet (défaut: celui du flux, data/parquet/chainlink pour ETH/USD)."
+    )
+    parser.add_argument(
+        "--partition",
+        choices=["day", "month"],
+        default="month",
+        help="Granularité des partitions Parquet (défaut: month)."
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Nombre d'appels getRoundData regroupés dans un appel Multicall3 (défaut: 500)."
+    )
+    parser.add_argument(
+        "--search-width",
+        type=int,
+        default=32,
+        help="Nombre de rounds sondés par lot lors des recherches de bornes (défaut: 32)."
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["logs", "rounds"],
+        default="logs",
+        help="Collecte par événements AnswerUpdated (eth_getLogs, défaut) ou round par round "
+             "(getRoundData, mode de vérification)."
+    )
+    parser.add_argument(
+        "--log-chunk-size",
+        type=int,
+        default=100_000,
+        help="Taille initiale (en blocs) des plages eth_getLogs, réduite automatiquement si le nœud refuse (défaut: 100000)."
+    )
+    parser.add_argument(
+        "--search",
+        choices=["interpolation", "kary"],
+        default="interpolation",
+        help="Recherche des bornes temporelles : interpolation sur updatedAt (défaut) ou k-aire."
+    )
+    parser.add_argument(
+        "--probe-cache",
+        default=None,
+        help="Fichier JSON où conserver les rounds sondés des phases clôturées d'une exécution à l'autre."
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Nombre maximal de requêtes en vol (lots de rounds et phases en parallèle, défaut: 8)."
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="Nouvelles tentatives par lot puis par round en cas d'erreur RPC (défaut: 3)."
+    )
+    parser.add_argument(
+        "--no-multicall",
+        action="store_true",
+        help="Un appel eth_call par round au lieu de lots Multicall3."
+    )
+    parser.add_argument(
+        "--metrics-dir",
+        default=None,
+        help="Répertoire où écrire metrics_chainlink.json et metrics_chainlink.prom en fin d'exécution (défaut: aucun)."
+    )
+    return parser
 
 def convertir_timestamp(ts: int) -> str:
     """
@@ -58,117 +177,54 @@ def parse_round_id(round_id: int) -> (int, int):
     aggregator_id = round_id & 0xFFFFFFFFFFFFFFFF
     return phase_id, aggregator_id
 
-def find_max_aggregator_id(phase: int) -> int:
+def read_resume_point(path: str):
     """
-    Trouve le plus grand aggregatorRoundId valide pour une phase donnée.
-    Utilise une double stratégie:
-    1. Recherche exponentielle pour trouver une borne supérieure
-    2. Recherche dichotomique pour trouver la valeur exacte
+    (phase, aggregatorRoundId) du dernier round du jeu de données, ou None
+    s'il n'existe pas ou est vide. Seule la fin du fichier est lue.
     """
-    low = 1
-    high = 1
-    # Phase 1: Trouver une borne supérieure initiale
-    while True:
-        round_id = to_round_id(phase, high)
-        try:
-            rd = contract.functions.getRoundData(round_id).call()
-            if rd[3] != 0:  # Vérifie si updatedAt n'est pas nul
-                low = high
-                high *= 2   # Double la recherche
-            else:
-                break
-        except:
-            break
-    # Phase 2: Recherche dichotomique précise
-    max_agg = 0
-    while low <= high:
-        mid = (low + high) // 2
-        round_id = to_round_id(phase, mid)
-        try:
-            rd = contract.functions.getRoundData(round_id).call()
-            if rd[3] != 0:
-                max_agg = mid   # Mise à jour du maximum connu
-                low = mid + 1   # Explore la partie supérieure
-            else:
-                high = mid - 1  # Réduit la borne supérieure
-        except:
-            high = mid - 1      # Gestion des erreurs de contrat
-    return max_agg
+    if not os.path.exists(path):
+        return None
+    last_row = read_last_record(path)
+    if last_row is None:
+        return None
+    return parse_round_id(int(last_row["global_round_id"]))
 
-def find_first_aggregator_id(phase: int, max_agg_id: int, target_ts: int) -> int:
+def read_parquet_round_ids(root: str) -> set:
     """
-    Trouve le premier round avec timestamp >= target_ts.
-    Utilise une recherche dichotomique classique.
+    global_round_id des rounds déjà présents dans le jeu Parquet (vide s'il n'existe pas).
     """
-    low, high, result = 1, max_agg_id, None
-    while low <= high:
-        mid = (low + high) // 2
-        round_id = to_round_id(phase, mid)
-        try:
-            rd = contract.functions.getRoundData(round_id).call()
-            updated_at = rd[3]
-            if updated_at >= target_ts:
-                result = mid
-                high = mid - 1 # Continue à chercher plus bas
-            else:
-                low = mid + 1  # Monte dans la plage
-        except:
-            high = mid - 1     # En cas d'erreur, réduit la recherche
-    return result
+    # Import différé : pandas/pyarrow ne sont requis qu'en sortie Parquet
+    from columnar_store import read_range
 
-def find_last_aggregator_id(phase: int, max_agg_id: int, target_ts: int) -> int:
+    return {int(rid) for rid in read_range(root, "chainlink", columns=["global_round_id"])["global_round_id"]}
+
+def load_closed_phases(path: str, feed_address: str) -> dict:
     """
-    Trouve le dernier round avec timestamp <= target_ts.
-    Logique inverse de find_first_aggregator_id.
+    {phase: aggregatorRoundId max} des phases clôturées déjà connues pour ce contrat.
+    Une phase clôturée ne reçoit plus de rounds : son max ne change plus.
     """
-    low, high, result = 1, max_agg_id, None
-    while low <= high:
-        mid = (low + high) // 2
-        round_id = to_round_id(phase, mid)
-        try:
-            rd = contract.functions.getRoundData(round_id).call()
-            updated_at = rd[3]
-            if updated_at <= target_ts:
-                result = mid
-                low = mid + 1   # Continue à chercher plus haut
-            else:
-                high = mid - 1  # Descend dans la plage
-        except:
-            high = mid - 1
-    return result
-
-# Initialisation de la connexion Ethereum
-web3 = Web3(Web3.HTTPProvider(RPC_URL))
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        state = json.load(f)
+    return {int(phase): int(max_agg) for phase, max_agg in state.get(feed_address, {}).items()}
 
-if not web3.is_connected():
-        print(f"ERREUR: impossible de se connecter à l'endpoint RPC '{RPC_URL}'", file=sys.stderr)
-        sys.exit(1)
-
-print(f"Connexion au réseau établie: {web3.is_connected()}")
-
-checksum_addr = Web3.to_checksum_address(CONTRACT_ADDRESS)
-
-# ABI minimum pour lire latestRoundData et getRoundData
-abi = '''[
-  {"inputs":[],"name":"latestRoundData","outputs":[
-    {"internalType":"uint80","name":"roundId","type":"uint80"},
-    {"internalType":"int256","name":"answer","type":"int256"},
-    {"internalType":"uint256","name":"startedAt","type":"uint256"},
-    {"internalType":"uint256","name":"updatedAt","type":"uint256"},
-    {"internalType":"uint80","name":"answeredInRound","type":"uint80"}
-  ],"stateMutability":"view","type":"function"},
-  {"inputs":[{"internalType":"uint80","name":"_roundId","type":"uint80"}],
-   "name":"getRoundData","outputs":[
-     {"internalType":"uint80","name":"roundId","type":"uint80"},
-     {"internalType":"int256","name":"answer","type":"int256"},
-     {"internalType":"uint256","name":"startedAt","type":"uint256"},
-     {"internalType":"uint256","name":"updatedAt","type":"uint256"},
-     {"internalType":"uint80","name":"answeredInRound","type":"uint80"}
-   ],"stateMutability":"view","type":"function"}
-]'''
-
-# Création de l'objet contrat
-contract = web3.eth.contract(address=checksum_addr, abi=abi)
+def save_closed_phases(path: str, feed_address: str, closed: dict) -> None:
+    """
+    Enregistre les max des phases clôturées (remplacement atomique du fichier JSON).
+    """
+    state = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+    state[feed_address] = {str(phase): max_agg for phase, max_agg in sorted(closed.items())}
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
 
 def is_in_range(ts: int, start_ts, end_ts) -> bool:
     """
@@ -182,79 +238,367 @@ def is_in_range(ts: int, start_ts, end_ts) -> bool:
         return False
     return True
 
-# Récupération des informations du dernier round
-latest_data = contract.functions.latestRoundData().call()
-latest_round_id = latest_data[0]  # uint80
-latest_phase, latest_aggregator_id = parse_round_id(latest_round_id)
-
-print(f"Latest Round ID global: {latest_round_id}")
-print(f" - phaseId = {latest_phase}")
-print(f" - aggregatorRoundId = {latest_aggregator_id}")
-
-
-all_results = []  # Stockage des résultats
-
-# On boucle de la phase 1 jusqu'à la phase la plus récente
-# Une phase = une version du contrat
-for phase in range(1, latest_phase + 1):
-    
-    max_agg_id = find_max_aggregator_id(phase)
-
-    if max_agg_id == 0:
-        print(f"Phase {phase} ignorée (aucun round valide)")
-        continue
-    
-    # Recherche des bons rounds id qui correspondent a notre plage temporelle
-    first_agg = find_first_aggregator_id(phase, max_agg_id, TIMESTAMP_DEBUT)
-    last_agg = find_last_aggregator_id(phase, max_agg_id, TIMESTAMP_FIN)
-    
-    if not first_agg or not last_agg or first_agg > last_agg:
-        print(f"Phase {phase} hors plage temporelle")
-        continue
-    
-    # Collecter les données entre first_agg et last_agg
-    aggregator_id = first_agg
-    while aggregator_id <= last_agg:
-        round_id_global = to_round_id(phase, aggregator_id)
+class PhaseSearch:
+    """
+    Recherche des plages de rounds de chaque phase du flux, par lots lus via
+    `reader` (RoundDataReader). latest_phase / latest_aggregator_id : dernier
+    round publié ; closed_phases : {phase: aggregatorRoundId max} des phases
+    clôturées, complété au fil des recherches.
+    """
+
+    def __init__(self, reader, latest_phase: int, latest_aggregator_id: int, closed_phases: dict,
+                 search: str = "interpolation", width: int = 32):
+        self.reader = reader
+        self.latest_phase = latest_phase
+        self.latest_aggregator_id = latest_aggregator_id
+        self.closed_phases = closed_phases
+        self.search = search
+        self.width = width
+
+    def probe_valid(self, phase: int, predicate):
+        """
+        Construit une fonction de sonde pour find_last_true : lit un lot de rounds
+        de la phase via Multicall3 et applique `predicate` aux données de chaque
+        round (None si l'appel a échoué).
+        """
+        def probe(aggregator_ids):
+            rounds = self.reader.get_rounds([to_round_id(phase, agg) for agg in aggregator_ids])
+            return {agg: predicate(rounds[to_round_id(phase, agg)]) for agg in aggregator_ids}
+        return probe
+
+    def find_max_aggregator_id(self, phase: int) -> int:
+        """
+        Trouve le plus grand aggregatorRoundId valide pour une phase donnée.
+        Utilise une double stratégie:
+        1. Recherche exponentielle pour trouver une borne supérieure (toutes les puissances de 2 en un seul lot)
+        2. Recherche k-aire par lots Multicall3 pour trouver la valeur exacte
+        """
+        probe = self.probe_valid(phase, lambda rd: rd is not None and rd[3] != 0)  # Vérifie si updatedAt n'est pas nul
+
+        # Phase 1: Trouver une borne supérieure initiale
+        powers = [2 ** k for k in range(64)]
+        answers = probe(powers)
+        valid_powers = [p for p in powers if answers[p]]
+        if not valid_powers:
+            return 0
+        low = valid_powers[-1]
+        high = next((p for p in powers if p > low and not answers[p]), 2 ** 64)
+        # Phase 2: Recherche précise
+        return find_last_true(probe, low, high - 1, width=self.width) or 0
+
+    def find_last_round_before(self, phase: int, max_agg_id: int, target_ts: int, inclusive: bool):
+        """
+        Dernier round de la phase avec timestamp < target_ts (<= si inclusive), ou None.
+        Recherche par interpolation sur updatedAt, ou k-aire avec --search kary.
+        """
+        if self.search == "kary":
+            if inclusive:
+                probe = self.probe_valid(phase, lambda rd: rd is not None and rd[3] <= target_ts)
+            else:
+                probe = self.probe_valid(phase, lambda rd: rd is not None and rd[3] < target_ts)
+            return find_last_true(probe, 1, max_agg_id, width=self.width)
+
+        def get_timestamps(aggregator_ids):
+            stamps = self.reader.get_timestamps([to_round_id(phase, agg) for agg in aggregator_ids])
+            return {agg: stamps[to_round_id(phase, agg)] for agg in aggregator_ids}
+        return find_last_before(get_timestamps, 1, max_agg_id, target_ts, inclusive=inclusive, width=self.width)
+
+    def find_first_aggregator_id(self, phase: int, max_agg_id: int, target_ts: int) -> int:
+        """
+        Trouve le premier round avec timestamp >= target_ts.
+        C'est le successeur du dernier round avec timestamp < target_ts.
+        """
+        before = self.find_last_round_before(phase, max_agg_id, target_ts, inclusive=False)
+        first = 1 if before is None else before + 1
+        return first if first <= max_agg_id else None
+
+    def find_last_aggregator_id(self, phase: int, max_agg_id: int, target_ts: int) -> int:
+        """
+        Trouve le dernier round avec timestamp <= target_ts.
+        Logique inverse de find_first_aggregator_id.
+        """
+        return self.find_last_round_before(phase, max_agg_id, target_ts, inclusive=True)
+
+    def phase_max_aggregator_id(self, phase: int) -> int:
+        """
+        aggregatorRoundId max d'une phase : lu dans le fichier des phases clôturées
+        si possible, sinon recherché (et mémorisé si la phase est clôturée).
+        """
+        if phase == self.latest_phase:
+            return self.latest_aggregator_id
+        if phase not in self.closed_phases:
+            self.closed_phases[phase] = self.find_max_aggregator_id(phase)
+        return self.closed_phases[phase]
+
+    def find_phase_bounds(self, phase: int, start_ts: int, end_ts: int):
+        """
+        Détermine la plage [first_agg, last_agg] de la phase qui correspond à la plage temporelle,
+        ou None si la phase n'a aucun round valide ou est hors plage.
+        """
+        max_agg_id = self.phase_max_aggregator_id(phase)
+
+        if max_agg_id == 0:
+            print(f"Phase {phase} ignorée (aucun round valide)")
+            return None
+
+        # Recherche des bons rounds id qui correspondent a notre plage temporelle
+        first_agg = self.find_first_aggregator_id(phase, max_agg_id, start_ts)
+        last_agg = self.find_last_aggregator_id(phase, max_agg_id, end_ts)
+
+        if not first_agg or not last_agg or first_agg > last_agg:
+            print(f"Phase {phase} hors plage temporelle")
+            return None
+        return first_agg, last_agg
+
+    def resume_phase_ranges(self, last_phase: int, last_agg: int) -> dict:
+        """
+        Plages à collecter après le round (last_phase, last_agg) jusqu'au dernier round :
+        aucune recherche temporelle, seules les phases clôturées sans max connu sont sondées.
+        """
+        ranges = {}
+        for phase in range(last_phase, self.latest_phase + 1):
+            first_agg = last_agg + 1 if phase == last_phase else 1
+            last_agg_phase = self.phase_max_aggregator_id(phase)
+            if first_agg <= last_agg_phase:
+                ranges[phase] = (first_agg, last_agg_phase)
+        return ranges
+
+def main(argv=None, rpc=None) -> int:
+    """
+    Extraction des rounds d'un flux Chainlink du registre (ETH/USD par défaut) ;
+    argv : arguments de la ligne de commande (défaut: sys.argv). rpc : PooledRpcClient déjà ouvert, partagé avec
+    les autres étapes du pipeline (défaut: pool créé depuis la variable RPC).
+    Retourne le nombre de rounds écrits ; quitte par sys.exit(1) en cas d'erreur.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    # Imports différés : web3 et le client aiohttp ne sont chargés que pour une extraction
+    from web3 import Web3
+    from chainlink_rounds import RoundDataReader
+    from chainlink_async import AsyncRoundCollector
+    from chainlink_logs import collect_rounds_from_logs
+    if args.metrics_dir:
+        export_at_exit(args.metrics_dir, "chainlink")
+
+    TIMESTAMP_DEBUT = args.debut        # Timestamp de début
+    TIMESTAMP_FIN   = int(time.time())  # timestamp actuel
+
+    if TIMESTAMP_DEBUT is None and not args.resume:
+        parser.error("Le paramètre --debut est requis (sauf avec --resume).")
+    if TIMESTAMP_DEBUT is not None and TIMESTAMP_DEBUT > TIMESTAMP_FIN:
+        parser.error("Le paramètre --debut doit être inférieur ou égal au timestamp actuel !")
+
+    # Flux du registre : adresse du proxy, décimales de la réponse et chemins par défaut (sous data/ du répertoire courant)
+    try:
+        feed = Registry.load(args.registry, data_dir="data").feed(args.feed)
+    except ValueError as e:
+        print(f"ERREUR: {e}", file=sys.stderr)
+        sys.exit(1)
+    args.dataset = args.dataset or feed.dataset_path
+    args.output = args.output or feed.last_path
+    args.parquet_dir = args.parquet_dir or feed.parquet_dir
+
+    # Initialisation de la connexion Ethereum : toutes les requêtes (web3, eth_getLogs, getRoundData)
+    # passent par le même pool d'endpoints, avec ses limites de débit et sa bascule sur 429 / 5xx
+    # Lecture de la variable d'environnement RPC (un endpoint, ou plusieurs séparés par des virgules)
+    RPC_URL = os.environ.get("RPC", "")
+    if rpc is None:
+        if not RPC_URL:
+            print("ERREUR: la variable d'environnement 'RPC' n'est pas définie.", file=sys.stderr)
+            sys.exit(1)
         try:
-            rd = contract.functions.getRoundData(round_id_global).call()
-            answer = rd[1]      # Prix ETH/USD
-            updated_at = rd[3]  # Timestamp de mise à jour
-            if is_in_range(updated_at, TIMESTAMP_DEBUT, TIMESTAMP_FIN):
-                date_str = convertir_timestamp(updated_at)
-                price = float(answer) / 1e8  # Conversion en décimal pour ETH/USD
-                all_results.append({
-                    "round_id_global": round_id_global,
-                    "phase_id": phase,
-                    "aggregator_round_id": aggregator_id,
-                    "price": price,
-                    "timestamp": updated_at,
-                    "date_str": date_str
-                })
-                aggregator_id += 1
-        except Exception as e:
-            print(f"Erreur sur {round_id_global}: {str(e)}")
-            break
-        
-    print(f"Fin de la phase {phase}, aggregator_round_id max = {aggregator_id - 1}")
-
-
-# Trier par timestamp chronologiquement
-all_results.sort(key=lambda x: x["timestamp"])
-
-
-with open(FILENAME, mode='w', newline='', encoding='utf-8') as f:
-    writer = csv.writer(f)
-    
-    writer.writerow(["global_round_id", "phase", "aggregator_round", "datetime_utc", "price"])
-    
-    for item in all_results:
-        writer.writerow([
-            item["round_id_global"],
-            item["phase_id"],
-            item["aggregator_round_id"],
-            item["date_str"],
-            item["price"]
-        ])
-
-print(f"\nTerminé. {len(all_results)} lignes écrites dans {FILENAME}.")
\ No newline at end of file
+            rpc = PooledRpcClient(RPC_URL, pool_size=args.concurrency, rate=rate_limit_from_env())
+        except ValueError as e:
+            print(f"ERREUR: variable RPC ou RPC_RATE_LIMIT invalide: {e}", file=sys.stderr)
+            sys.exit(1)
+    web3 = Web3(web3_provider(rpc))
+
+    if not web3.is_connected():
+        print(f"ERREUR: impossible de se connecter à l'endpoint RPC '{RPC_URL}'", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Connexion au réseau établie: {web3.is_connected()}")
+
+    checksum_addr = Web3.to_checksum_address(feed.address)
+
+    # Création de l'objet contrat
+    contract = web3.eth.contract(address=checksum_addr, abi=ABI)
+
+    # Lecture groupée des rounds via Multicall3
+    reader = RoundDataReader(
+        web3, checksum_addr, contract=contract, batch_size=args.batch_size, use_multicall=not args.no_multicall
+    )
+    if args.probe_cache:
+        print(f"{reader.load_cache(args.probe_cache)} rounds de phases clôturées chargés depuis {args.probe_cache}")
+
+    # Récupération des informations du dernier round
+    latest_data = contract.functions.latestRoundData().call()
+    latest_round_id = latest_data[0]  # uint80
+    latest_phase, latest_aggregator_id = parse_round_id(latest_round_id)
+
+    print(f"Latest Round ID global: {latest_round_id}")
+    print(f" - phaseId = {latest_phase}")
+    print(f" - aggregatorRoundId = {latest_aggregator_id}")
+
+
+    all_results = []  # Stockage des résultats
+
+    # Les phases antérieures à la phase courante sont clôturées : leur max est mémorisé
+    closed_phases = load_closed_phases(args.phases_file, checksum_addr)
+    known_closed_phases = dict(closed_phases)
+    search = PhaseSearch(reader, latest_phase, latest_aggregator_id, closed_phases,
+                         search=args.search, width=args.search_width)
+
+    # Sortie Parquet seule : aucun CSV n'est écrit, la reprise part du jeu Parquet
+    resume_source = args.parquet_dir if args.output_format == "parquet" else args.dataset
+    resume_point = None
+    if args.resume and args.output_format == "parquet":
+        parquet_ids = read_parquet_round_ids(args.parquet_dir)
+        resume_point = parse_round_id(max(parquet_ids)) if parquet_ids else None
+    elif args.resume:
+        resume_point = read_resume_point(args.dataset)
+    if args.resume and resume_point is None:
+        if TIMESTAMP_DEBUT is None:
+            print(f"ERREUR: --resume sans jeu de données exploitable ({resume_source}) ni --debut.", file=sys.stderr)
+            sys.exit(1)
+        print(f"Aucun round dans {resume_source}, recherche à partir de --debut={TIMESTAMP_DEBUT}")
+
+    if resume_point is not None:
+        # Reprise : tous les rounds qui suivent le dernier round enregistré
+        resume_phase, resume_agg = resume_point
+        print(f"Reprise après le round {to_round_id(resume_phase, resume_agg)} (phase {resume_phase}, aggregatorRoundId {resume_agg})")
+        TIMESTAMP_DEBUT = None
+        phase_ranges = search.resume_phase_ranges(resume_phase, resume_agg)
+    else:
+        # On traite les phases de 1 jusqu'à la phase la plus récente
+        # Une phase = une version du contrat ; les phases sont indépendantes et recherchées en parallèle
+        phases = list(range(1, latest_phase + 1))
+        with METRICS.stage("search"), ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            phase_bounds = dict(zip(phases, pool.map(
+                lambda phase: search.find_phase_bounds(phase, TIMESTAMP_DEBUT, TIMESTAMP_FIN), phases
+            )))
+        phase_ranges = {phase: bounds for phase, bounds in phase_bounds.items() if bounds}
+
+    if closed_phases != known_closed_phases:
+        save_closed_phases(args.phases_file, checksum_addr, closed_phases)
+    if args.probe_cache:
+        reader.save_cache(args.probe_cache, closed_before_phase=latest_phase)
+
+    # Coût des recherches de bornes, par phase
+    for phase in sorted(set(reader.probes) | set(reader.cache_hits)):
+        print(f"Phase {phase} : {reader.probes[phase]} rounds sondés en {reader.calls[phase]} appels RPC, "
+              f"{reader.cache_hits[phase]} lus en cache")
+
+    known_rounds = dict(reader.cache)
+    if args.engine == "logs":
+        # Plage de blocs de chaque phase : timestamps des rounds bornes (déjà en cache après les recherches)
+        bounds = reader.get_rounds(
+            [to_round_id(phase, agg) for phase, (first_agg, last_agg) in phase_ranges.items() for agg in (first_agg, last_agg)]
+        )
+        phase_times = {}
+        for phase, (first_agg, last_agg) in phase_ranges.items():
+            rd_first, rd_last = bounds[to_round_id(phase, first_agg)], bounds[to_round_id(phase, last_agg)]
+            if rd_first is not None and rd_last is not None and rd_first[3] and rd_last[3]:
+                phase_times[phase] = (rd_first[3], rd_last[3])
+
+        fetcher = LogFetcher(rpc, chunk_size=args.log_chunk_size, concurrency=args.concurrency, retries=args.retries)
+        try:
+            with METRICS.stage("fetch_logs"):
+                log_rounds = collect_rounds_from_logs(rpc, fetcher, checksum_addr, phase_ranges, phase_times)
+        except (RpcError, BlockTimestampError) as e:
+            print(f"ERREUR: collecte par les logs impossible: {e}", file=sys.stderr)
+            sys.exit(1)
+        known_rounds.update({to_round_id(phase, agg): rd for (phase, agg), rd in log_rounds.items()})
+
+    # Collecter les données entre first_agg et last_agg de toutes les phases, par lots concurrents
+    # (avec --engine logs, seuls les rounds absents des logs sont lus par getRoundData)
+    collector = AsyncRoundCollector(
+        rpc.pool, checksum_addr, batch_size=args.batch_size, concurrency=args.concurrency,
+        retries=args.retries, use_multicall=not args.no_multicall
+    )
+    with METRICS.stage("fetch_rounds"):
+        rounds = collector.collect(phase_ranges, known=known_rounds)
+
+    failed_rounds = []
+    for (phase, aggregator_id), rd in rounds.items():
+        round_id_global = to_round_id(phase, aggregator_id)
+        if rd is None:
+            failed_rounds.append(round_id_global)
+            continue
+        answer = rd[1]      # Prix (ETH/USD pour le flux par défaut)
+        updated_at = rd[3]  # Timestamp de mise à jour
+        if is_in_range(updated_at, TIMESTAMP_DEBUT, TIMESTAMP_FIN):
+            date_str = convertir_timestamp(updated_at)
+            price = float(answer) / 10**feed.decimals  # Conversion en décimal (8 décimales pour ETH/USD)
+            all_results.append({
+                "round_id_global": round_id_global,
+                "phase_id": phase,
+                "aggregator_round_id": aggregator_id,
+                "price": price,
+                "timestamp": updated_at,
+                "date_str": date_str
+            })
+
+    METRICS.rows("chainlink", "read", len(rounds))
+    METRICS.rows("chainlink", "failed", len(failed_rounds))
+    METRICS.rows("chainlink", "skipped", len(rounds) - len(failed_rounds) - len(all_results))
+    METRICS.rows("chainlink", "decoded", len(all_results))
+
+    for phase, (first_agg, last_agg) in phase_ranges.items():
+        print(f"Fin de la phase {phase}, aggregator_round_id max = {last_agg}")
+
+    # Un round manquant laisserait un trou définitif dans les données : on s'arrête
+    if failed_rounds:
+        print(f"ERREUR: {len(failed_rounds)} round(s) non récupérés après nouvelles tentatives: {failed_rounds[:20]}", file=sys.stderr)
+        sys.exit(1)
+
+
+    # Trier par timestamp chronologiquement
+    all_results.sort(key=lambda x: x["timestamp"])
+
+
+    write_start = time.perf_counter()
+    if args.output_format in ("csv", "both"):
+        with open(args.output, mode='w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+
+            writer.writerow(["global_round_id", "phase", "aggregator_round", "datetime_utc", "price"])
+
+            for item in all_results:
+                writer.writerow([
+                    item["round_id_global"],
+                    item["phase_id"],
+                    item["aggregator_round_id"],
+                    item["date_str"],
+                    item["price"]
+                ])
+
+        print(f"\nTerminé. {len(all_results)} lignes écrites dans {args.output}.")
+
+    if args.output_format in ("parquet", "both"):
+        # Import différé : pandas/pyarrow ne sont requis qu'en sortie Parquet
+        import pandas as pd
+        from columnar_store import append_partitioned
+
+        # Les rounds déjà présents dans le jeu Parquet ne sont pas ajoutés une seconde fois
+        existing = read_parquet_round_ids(args.parquet_dir)
+        new_results = [item for item in all_results if item["round_id_global"] not in existing]
+        if len(new_results) < len(all_results):
+            print(f"{len(all_results) - len(new_results)} round(s) déjà présents dans {args.parquet_dir} ignorés")
+        rows_df = pd.DataFrame({
+            "global_round_id": [item["round_id_global"] for item in new_results],
+            "phase": [item["phase_id"] for item in new_results],
+            "aggregator_round": [item["aggregator_round_id"] for item in new_results],
+            "datetime_utc": [item["date_str"] for item in new_results],
+            "price": [item["price"] for item in new_results],
+        })
+        written = append_partitioned(rows_df, args.parquet_dir, "chainlink", args.partition)
+        print(f"\nTerminé. {written} lignes ajoutées au jeu Parquet {args.parquet_dir}.")
+
+    METRICS.add_stage_time("write", time.perf_counter() - write_start)
+    METRICS.rows("chainlink", "written", len(all_results))
+    return len(all_results)
+
+if __name__ == "__main__":
+    main()
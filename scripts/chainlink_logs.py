@@ -0,0 +1,107 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Historique Chainlink à partir des événements AnswerUpdated des agrégateurs.
+
+Le proxy (EACAggregatorProxy) délègue chaque phase à un agrégateur, dont
+l'adresse est lue par `phaseAggregators(phaseId)`. Chaque round publié par
+un agrégateur émet :
+
+    AnswerUpdated(int256 indexed current, uint256 indexed roundId, uint256 updatedAt)
+
+soit exactement (answer, aggregatorRoundId, updatedAt) de getRoundData. Un
+appel eth_getLogs sur une grande plage de blocs remplace ainsi des milliers
+d'appels getRoundData. Les blocs de début et de fin de chaque phase sont
+déduits des timestamps des rounds bornes.
+"""
+
+from eth_abi import encode
+from web3 import Web3
+
+from block_timestamps import block_at_timestamp
+from rpc_client import RpcError
+
+ANSWER_UPDATED_TOPIC = "0x" + bytes(Web3.keccak(text="AnswerUpdated(int256,uint256,uint256)")).hex()
+PHASE_AGGREGATORS_SELECTOR = bytes(Web3.keccak(text="phaseAggregators(uint16)")[:4])
+ZERO_ADDRESS = "0x" + "00" * 20
+
+
+def get_phase_aggregators(client, feed_address: str, phases) -> dict:
+    """
+    {phase: adresse de l'agrégateur de la phase, ou None} (un seul appel batch).
+    """
+    phases = list(phases)
+    calls = [
+        ("eth_call", [{"to": feed_address, "data": "0x" + (PHASE_AGGREGATORS_SELECTOR + encode(['uint16'], [phase])).hex()}, "latest"])
+        for phase in phases
+    ]
+    aggregators = {}
+    for phase, reply in zip(phases, client.batch(calls)):
+        result = reply.get("result") if reply else None
+        if not result or len(result) < 66:
+            aggregators[phase] = None
+            continue
+        address = "0x" + result[-40:]
+        aggregators[phase] = None if address == ZERO_ADDRESS else Web3.to_checksum_address(address)
+    return aggregators
+
+
+def decode_answer_updated(log: dict):
+    """
+    (aggregatorRoundId, answer, updatedAt) d'un log AnswerUpdated.
+    """
+    current = int.from_bytes(bytes.fromhex(log["topics"][1][2:]), "big", signed=True)
+    aggregator_round = int(log["topics"][2], 16)
+    updated_at = int(log["data"][2:66], 16)
+    return aggregator_round, current, updated_at
+
+
+def rounds_from_logs(fetcher, aggregator: str, phase: int, first_agg: int, last_agg: int,
+                     from_block: int, to_block: int) -> dict:
+    """
+    {aggregatorRoundId: données au format getRoundData} des rounds [first_agg, last_agg]
+    trouvés dans les logs de l'agrégateur entre from_block et to_block.
+
+    Un round peut être mis à jour plusieurs fois (FluxAggregator) : le dernier
+    événement fait foi, comme pour getRoundData.
+    """
+    rounds = {}
+    for log in fetcher.fetch(aggregator, [ANSWER_UPDATED_TOPIC], from_block, to_block):
+        if log.get("removed"):
+            continue
+        aggregator_round, answer, updated_at = decode_answer_updated(log)
+        if first_agg <= aggregator_round <= last_agg:
+            round_id = (phase << 64) | aggregator_round
+            rounds[aggregator_round] = (round_id, answer, updated_at, updated_at, round_id)
+    return rounds
+
+
+def collect_rounds_from_logs(client, fetcher, feed_address: str, phase_ranges: dict, phase_times: dict) -> dict:
+    """
+    phase_ranges : {phase: (first_agg, last_agg)} ; phase_times : {phase: (updatedAt de
+    first_agg, updatedAt de last_agg)}. Retourne {(phase, aggregatorRoundId): données}
+    pour les rounds trouvés dans les logs ; les rounds absents sont à lire par getRoundData.
+    """
+    if not phase_ranges:
+        return {}
+    aggregators = get_phase_aggregators(client, feed_address, phase_ranges)
+    head_block = int(client.call("eth_blockNumber", []), 16)
+    rounds = {}
+    for phase, (first_agg, last_agg) in sorted(phase_ranges.items()):
+        aggregator = aggregators.get(phase)
+        if aggregator is None or phase not in phase_times:
+            print(f"Phase {phase} : agrégateur ou bornes inconnus, lecture round par round")
+            continue
+        ts_first, ts_last = phase_times[phase]
+        from_block = block_at_timestamp(client, ts_first, head_block)
+        to_block = block_at_timestamp(client, ts_last, head_block)
+        try:
+            phase_rounds = rounds_from_logs(fetcher, aggregator, phase, first_agg, last_agg, from_block, to_block)
+        except RpcError as e:
+            print(f"Phase {phase} : eth_getLogs en échec ({e}), lecture round par round")
+            continue
+        print(f"Phase {phase} : {len(phase_rounds)} rounds lus dans les logs de {aggregator} "
+              f"(blocs {from_block}..{to_block})")
+        rounds.update({(phase, agg): rd for agg, rd in phase_rounds.items()})
+    return rounds
@@ -0,0 +1,197 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Lecture groupée des rounds Chainlink via Multicall3.
+
+N appels `getRoundData(roundId)` sont regroupés dans un seul `eth_call` à
+`aggregate3` sur le contrat Multicall3 standard (même adresse sur toutes
+les chaînes EVM). Chaque appel est marqué `allowFailure` : un round
+inexistant (revert) n'empêche pas la lecture des autres et est retourné
+comme None.
+
+Les rounds lus sont mémorisés pour la durée de l'exécution (les données
+d'un round ne changent plus une fois publiées) : les recherches de bornes
+et la collecte ne relisent jamais deux fois le même round. Le cache des
+phases clôturées peut être conservé entre deux exécutions (fichier JSON).
+"""
+
+import json
+import os
+import time
+from collections import Counter
+
+from eth_abi import decode, encode
+from web3 import Web3
+
+from metrics import METRICS
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+MULTICALL3_ABI = '''[
+  {"inputs":[{"components":[
+      {"internalType":"address","name":"target","type":"address"},
+      {"internalType":"bool","name":"allowFailure","type":"bool"},
+      {"internalType":"bytes","name":"callData","type":"bytes"}
+    ],"internalType":"struct Multicall3.Call3[]","name":"calls","type":"tuple[]"}],
+   "name":"aggregate3","outputs":[{"components":[
+      {"internalType":"bool","name":"success","type":"bool"},
+      {"internalType":"bytes","name":"returnData","type":"bytes"}
+    ],"internalType":"struct Multicall3.Result[]","name":"returnData","type":"tuple[]"}],
+   "stateMutability":"payable","type":"function"}
+]'''
+
+GET_ROUND_DATA_SELECTOR = bytes(Web3.keccak(text="getRoundData(uint80)")[:4])
+ROUND_DATA_TYPES = ['uint80', 'int256', 'uint256', 'uint256', 'uint80']
+
+
+def _phase_of(round_id: int) -> int:
+    return round_id >> 64
+
+
+def encode_get_round_data(round_id: int) -> bytes:
+    return GET_ROUND_DATA_SELECTOR + encode(['uint80'], [round_id])
+
+
+def decode_round_data(return_data: bytes):
+    """
+    (roundId, answer, startedAt, updatedAt, answeredInRound), ou None si la réponse est vide.
+    """
+    if len(return_data) < 32 * len(ROUND_DATA_TYPES):
+        return None
+    return tuple(decode(ROUND_DATA_TYPES, return_data))
+
+
+class RoundDataReader:
+    """
+    Lecture de getRoundData par lots de `batch_size` appels via Multicall3.
+
+    use_multicall=False : un appel direct par round (nœuds sans Multicall3).
+
+    `cache` : {roundId global: données ou None} des rounds déjà lus ;
+    `probes`, `calls` et `cache_hits` : rounds lus par RPC, appels eth_call
+    correspondants (y compris ceux des lots coupés en deux après un refus)
+    et rounds servis par le cache, par phase.
+    """
+
+    def __init__(self, web3, feed_address, contract=None, batch_size=500,
+                 multicall_address=MULTICALL3_ADDRESS, use_multicall=True):
+        self.web3 = web3
+        self.feed_address = Web3.to_checksum_address(feed_address)
+        self.contract = contract
+        self.batch_size = batch_size
+        self.use_multicall = use_multicall
+        self.multicall = web3.eth.contract(
+            address=Web3.to_checksum_address(multicall_address), abi=MULTICALL3_ABI
+        )
+        self.cache = {}
+        self.probes = Counter()
+        self.calls = Counter()
+        self.cache_hits = Counter()
+
+    def _aggregate(self, round_ids):
+        """
+        Un appel aggregate3. Si le nœud refuse le lot (taille, gas), il est coupé en deux.
+        """
+        calls = [(self.feed_address, True, encode_get_round_data(rid)) for rid in round_ids]
+        self.calls[_phase_of(round_ids[0])] += 1
+        start = time.perf_counter()
+        try:
+            results = self.multicall.functions.aggregate3(calls).call()
+        except Exception as e:
+            METRICS.rpc_request(["eth_call"], time.perf_counter() - start, error=True)
+            if len(round_ids) == 1:
+                print(f"Erreur sur {round_ids[0]}: {e}")
+                return {round_ids[0]: None}
+            half = len(round_ids) // 2
+            rounds = self._aggregate(round_ids[:half])
+            rounds.update(self._aggregate(round_ids[half:]))
+            return rounds
+        METRICS.rpc_request(["eth_call"], time.perf_counter() - start)
+        return {
+            rid: decode_round_data(return_data) if success else None
+            for rid, (success, return_data) in zip(round_ids, results)
+        }
+
+    def _direct(self, round_ids):
+        rounds = {}
+        for rid in round_ids:
+            start = time.perf_counter()
+            try:
+                rounds[rid] = tuple(self.contract.functions.getRoundData(rid).call())
+            except Exception:
+                rounds[rid] = None
+            METRICS.rpc_request(["eth_call"], time.perf_counter() - start, error=rounds[rid] is None)
+        return rounds
+
+    def _fetch(self, round_ids) -> dict:
+        phase = _phase_of(round_ids[0])
+        if not self.use_multicall:
+            self.calls[phase] += len(round_ids)
+            return self._direct(round_ids)
+        rounds = {}
+        for i in range(0, len(round_ids), self.batch_size):
+            rounds.update(self._aggregate(round_ids[i:i + self.batch_size]))
+        return rounds
+
+    def get_rounds(self, round_ids) -> dict:
+        """
+        {roundId global: données du round ou None si l'appel a échoué}.
+        Seuls les rounds absents du cache sont lus par RPC.
+        """
+        round_ids = list(dict.fromkeys(round_ids))
+        missing = [rid for rid in round_ids if rid not in self.cache]
+        for rid in round_ids:
+            if rid in self.cache:
+                self.cache_hits[_phase_of(rid)] += 1
+        if missing:
+            self.cache.update(self._fetch(missing))
+            for rid in missing:
+                self.probes[_phase_of(rid)] += 1
+        return {rid: self.cache[rid] for rid in round_ids}
+
+    def get_round(self, round_id: int):
+        return self.get_rounds([round_id])[round_id]
+
+    def get_timestamps(self, round_ids) -> dict:
+        """
+        {roundId global: updatedAt, ou None si le round est invalide}.
+        """
+        rounds = self.get_rounds(round_ids)
+        return {rid: rd[3] if rd is not None and rd[3] != 0 else None for rid, rd in rounds.items()}
+
+    def load_cache(self, path: str) -> int:
+        """
+        Charge les rounds des phases clôturées enregistrés par save_cache. Retourne leur nombre.
+        """
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+        rounds = state.get(self.feed_address, {})
+        self.cache.update({int(rid): tuple(rd) for rid, rd in rounds.items()})
+        return len(rounds)
+
+    def save_cache(self, path: str, closed_before_phase: int) -> None:
+        """
+        Enregistre les rounds valides des phases < closed_before_phase (phases
+        clôturées, dont les rounds ne changeront plus), par remplacement atomique.
+        """
+        state = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+        rounds = state.get(self.feed_address, {})
+        rounds.update({
+            str(rid): list(rd) for rid, rd in sorted(self.cache.items())
+            if rd is not None and _phase_of(rid) < closed_before_phase
+        })
+        state[self.feed_address] = rounds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
@@ -0,0 +1,123 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Manifeste des fichiers cryo déjà traités par Uniswap_process_logs.py.
+
+Pour chaque fichier : taille, date de modification et plage de blocs.
+Les plages de blocs couvertes sont fusionnées ; une ligne dont le bloc est
+déjà couvert a été écrite lors d'une exécution précédente et est ignorée.
+Le manifeste n'est enregistré qu'après l'écriture des résultats, par
+remplacement atomique du fichier JSON.
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+
+DEFAULT_MANIFEST_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), os.pardir, 'data', 'uniswap_manifest.json')
+)
+
+# Nom des fichiers cryo : ethereum__logs__0017000000_to_0017099999.csv
+CRYO_RANGE_PATTERN = re.compile(r'__(\d+)_to_(\d+)\.csv$')
+
+
+def block_range_from_filename(path: str):
+    """
+    Plage de blocs [premier, dernier] encodée dans le nom d'un fichier cryo, ou None.
+    """
+    match = CRYO_RANGE_PATTERN.search(os.path.basename(path))
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def file_fingerprint(path: str) -> dict:
+    """
+    Empreinte légère d'un fichier (taille et date de modification).
+    """
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _merge_ranges(ranges):
+    """
+    Fusionne des plages [lo, hi] qui se chevauchent ou se touchent.
+    """
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return merged
+
+
+class ProcessingManifest:
+    """
+    Fichiers traités et plages de blocs couvertes, persistés en JSON.
+    """
+
+    def __init__(self, path: str = DEFAULT_MANIFEST_PATH):
+        self.path = path
+        self.files = {}
+        self.covered = []
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+            self.files = state.get("files", {})
+            self.covered = _merge_ranges(state.get("covered_blocks", []))
+
+    def is_processed(self, csv_path: str) -> bool:
+        """
+        Vrai si le fichier a déjà été traité et n'a pas changé depuis.
+        """
+        entry = self.files.get(os.path.basename(csv_path))
+        return entry is not None and entry["fingerprint"] == file_fingerprint(csv_path)
+
+    def covered_mask(self, block_numbers) -> np.ndarray:
+        """
+        Masque booléen des blocs déjà couverts par une exécution précédente.
+        """
+        blocks = np.asarray(block_numbers, dtype=np.int64)
+        if not self.covered:
+            return np.zeros(len(blocks), dtype=bool)
+        starts = np.array([lo for lo, _ in self.covered], dtype=np.int64)
+        ends = np.array([hi for _, hi in self.covered], dtype=np.int64)
+        pos = np.searchsorted(starts, blocks, side='right') - 1
+        return (pos >= 0) & (blocks <= ends[np.clip(pos, 0, None)])
+
+    def cover(self, first_block: int, last_block: int) -> None:
+        """
+        Marque une plage de blocs comme traitée (progression à l'intérieur d'un fichier).
+        """
+        self.covered = _merge_ranges(self.covered + [[int(first_block), int(last_block)]])
+        self.save()
+
+    def record(self, csv_path: str, first_block, last_block, rows: int) -> None:
+        """
+        Marque le fichier comme traité et enregistre le manifeste.
+        first_block/last_block à None : plage inconnue, seule l'empreinte est conservée.
+        """
+        has_range = first_block is not None and last_block is not None
+        self.files[os.path.basename(csv_path)] = {
+            "fingerprint": file_fingerprint(csv_path),
+            "first_block": int(first_block) if has_range else None,
+            "last_block": int(last_block) if has_range else None,
+            "rows": int(rows),
+        }
+        if has_range:
+            self.covered = _merge_ranges(self.covered + [[int(first_block), int(last_block)]])
+        self.save()
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"files": self.files, "covered_blocks": self.covered}, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,208 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Sortie colonnaire Parquet, partitionnée par jour ou par mois.
+
+Arborescence (partitionnement Hive) :
+    data/parquet/uniswap/month=2024-04/part-00000.parquet
+
+Chaque ajout écrit un nouveau fichier dans la ou les partitions concernées
+(en pratique la dernière) sans réécrire les autres. `read_range` ne lit que
+les partitions qui recoupent l'intervalle demandé, puis filtre sur le
+timestamp (predicate pushdown sur les statistiques Parquet).
+
+Conversion des CSV existants :
+    python3 scripts/columnar_store.py convert uniswap data/uniswap_eth_usd.csv data/parquet/uniswap
+    python3 scripts/columnar_store.py compact data/parquet/uniswap
+"""
+
+import argparse
+import glob
+import os
+import sys
+from decimal import Decimal
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # dépendance optionnelle
+    pa = ds = pq = None
+
+DEFAULT_PARQUET_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), os.pardir, 'data', 'parquet'))
+
+PARTITION_FORMATS = {
+    "day": ("date", "%Y-%m-%d"),
+    "month": ("month", "%Y-%m"),
+}
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow est requis pour la sortie Parquet (pip install -r requirements-parquet.txt)")
+
+
+def _schemas():
+    """
+    Schémas typés des deux jeux de données.
+    """
+    return {
+        "uniswap": pa.schema([
+            ("timestamp", pa.timestamp("s", tz="UTC")),
+            ("price_usdc_per_eth", pa.float64()),
+            ("usdc_amount", pa.float64()),
+            ("eth_amount", pa.float64()),
+            ("volume_usdc", pa.float64()),
+            ("block_number", pa.int64()),
+            ("transaction_hash", pa.string()),
+        ]),
+        "chainlink": pa.schema([
+            ("global_round_id", pa.decimal128(25, 0)),  # uint80 : ne tient pas dans un int64
+            ("phase", pa.int64()),
+            ("aggregator_round", pa.int64()),
+            ("datetime_utc", pa.timestamp("s", tz="UTC")),
+            ("price", pa.float64()),
+        ]),
+    }
+
+
+# Colonne temporelle de chaque jeu de données
+TIME_COLUMNS = {"uniswap": "timestamp", "chainlink": "datetime_utc"}
+
+
+def to_arrow_table(df: pd.DataFrame, dataset: str):
+    """
+    Convertit un DataFrame (tel qu'écrit en CSV) en table Arrow typée.
+    """
+    _require_pyarrow()
+    schema = _schemas()[dataset]
+    df = df.copy()
+    time_col = TIME_COLUMNS[dataset]
+    df[time_col] = pd.to_datetime(df[time_col], utc=True).dt.floor("s")
+    if dataset == "chainlink":
+        df["global_round_id"] = [Decimal(int(v)) for v in df["global_round_id"]]
+    else:
+        # Les anciennes sorties mpmath sont des chaînes de 50 chiffres
+        for col in ("price_usdc_per_eth", "usdc_amount", "eth_amount", "volume_usdc"):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+
+
+def append_partitioned(df: pd.DataFrame, root: str, dataset: str, partition: str = "month") -> int:
+    """
+    Ajoute les lignes de `df` au jeu de données partitionné sous `root`.
+    Seules les partitions qui reçoivent des lignes sont touchées (un nouveau
+    fichier part-NNNNN.parquet par partition). Retourne le nombre de lignes écrites.
+    """
+    _require_pyarrow()
+    if df.empty:
+        return 0
+    key, fmt = PARTITION_FORMATS[partition]
+    table = to_arrow_table(df, dataset)
+    partitions = pd.to_datetime(df[TIME_COLUMNS[dataset]], utc=True).dt.strftime(fmt).to_numpy()
+
+    for value in sorted(set(partitions)):
+        directory = os.path.join(root, f"{key}={value}")
+        os.makedirs(directory, exist_ok=True)
+        part_index = len(glob.glob(os.path.join(directory, "part-*.parquet")))
+        rows = table.filter(pa.array(partitions == value))
+        pq.write_table(rows, os.path.join(directory, f"part-{part_index:05d}.parquet"))
+    return table.num_rows
+
+
+def compact(root: str) -> None:
+    """
+    Fusionne les fichiers de chaque partition en un seul part-00000.parquet.
+    """
+    _require_pyarrow()
+    for directory in sorted(glob.glob(os.path.join(root, "*=*"))):
+        parts = sorted(glob.glob(os.path.join(directory, "part-*.parquet")))
+        if len(parts) < 2:
+            continue
+        table = pa.concat_tables([pq.read_table(p) for p in parts])
+        tmp_path = os.path.join(directory, "compact.parquet.tmp")
+        pq.write_table(table, tmp_path)
+        for p in parts:
+            os.remove(p)
+        os.replace(tmp_path, os.path.join(directory, "part-00000.parquet"))
+        print(f"{directory} : {len(parts)} fichiers fusionnés ({table.num_rows} lignes)")
+
+
+def read_range(root: str, dataset: str, start=None, end=None, columns=None) -> pd.DataFrame:
+    """
+    Lit les lignes dont le timestamp est dans [start, end] (bornes optionnelles,
+    datetime ou chaîne ISO). Les partitions hors intervalle ne sont pas ouvertes.
+    Sans aucune partition (jeu de données pas encore écrit), retourne un
+    DataFrame vide aux colonnes et types du jeu de données.
+    """
+    _require_pyarrow()
+    partition_key = next(
+        (key for key, _ in PARTITION_FORMATS.values() if glob.glob(os.path.join(root, f"{key}=*"))), None
+    )
+    if partition_key is None:
+        schema = _schemas()[dataset]
+        return schema.empty_table().select(columns or schema.names).to_pandas()
+    fmt = dict(PARTITION_FORMATS.values())[partition_key]
+    partitioning = ds.partitioning(pa.schema([(partition_key, pa.string())]), flavor="hive")
+    dataset_obj = ds.dataset(root, format="parquet", partitioning=partitioning)
+    time_col = TIME_COLUMNS[dataset]
+
+    expr = None
+    for bound, op in ((start, "ge"), (end, "le")):
+        if bound is None:
+            continue
+        bound = pd.Timestamp(bound)
+        if bound.tzinfo is None:
+            bound = bound.tz_localize("UTC")
+        # Élagage des partitions (clé texte ISO, comparable lexicographiquement) puis filtre fin
+        part_value = bound.strftime(fmt)
+        part_expr = ds.field(partition_key) >= part_value if op == "ge" else ds.field(partition_key) <= part_value
+        time_expr = ds.field(time_col) >= bound.to_pydatetime() if op == "ge" else ds.field(time_col) <= bound.to_pydatetime()
+        clause = part_expr & time_expr
+        expr = clause if expr is None else expr & clause
+
+    table = dataset_obj.to_table(columns=columns, filter=expr)
+    df = table.to_pandas()
+    return df.drop(columns=[partition_key], errors="ignore")
+
+
+def convert_csv(csv_path: str, root: str, dataset: str, partition: str = "month", chunk_size: int = 500_000) -> int:
+    """
+    Convertit un CSV existant en jeu de données Parquet partitionné, par morceaux.
+    """
+    total = 0
+    with pd.read_csv(csv_path, chunksize=chunk_size, dtype={"global_round_id": str}) as reader:
+        for chunk in reader:
+            if dataset == "chainlink":
+                chunk["global_round_id"] = chunk["global_round_id"].map(int)
+            total += append_partitioned(chunk, root, dataset, partition)
+            print(f"{total} lignes converties")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Outils pour la sortie Parquet partitionnée.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = sub.add_parser("convert", help="Convertit un CSV existant en Parquet partitionné.")
+    convert_parser.add_argument("dataset", choices=sorted(TIME_COLUMNS))
+    convert_parser.add_argument("csv_path")
+    convert_parser.add_argument("root", help="Répertoire racine du jeu de données Parquet.")
+    convert_parser.add_argument("--partition", choices=sorted(PARTITION_FORMATS), default="month")
+
+    compact_parser = sub.add_parser("compact", help="Fusionne les fichiers de chaque partition.")
+    compact_parser.add_argument("root")
+
+    args = parser.parse_args()
+    try:
+        if args.command == "convert":
+            rows = convert_csv(args.csv_path, args.root, args.dataset, args.partition)
+            print(f"Terminé. {rows} lignes écrites dans {args.root}.")
+        else:
+            compact(args.root)
+    except ImportError as e:
+        print(f"ERREUR: {e}", file=sys.stderr)
+        sys.exit(1)
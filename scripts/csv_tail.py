@@ -0,0 +1,75 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Lecture (et remplacement) de la dernière ligne d'un CSV sans parcourir tout le fichier.
+
+Le fichier est lu à rebours par blocs depuis la fin jusqu'au saut de ligne
+qui précède le dernier enregistrement : le coût ne dépend pas de la taille
+du fichier.
+"""
+
+import csv
+import io
+import os
+
+
+def _seek_last_line(f, block_size: int):
+    """
+    (position, contenu) de la dernière ligne non vide d'un fichier ouvert en binaire ;
+    contenu vide si le fichier ne contient aucune ligne.
+    """
+    f.seek(0, os.SEEK_END)
+    position = f.tell()
+    buffer = b''
+    while position > 0:
+        step = min(block_size, position)
+        position -= step
+        f.seek(position)
+        buffer = f.read(step) + buffer
+        stripped = buffer.rstrip(b'\r\n')
+        newline = stripped.rfind(b'\n')
+        if newline != -1:
+            return position + newline + 1, stripped[newline + 1:]
+    return 0, buffer.rstrip(b'\r\n')
+
+
+def read_last_line(path, block_size: int = 4096):
+    """
+    Dernière ligne non vide du fichier (sans fin de ligne), ou None si le fichier est vide.
+    """
+    with open(path, 'rb') as f:
+        _, line = _seek_last_line(f, block_size)
+    return line.decode('utf-8').rstrip('\r') if line else None
+
+
+def remove_last_line(path, block_size: int = 4096) -> None:
+    """
+    Tronque le fichier juste avant sa dernière ligne non vide (réécriture en place).
+    """
+    with open(path, 'r+b') as f:
+        position, _ = _seek_last_line(f, block_size)
+        f.truncate(position)
+
+
+def read_header(path):
+    """
+    Noms de colonnes de la première ligne du CSV (liste vide si le fichier est vide).
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        return next(csv.reader(f), [])
+
+
+def read_last_record(path):
+    """
+    Dernier enregistrement du CSV sous forme de dict {colonne: valeur},
+    ou None si le fichier ne contient que l'en-tête (ou rien).
+    """
+    header = read_header(path)
+    last_line = read_last_line(path)
+    if not header or last_line is None:
+        return None
+    values = next(csv.reader(io.StringIO(last_line)), [])
+    if values == header:
+        return None
+    return dict(zip(header, values))
@@ -0,0 +1,160 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Manifeste annexe d'un jeu de données CSV cumulé (data/uniswap_eth_usd.csv,
+data/chainlink_eth_usd.csv) : nombre de lignes, premier et dernier
+timestamp, taille en octets et CRC32 du fichier.
+
+Le manifeste <jeu>.manifest.json est tenu à jour par les écrivains après
+chaque ajout (pipeline.py, follow_chain.py) : seuls les octets ajoutés
+depuis la mise à jour précédente sont lus, et le CRC32 est prolongé sur
+ces octets (zlib.crc32 est cumulatif). Les lecteurs (generate_readme.py)
+obtiennent les statistiques sans parcourir le fichier.
+
+Un fichier plus court que le manifeste, ou dont les derniers octets connus
+ont changé, a été réécrit hors des écrivains : le manifeste est alors
+recalculé par un parcours complet. --verify recalcule le CRC32 de tout le
+fichier et le compare au manifeste.
+
+    python3 scripts/dataset_manifest.py data/uniswap_eth_usd.csv --verify
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import zlib
+from datetime import datetime, timezone
+
+from csv_tail import read_header, read_last_record
+
+SIDECAR_SUFFIX = ".manifest.json"
+TIMESTAMP_COLUMNS = ("timestamp", "datetime_utc")  # Colonne horodatée des swaps, puis des rounds
+TAIL_BYTES = 4096  # Derniers octets connus, relus pour détecter une réécriture
+BLOCK_SIZE = 1 << 20
+
+
+def sidecar_path(path: str) -> str:
+    """
+    Chemin du manifeste annexe : data/uniswap_eth_usd.csv → data/uniswap_eth_usd.manifest.json.
+    """
+    return os.path.splitext(path)[0] + SIDECAR_SUFFIX
+
+
+def load_stats(path: str):
+    """
+    Contenu du manifeste annexe tel qu'enregistré (sans contrôle), ou None.
+    """
+    try:
+        with open(sidecar_path(path), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _tail_crc(f, end: int) -> int:
+    start = max(0, end - TAIL_BYTES)
+    f.seek(start)
+    return zlib.crc32(f.read(end - start))
+
+
+def _first_value(path: str, column: str):
+    with open(path, newline='', encoding='utf-8') as f:
+        row = next(csv.DictReader(f), None)
+    return row.get(column) if row else None
+
+
+def _save(path: str, stats: dict) -> None:
+    target = sidecar_path(path)
+    tmp_path = target + ".tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, indent=2)
+        os.replace(tmp_path, target)
+    except OSError as e:
+        # Le manifeste n'est qu'un cache : les statistiques restent valables sans lui
+        print(f"Manifeste {target} non enregistré: {e}", file=sys.stderr)
+
+
+def dataset_stats(path: str, timestamp_column=None, full: bool = False):
+    """
+    Statistiques du CSV, d'après son manifeste annexe mis à jour si le fichier
+    a grandi depuis (lecture des seuls octets ajoutés) :
+
+        {"dataset", "timestamp_column", "rows", "first_timestamp",
+         "last_timestamp", "bytes", "crc32", "tail_crc32", "updated_at"}
+
+    timestamp_column : colonne des timestamps (défaut: la première de
+    TIMESTAMP_COLUMNS présente dans l'en-tête). full : ignorer le manifeste et
+    parcourir tout le fichier. Retourne None si le fichier n'existe pas.
+    """
+    if not os.path.exists(path):
+        return None
+    size = os.path.getsize(path)
+    stats = None if full else load_stats(path)
+
+    with open(path, 'rb') as f:
+        if stats is not None and (stats.get("bytes", size + 1) > size or _tail_crc(f, stats["bytes"]) != stats.get("tail_crc32")):
+            # Fichier tronqué ou réécrit hors des écrivains : les statistiques sont recalculées
+            stats = None
+        if stats is not None and stats["bytes"] == size:
+            return stats
+
+        if stats is None:
+            header = read_header(path)
+            column = timestamp_column or next((c for c in TIMESTAMP_COLUMNS if c in header), None)
+            stats = {"dataset": os.path.basename(path), "timestamp_column": column, "rows": 0,
+                     "first_timestamp": None, "last_timestamp": None, "bytes": 0, "crc32": 0}
+
+        # Seuls les octets ajoutés depuis la dernière mise à jour sont lus
+        f.seek(stats["bytes"])
+        crc, newlines = stats["crc32"], 0
+        while True:
+            block = f.read(BLOCK_SIZE)
+            if not block:
+                break
+            crc = zlib.crc32(block, crc)
+            newlines += block.count(b'\n')
+        if stats["bytes"] == 0 and newlines:
+            newlines -= 1  # Ligne d'en-tête
+        stats.update(rows=stats["rows"] + newlines, bytes=size, crc32=crc, tail_crc32=_tail_crc(f, size))
+
+    column = stats["timestamp_column"]
+    if column and stats["rows"]:
+        if stats["first_timestamp"] is None:
+            stats["first_timestamp"] = _first_value(path, column)
+        last_row = read_last_record(path)
+        stats["last_timestamp"] = last_row.get(column) if last_row else None
+    stats["updated_at"] = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S+00:00')
+    _save(path, stats)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manifeste annexe (lignes, timestamps, taille, CRC32) d'un jeu de données CSV.")
+    parser.add_argument("paths", nargs='+', help="CSV des jeux de données.")
+    parser.add_argument("--verify", action="store_true",
+                        help="Recalculer le CRC32 de tout le fichier et le comparer au manifeste.")
+    args = parser.parse_args()
+
+    failed = False
+    for path in args.paths:
+        if not os.path.exists(path):
+            print(f"ERREUR: fichier {path} introuvable.", file=sys.stderr)
+            sys.exit(1)
+        if args.verify:
+            recorded = load_stats(path)
+            stats = dataset_stats(path, full=True)
+            if recorded is not None and recorded.get("bytes") == stats["bytes"] \
+                    and (recorded.get("crc32"), recorded.get("rows")) != (stats["crc32"], stats["rows"]):
+                print(f"ERREUR: {path} ne correspond plus à son manifeste "
+                      f"(crc32 {recorded.get('crc32')} → {stats['crc32']}, lignes {recorded.get('rows')} → {stats['rows']})",
+                      file=sys.stderr)
+                failed = True
+        else:
+            stats = dataset_stats(path)
+        print(json.dumps(stats, indent=2))
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,448 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Suivi de la tête de chaîne : mode démon de l'extraction Uniswap / Chainlink.
+
+Au lieu de relancer update.sh tous les INTERVAL_DAYS jours, un seul
+processus interroge la tête de chaîne (eth_blockNumber toutes les
+--poll-interval secondes). Dès qu'un bloc atteint la profondeur de
+confirmation, ses events Swap sont lus par eth_getLogs et décodés, et les
+nouveaux rounds Chainlink sont lus (latestRoundData au bloc confirmé, puis
+getRoundData des rounds manquants au même bloc, en une requête batch). Les
+prix sont convertis avec les décimales du flux, lues une fois au démarrage
+(decimals()). Les lignes sont ajoutées aux jeux de données cumulés :
+
+    data/uniswap_eth_usd.csv (barres OHLCV / VWAP et Parquet selon les options)
+    data/chainlink_eth_usd.csv
+
+Le manifeste annexe de chaque CSV (lignes, timestamps, taille, CRC32 :
+dataset_manifest.py) est prolongé à chaque écriture.
+
+Reprise : les blocs Uniswap repartent du manifeste (data/uniswap_manifest.json,
+partagé avec Uniswap_process_logs.py), les rounds Chainlink du dernier round
+du CSV. Le client RPC, la session HTTP et l'index des timestamps de blocs
+restent ouverts d'un bloc à l'autre.
+
+Réorganisations : seuls les blocs à --confirmations blocs de la tête sont
+lus. Le hash du dernier bloc lu est revérifié au cycle suivant ; une
+réorganisation plus profonde est signalée (chain_reorgs_total) mais les
+lignes déjà écrites ne sont pas corrigées.
+
+Les lignes restent en mémoire au plus --flush-interval secondes (0 : écrites
+à chaque cycle). SIGTERM ou SIGINT terminent le cycle en cours, écrivent les
+lignes en attente et les métriques, puis arrêtent le processus.
+
+Fraîcheur : block_to_row_seconds{dataset} mesure, pour chaque ligne écrite,
+le délai entre le timestamp de son bloc (updatedAt pour un round) et son
+écriture. Avec --metrics-dir, metrics_follow.json et .prom sont réécrits
+toutes les --metrics-interval secondes et à l'arrêt.
+
+    RPC=http://127.0.0.1:8545 python3 scripts/follow_chain.py --confirmations 3
+"""
+
+import argparse
+import csv
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+from web3 import Web3
+
+from Uniswap_process_logs import (DEFAULT_LOG_CHUNK_SIZE, PriceWriter, iter_decoded_chunks,
+                                  iter_rpc_log_chunks)
+from bars import DATA_DIR, INTERVALS as BAR_INTERVALS
+from block_index import DEFAULT_INDEX_PATH, BlockTimestampIndex
+from block_timestamps import BlockTimestampError
+from chainlink_async import to_round_id
+from chainlink_rounds import decode_round_data, encode_get_round_data
+from checkpoint import DEFAULT_MANIFEST_PATH, ProcessingManifest
+from columnar_store import DEFAULT_PARQUET_DIR, PARTITION_FORMATS, append_partitioned
+from csv_tail import read_last_record
+from dataset_manifest import dataset_stats
+from metrics import METRICS, ProgressLogger, export_at_exit, write_metrics
+from rpc_client import PooledRpcClient, RpcError, rate_limit_from_env
+
+CHAINLINK_FEED_ADDRESS = '0x5f4ec3df9cbd43714fe2740f5e3616155c5b8419'  # Proxy Chainlink ETH/USD sur Ethereum Mainnet
+LATEST_ROUND_DATA_SELECTOR = bytes(Web3.keccak(text="latestRoundData()")[:4])
+DECIMALS_SELECTOR = bytes(Web3.keccak(text="decimals()")[:4])
+CHAINLINK_HEADER = ["global_round_id", "phase", "aggregator_round", "datetime_utc", "price"]
+
+DEFAULT_CONFIRMATIONS = 3     # Blocs entre la tête et le dernier bloc lu (~36 s sur Ethereum)
+DEFAULT_POLL_INTERVAL = 2.0   # Secondes entre deux lectures de eth_blockNumber
+PHASE_TAIL = 32               # Rounds sondés à la fin d'une phase qui vient d'être remplacée
+
+
+def parse_round_id(round_id: int) -> tuple:
+    return round_id >> 64, round_id & 0xFFFFFFFFFFFFFFFF
+
+
+def last_chainlink_round(path: str):
+    """
+    (phase, aggregatorRoundId) du dernier round du CSV Chainlink, ou None.
+    """
+    if not os.path.exists(path):
+        return None
+    last_row = read_last_record(path)
+    return parse_round_id(int(last_row["global_round_id"])) if last_row else None
+
+
+class ChainFollower:
+    """
+    État du suivi : dernier bloc Uniswap lu (et son hash), dernier round
+    Chainlink, lignes en attente d'écriture.
+    """
+
+    def __init__(self, rpc, price_writer, chainlink_path, feed_address=CHAINLINK_FEED_ADDRESS,
+                 confirmations=DEFAULT_CONFIRMATIONS, from_block=None, log_chunk_size=DEFAULT_LOG_CHUNK_SIZE,
+                 chainlink_format="csv", chainlink_parquet_dir=os.path.join(DEFAULT_PARQUET_DIR, 'chainlink'),
+                 partition="month", **enrich_options):
+        self.rpc = rpc
+        self.price_writer = price_writer
+        self.manifest = price_writer.manifest
+        self.chainlink_path = chainlink_path
+        self.feed_address = Web3.to_checksum_address(feed_address)
+        self.confirmations = confirmations
+        self.log_chunk_size = log_chunk_size
+        self.chainlink_csv = chainlink_format in ("csv", "both")
+        self.chainlink_parquet = chainlink_format in ("parquet", "both")
+        self.chainlink_parquet_dir = chainlink_parquet_dir
+        self.partition = partition
+        self.enrich_options = dict(enrich_options, manifest=self.manifest)
+
+        self.head = self.get_head()
+        confirmed = self.head - confirmations
+        self.decimals = self.feed_decimals(confirmed)
+        if from_block is not None:
+            self.next_block = from_block
+        elif self.manifest is not None and self.manifest.covered:
+            self.next_block = self.manifest.covered[-1][1] + 1
+        else:
+            self.next_block = confirmed
+            print(f"Aucun bloc couvert dans le manifeste : suivi à partir du bloc {confirmed}")
+        self.last_hash = None
+        if self.next_block > 0:
+            self.last_hash = self.block_hashes([self.next_block - 1]).get(self.next_block - 1)
+
+        self.last_round = last_chainlink_round(chainlink_path)
+        if self.last_round is None:
+            latest = self.latest_round(confirmed)
+            self.last_round = parse_round_id(latest[0])
+            print(f"Aucun round dans {chainlink_path} : suivi à partir du round {latest[0]} "
+                  f"(historique : chainlink_dicho.py)")
+
+        self.pending_prices = []   # (prix, premier bloc, dernier bloc)
+        self.pending_rounds = []   # (roundId global, phase, aggregatorRoundId, answer, updatedAt)
+
+    def get_head(self) -> int:
+        return int(self.rpc.call("eth_blockNumber", []), 16)
+
+    def block_hashes(self, block_numbers) -> dict:
+        """
+        {bloc: hash} (un seul appel batch) ; les blocs sans réponse sont absents.
+        """
+        replies = self.rpc.batch([("eth_getBlockByNumber", [hex(bn), False]) for bn in block_numbers])
+        return {
+            bn: reply["result"]["hash"]
+            for bn, reply in zip(block_numbers, replies)
+            if reply and reply.get("result")
+        }
+
+    def latest_round(self, block: int) -> tuple:
+        """
+        latestRoundData du proxy au bloc `block`.
+        """
+        data = "0x" + LATEST_ROUND_DATA_SELECTOR.hex()
+        result = self.rpc.call("eth_call", [{"to": self.feed_address, "data": data}, hex(block)])
+        round_data = decode_round_data(bytes.fromhex(result[2:]))
+        if round_data is None:
+            raise RpcError(f"latestRoundData: réponse vide au bloc {block}")
+        return round_data
+
+    def feed_decimals(self, block: int) -> int:
+        """
+        decimals() du proxy au bloc `block` : décimales des réponses du flux.
+        """
+        result = self.rpc.call("eth_call", [{"to": self.feed_address, "data": "0x" + DECIMALS_SELECTOR.hex()}, hex(block)])
+        if not result or result == "0x":
+            raise RpcError(f"decimals: réponse vide au bloc {block}")
+        return int(result, 16)
+
+    def get_rounds(self, round_ids, block: int, batch_size=100) -> dict:
+        """
+        {roundId global: données getRoundData au bloc `block`, ou None (round inexistant ou appel en échec)}.
+        Lus au même bloc confirmé que latestRoundData : un round publié dans un
+        bloc plus récent, encore réorganisable, n'est pas écrit.
+        """
+        rounds = {}
+        for i in range(0, len(round_ids), batch_size):
+            chunk = round_ids[i:i + batch_size]
+            calls = [
+                ("eth_call", [{"to": self.feed_address, "data": "0x" + encode_get_round_data(rid).hex()}, hex(block)])
+                for rid in chunk
+            ]
+            for rid, reply in zip(chunk, self.rpc.batch(calls)):
+                result = reply.get("result") if reply else None
+                rounds[rid] = decode_round_data(bytes.fromhex(result[2:])) if result else None
+        return rounds
+
+    def check_reorg(self) -> None:
+        """
+        Revérifie le hash du dernier bloc lu : s'il a changé, la réorganisation
+        est plus profonde que la profondeur de confirmation.
+        """
+        if self.last_hash is None:
+            return
+        block = self.next_block - 1
+        current = self.block_hashes([block]).get(block)
+        if current is not None and current != self.last_hash:
+            METRICS.count("chain_reorgs_total")
+            print(f"ERREUR: réorganisation au-delà de {self.confirmations} confirmations détectée au bloc {block} "
+                  f"({self.last_hash} → {current}) ; les lignes déjà écrites ne sont pas corrigées", file=sys.stderr)
+            self.last_hash = current
+
+    def poll_uniswap(self, last_block: int) -> int:
+        """
+        Events Swap des blocs [next_block, last_block], mis en attente d'écriture.
+        Retourne le nombre de prix décodés. Les tranches ne sont mises en attente
+        qu'une fois toute la plage lue : après une erreur, la plage est relue
+        entière au cycle suivant sans dupliquer de swaps.
+        """
+        first_block = self.next_block
+        chunks = METRICS.timed_iter(
+            iter_rpc_log_chunks(self.rpc, first_block, last_block, self.log_chunk_size,
+                                self.enrich_options.get('concurrency', 4)),
+            "fetch_logs"
+        )
+        decoded_chunks = [
+            (prices, chunk_first, chunk_last)
+            for prices, chunk_first, chunk_last, _ in iter_decoded_chunks(chunks, self.rpc, **self.enrich_options)
+        ]
+        last_hash = self.block_hashes([last_block]).get(last_block)
+        self.pending_prices.extend(decoded_chunks)
+        self.next_block = last_block + 1
+        self.last_hash = last_hash
+        return sum(len(prices) for prices, _, _ in decoded_chunks)
+
+    def poll_chainlink(self, block: int) -> int:
+        """
+        Rounds publiés depuis le dernier round connu jusqu'au bloc `block`, mis en attente d'écriture.
+        Un round illisible arrête la lecture : il sera relu au cycle suivant.
+        Retourne le nombre de nouveaux rounds.
+        """
+        phase, aggregator_id = parse_round_id(self.latest_round(block)[0])
+        last_phase, last_agg = self.last_round
+        if (phase, aggregator_id) <= (last_phase, last_agg):
+            return 0
+        if phase == last_phase:
+            wanted = [to_round_id(phase, agg) for agg in range(last_agg + 1, aggregator_id + 1)]
+        else:
+            # Nouvelle phase : derniers rounds éventuels de l'ancienne, puis la nouvelle depuis 1
+            print(f"Nouvelle phase Chainlink {phase} (phase précédente : {last_phase})")
+            wanted = [to_round_id(last_phase, agg) for agg in range(last_agg + 1, last_agg + PHASE_TAIL + 1)]
+            wanted += [to_round_id(phase, agg) for agg in range(1, aggregator_id + 1)]
+
+        rounds = self.get_rounds(wanted, block)
+        new_rounds, previous_phase_closed = 0, False
+        for rid in wanted:
+            round_phase, agg = parse_round_id(rid)
+            rd = rounds[rid]
+            valid = rd is not None and rd[3] != 0
+            if round_phase != phase:
+                # Fin de l'ancienne phase : on s'arrête au premier round inexistant
+                previous_phase_closed = previous_phase_closed or not valid
+                if previous_phase_closed:
+                    continue
+            elif not valid:
+                print(f"Round {rid} illisible, nouvelle tentative au prochain cycle")
+                break
+            self.pending_rounds.append((rid, round_phase, agg, rd[1], rd[3]))
+            self.last_round = (round_phase, agg)
+            new_rounds += 1
+        METRICS.rows("chainlink", "decoded", new_rounds)
+        return new_rounds
+
+    def poll(self) -> tuple:
+        """
+        Un cycle : tête de chaîne, puis au plus `log_chunk_size` blocs confirmés.
+        Retourne (dernier bloc lu ou None, swaps décodés, nouveaux rounds, blocs restant à lire).
+        """
+        self.head = self.get_head()
+        confirmed = self.head - self.confirmations
+        if confirmed < self.next_block:
+            return None, 0, 0, 0
+        self.check_reorg()
+        last_block = min(confirmed, self.next_block + self.log_chunk_size - 1)
+        swaps = self.poll_uniswap(last_block)
+        rounds = self.poll_chainlink(last_block)
+        return last_block, swaps, rounds, confirmed - last_block
+
+    def flush(self) -> tuple:
+        """
+        Écrit les lignes en attente. Retourne (swaps écrits, rounds écrits).
+        """
+        swaps = rounds = 0
+        if self.pending_prices:
+            frames = [prices for prices, _, _ in self.pending_prices if not prices.empty]
+            prices = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+            first_block, last_block = self.pending_prices[0][1], self.pending_prices[-1][2]
+            swaps = self.price_writer.write(prices, first_block, last_block)
+            if swaps:
+                delays = (pd.Timestamp.now(tz='UTC') - prices['timestamp']).dt.total_seconds()
+                METRICS.observe_many("block_to_row_seconds", delays, dataset="uniswap")
+            self.pending_prices = []
+        if self.pending_rounds:
+            with METRICS.stage("write"):
+                self.write_rounds(self.pending_rounds)
+            now = time.time()
+            METRICS.observe_many("block_to_row_seconds", (now - r[4] for r in self.pending_rounds), dataset="chainlink")
+            METRICS.rows("chainlink", "written", len(self.pending_rounds))
+            rounds = len(self.pending_rounds)
+            self.pending_rounds = []
+        return swaps, rounds
+
+    def write_rounds(self, pending) -> None:
+        """
+        Ajoute les rounds au CSV (et au jeu Parquet), au format de chainlink_dicho.py.
+        """
+        rows = [
+            [rid, phase, agg, datetime.fromtimestamp(updated_at, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S+00:00'),
+             float(answer) / 10**self.decimals]
+            for rid, phase, agg, answer, updated_at in pending
+        ]
+        if self.chainlink_csv:
+            write_header = not os.path.exists(self.chainlink_path) or os.path.getsize(self.chainlink_path) == 0
+            with open(self.chainlink_path, mode='a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if write_header:
+                    writer.writerow(CHAINLINK_HEADER)
+                writer.writerows(rows)
+            dataset_stats(self.chainlink_path)
+        if self.chainlink_parquet:
+            append_partitioned(pd.DataFrame(rows, columns=CHAINLINK_HEADER), self.chainlink_parquet_dir,
+                               "chainlink", self.partition)
+
+    def run(self, stop: threading.Event, poll_interval=DEFAULT_POLL_INTERVAL, flush_interval=0.0,
+            metrics_dir=None, metrics_interval=60.0, progress_interval=60.0) -> None:
+        """
+        Boucle jusqu'à ce que `stop` soit levé, puis écrit les lignes en attente.
+        Une erreur RPC interrompt le cycle, qui est repris au suivant à partir du même bloc.
+        """
+        progress = ProgressLogger("Suivi de chaîne", unit="blocs", interval=progress_interval)
+        last_flush = last_metrics = time.monotonic()
+        totals = {"swaps": 0, "rounds": 0}
+        while not stop.is_set():
+            first_block, behind = self.next_block, 0
+            try:
+                last_block, swaps, rounds, behind = self.poll()
+            except (RpcError, BlockTimestampError) as e:
+                print(f"Erreur pendant le cycle (bloc {self.next_block}): {e}", file=sys.stderr)
+                last_block = None
+            if last_block is not None:
+                totals["swaps"] += swaps
+                totals["rounds"] += rounds
+                progress.update(last_block - first_block + 1,
+                                f"bloc {last_block} (tête {self.head}), {totals['swaps']} swaps, {totals['rounds']} rounds")
+            now = time.monotonic()
+            if now - last_flush >= flush_interval:
+                self.flush()
+                last_flush = now
+            if metrics_dir and now - last_metrics >= metrics_interval:
+                write_metrics(metrics_dir, "follow")
+                last_metrics = now
+            # En retard sur la tête (démarrage, rattrapage) : cycle suivant sans attendre
+            if not behind:
+                stop.wait(poll_interval)
+        swaps, rounds = self.flush()
+        print(f"Arrêt : {swaps} swaps et {rounds} rounds en attente écrits ; dernier bloc lu {self.next_block - 1}, "
+              f"{totals['swaps']} swaps et {totals['rounds']} rounds depuis le démarrage")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Suivi de la tête de chaîne : ajoute les swaps Uniswap et les rounds "
+                                                 "Chainlink des nouveaux blocs aux jeux de données.")
+    parser.add_argument("--confirmations", type=int, default=DEFAULT_CONFIRMATIONS,
+                        help=f"Blocs entre la tête et le dernier bloc lu, contre les réorganisations (défaut: {DEFAULT_CONFIRMATIONS}).")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help=f"Secondes entre deux lectures de la tête de chaîne (défaut: {DEFAULT_POLL_INTERVAL:g}).")
+    parser.add_argument("--flush-interval", type=float, default=0.0,
+                        help="Secondes maximales pendant lesquelles les lignes restent en mémoire (défaut: 0, écrites à chaque cycle).")
+    parser.add_argument("--from-block", type=int, default=None,
+                        help="Premier bloc Uniswap à lire (défaut: bloc suivant le dernier bloc du manifeste, sinon tête confirmée).")
+    parser.add_argument("--log-chunk-size", type=int, default=DEFAULT_LOG_CHUNK_SIZE,
+                        help=f"Blocs lus au plus par cycle et par requête eth_getLogs (défaut: {DEFAULT_LOG_CHUNK_SIZE}).")
+    parser.add_argument("--uniswap-output", default=os.path.join(DATA_DIR, 'uniswap_eth_usd.csv'),
+                        help="CSV Uniswap cumulé, complété en fin de fichier (défaut: data/uniswap_eth_usd.csv).")
+    parser.add_argument("--chainlink-output", default=os.path.join(DATA_DIR, 'chainlink_eth_usd.csv'),
+                        help="CSV Chainlink cumulé, complété en fin de fichier (défaut: data/chainlink_eth_usd.csv).")
+    parser.add_argument("--feed", default=CHAINLINK_FEED_ADDRESS, help="Adresse du proxy Chainlink (défaut: ETH/USD).")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST_PATH,
+                        help=f"Manifeste des blocs Uniswap déjà traités (défaut: {DEFAULT_MANIFEST_PATH}).")
+    parser.add_argument("--block-index", default=DEFAULT_INDEX_PATH,
+                        help=f"Index SQLite persistant bloc → timestamp (défaut: {DEFAULT_INDEX_PATH}).")
+    parser.add_argument("--no-block-index", action="store_true", help="Ne pas utiliser l'index persistant.")
+    parser.add_argument("--bars", nargs='+', choices=list(BAR_INTERVALS), default=[],
+                        help="Intervalles des barres OHLCV / VWAP à tenir à jour (défaut: aucune).")
+    parser.add_argument("--output-format", choices=["csv", "parquet", "both"], default="csv",
+                        help="Format de sortie : CSV (par défaut), Parquet partitionné, ou les deux.")
+    parser.add_argument("--parquet-dir", default=DEFAULT_PARQUET_DIR,
+                        help="Répertoire racine des jeux Parquet uniswap/ et chainlink/ (défaut: data/parquet).")
+    parser.add_argument("--partition", choices=sorted(PARTITION_FORMATS), default="month",
+                        help="Granularité des partitions Parquet (défaut: month).")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requêtes batch envoyées en parallèle (défaut: 4).")
+    parser.add_argument("--metrics-dir", default=None,
+                        help="Répertoire où écrire metrics_follow.json et metrics_follow.prom (défaut: aucun).")
+    parser.add_argument("--metrics-interval", type=float, default=60.0,
+                        help="Secondes entre deux écritures des métriques (défaut: 60).")
+    parser.add_argument("--progress-interval", type=float, default=60.0,
+                        help="Secondes minimales entre deux lignes de progression (défaut: 60).")
+    args = parser.parse_args()
+
+    # Lecture de la variable d'environnement RPC (un endpoint, ou plusieurs séparés par des virgules)
+    RPC_URL = os.environ.get("RPC", "")
+    if not RPC_URL:
+        print("ERREUR: la variable d'environnement 'RPC' n'est pas définie.", file=sys.stderr)
+        sys.exit(1)
+    if args.confirmations < 0:
+        parser.error("--confirmations doit être positif ou nul.")
+    if args.metrics_dir:
+        export_at_exit(args.metrics_dir, "follow")
+
+    # Arrêt propre : le cycle en cours se termine, puis les lignes en attente sont écrites
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        print(f"Signal {signal.Signals(signum).name} reçu : arrêt après le cycle en cours")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    try:
+        rpc = PooledRpcClient(RPC_URL, pool_size=args.concurrency, rate=rate_limit_from_env())
+        manifest = ProcessingManifest(args.manifest)
+        price_writer = PriceWriter(args.uniswap_output, args.output_format, os.path.join(args.parquet_dir, 'uniswap'),
+                                   args.partition, args.bars, manifest, track_stats=True)
+        follower = ChainFollower(
+            rpc, price_writer, args.chainlink_output, feed_address=args.feed, confirmations=args.confirmations,
+            from_block=args.from_block, log_chunk_size=args.log_chunk_size, chainlink_format=args.output_format,
+            chainlink_parquet_dir=os.path.join(args.parquet_dir, 'chainlink'), partition=args.partition,
+            concurrency=args.concurrency,
+            block_index=None if args.no_block_index else BlockTimestampIndex(args.block_index)
+        )
+    except ValueError as e:
+        print(f"ERREUR: variable RPC ou RPC_RATE_LIMIT invalide: {e}", file=sys.stderr)
+        sys.exit(1)
+    except RpcError as e:
+        print(f"ERREUR: impossible de se connecter à l'endpoint RPC '{RPC_URL}': {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Suivi de la chaîne : tête {follower.head}, {args.confirmations} confirmations, "
+          f"prochain bloc {follower.next_block}, dernier round {to_round_id(*follower.last_round)}")
+    follower.run(stop, poll_interval=args.poll_interval, flush_interval=args.flush_interval,
+                 metrics_dir=args.metrics_dir, metrics_interval=args.metrics_interval,
+                 progress_interval=args.progress_interval)
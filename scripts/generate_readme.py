@@ -3,10 +3,11 @@
 
 import csv
 import logging
-from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
 from jinja2 import Environment, FileSystemLoader, TemplateError
+from csv_tail import read_last_record
+from dataset_manifest import dataset_stats
 
 # Fonction pour extraire le dernier timestamp du CSV
 def get_last_csv_timestamp(
@@ -17,21 +18,19 @@ def get_last_csv_timestamp(
 ) -> datetime | str | None:
     """
     Extrait la valeur de la colonne `col_name` à la dernière ligne du CSV.
+    La ligne est lue depuis la fin du fichier : le coût ne dépend pas de sa taille.
     - Si `datetime_format` fourni, retourne un datetime (aware ou naive).
     - Sinon, retourne la chaîne brute.
     """
     try:
-        with path.open(newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            try:
-                last_row = deque(reader, maxlen=1)[0]
-            except IndexError:
-                logging.warning("CSV vide ou sans en-têtes : %s", path)
-                return None
-            last_value = last_row.get(col_name)
-            if last_value is None:
-                logging.warning("Colonne '%s' introuvable dans %s", col_name, path)
-                return None
+        last_row = read_last_record(path)
+        if last_row is None:
+            logging.warning("CSV vide ou sans en-têtes : %s", path)
+            return None
+        last_value = last_row.get(col_name)
+        if last_value is None:
+            logging.warning("Colonne '%s' introuvable dans %s", col_name, path)
+            return None
     except FileNotFoundError:
         logging.error("Fichier non trouvé : %s", path)
         return None
@@ -73,37 +72,52 @@ data_info = {
     },
 }
 
-# Construction du contexte pour le template
-context: dict[str, dict[str, str]] = {}
-for name, info in data_info.items():
-    last_ts = get_last_csv_timestamp(
-        info["path"],
-        col_name=info["col_name"],
-        datetime_format=info.get("fmt"),
-        tz_aware=info.get("tz_aware", False)
-    )
+def build_context() -> dict[str, dict]:
+    """
+    Contexte du template, par jeu de données : date de la dernière ligne
+    (extraction) et statistiques du manifeste annexe (rows, first_timestamp,
+    last_timestamp, bytes, crc32), lues sans parcourir le fichier.
+    """
+    context: dict[str, dict] = {}
+    for name, info in data_info.items():
+        last_ts = get_last_csv_timestamp(
+            info["path"],
+            col_name=info["col_name"],
+            datetime_format=info.get("fmt"),
+            tz_aware=info.get("tz_aware", False)
+        )
 
-    if isinstance(last_ts, datetime):
-        if name == "chainlink":
-            # Affichage en UTC fixe
-            display_ts = last_ts.strftime("%Y-%m-%d %H:%M:%S") + " UTC"
+        if isinstance(last_ts, datetime):
+            if name == "chainlink":
+                # Affichage en UTC fixe
+                display_ts = last_ts.strftime("%Y-%m-%d %H:%M:%S") + " UTC"
+            else:
+                # Pour uniswap déjà aware, on convertit en UTC et on affiche l'abréviation
+                display_ts = last_ts.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S %Z")
         else:
-            # Pour uniswap déjà aware, on convertit en UTC et on affiche l'abréviation
-            display_ts = last_ts.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S %Z")
-    else:
-        display_ts = last_ts or "N/A"
+            display_ts = last_ts or "N/A"
 
-    context[name] = {"extraction": display_ts}
+        stats = dataset_stats(str(info["path"]), timestamp_column=info["col_name"]) or {}
+        context[name] = {"extraction": display_ts, **stats}
+    return context
+
+def main() -> bool:
+    """
+    Génère le README via Jinja2 ; retourne False si le rendu ou l'écriture échoue.
+    """
+    try:
+        env = Environment(
+            loader=FileSystemLoader(str(TEMPLATE_DIR)),
+            keep_trailing_newline=True
+        )
+        template = env.get_template(TEMPLATE_NAME)
+        rendered = template.render(**build_context())
+        OUTPUT_PATH.write_text(rendered, encoding='utf-8')
+        logging.info("✅ README généré à %s", OUTPUT_PATH)
+    except (TemplateError, OSError) as e:
+        logging.exception("Échec de génération du README : %s", e)
+        return False
+    return True
 
-# Génération du README via Jinja2
-try:
-    env = Environment(
-        loader=FileSystemLoader(str(TEMPLATE_DIR)),
-        keep_trailing_newline=True
-    )
-    template = env.get_template(TEMPLATE_NAME)
-    rendered = template.render(**context)
-    OUTPUT_PATH.write_text(rendered, encoding='utf-8')
-    logging.info("✅ README généré à %s", OUTPUT_PATH)
-except (TemplateError, OSError) as e:
-    logging.exception("Échec de génération du README : %s", e)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Récupération de logs par eth_getLogs sur de grandes plages de blocs.
+
+La plage [from_block, to_block] est découpée en tranches de `chunk_size`
+blocs, dont au plus `concurrency` sont en vol en même temps. Une tranche
+refusée par le nœud pour une limite de plage ou de résultats est coupée en
+deux, récursivement ; les tranches suivantes reprennent la taille qui a
+fonctionné, puis la doublent après `grow_after` succès consécutifs, sans
+dépasser la taille initiale. Les autres erreurs (délai dépassé, 5xx, limite
+de débit) sont retentées avec un délai exponentiel, sans découpage. Les logs
+sont rendus dans l'ordre de la chaîne.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import METRICS
+from rpc_client import RATE_LIMIT_MESSAGES, RpcError
+
+# Refus d'eth_getLogs pour une plage trop grande ou trop de résultats (Geth, Infura, Alchemy, QuickNode…).
+# Le code -32005 seul ne suffit pas : certains nœuds l'utilisent aussi pour la limite de débit.
+RANGE_LIMIT_MESSAGES = (
+    "more than", "too many results", "too many logs", "too many blocks", "block range", "range too large",
+    "range is too large", "too wide", "range limit", "limited to", "response size", "max results",
+)
+
+
+def log_position(log: dict):
+    """
+    Clé de tri d'un log : (numéro de bloc, index dans le bloc).
+    """
+    return int(log["blockNumber"], 16), int(log["logIndex"], 16)
+
+
+def is_range_limit_error(error: Exception) -> bool:
+    """
+    Vrai si le nœud refuse la plage demandée (plage trop grande ou trop de résultats) :
+    seule cette erreur justifie de couper la plage.
+    """
+    message = str(error).lower()
+    return (any(pattern in message for pattern in RANGE_LIMIT_MESSAGES)
+            and not any(pattern in message for pattern in RATE_LIMIT_MESSAGES))
+
+
+class LogFetcher:
+    """
+    eth_getLogs par tranches adaptatives, en parallèle.
+    """
+
+    def __init__(self, client, chunk_size=100_000, concurrency=4, retries=3, backoff=0.5, min_chunk_size=1,
+                 grow_after=8):
+        self.client = client
+        self.chunk_size = chunk_size
+        self.max_chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.min_chunk_size = min_chunk_size
+        self.grow_after = grow_after
+        self._successes = 0
+        self._lock = threading.Lock()
+
+    def _shrink(self, size: int) -> None:
+        # Le nœud refuse la plage : les tranches suivantes seront plus petites
+        with self._lock:
+            self.chunk_size = max(self.min_chunk_size, min(self.chunk_size, size))
+            self._successes = 0
+
+    def _succeeded(self, size: int) -> None:
+        # Après `grow_after` tranches complètes acceptées d'affilée, la taille double (jusqu'à la taille initiale)
+        with self._lock:
+            if size < self.chunk_size or self.chunk_size >= self.max_chunk_size:
+                return
+            self._successes += 1
+            if self._successes >= self.grow_after:
+                self.chunk_size = min(self.max_chunk_size, self.chunk_size * 2)
+                self._successes = 0
+
+    def _get_logs(self, address, topics, from_block: int, to_block: int) -> list:
+        params = {"address": address, "topics": topics, "fromBlock": hex(from_block), "toBlock": hex(to_block)}
+        return self.client.call("eth_getLogs", [params]) or []
+
+    def fetch_range(self, address, topics, from_block: int, to_block: int) -> list:
+        """
+        Logs de [from_block, to_block]. Une plage refusée pour une limite de plage
+        ou de résultats est coupée en deux ; toute autre erreur (ou une plage
+        minimale refusée) est retentée `retries` fois avant de lever RpcError.
+        """
+        size = to_block - from_block + 1
+        for attempt in range(self.retries + 1):
+            try:
+                logs = self._get_logs(address, topics, from_block, to_block)
+            except RpcError as e:
+                if size > self.min_chunk_size and is_range_limit_error(e):
+                    half = size // 2
+                    self._shrink(half)
+                    METRICS.count("rpc_range_splits_total", method="eth_getLogs")
+                    print(f"eth_getLogs {from_block}..{to_block} refusé ({e}), découpage en tranches de {half} blocs")
+                    middle = from_block + half - 1
+                    return (self.fetch_range(address, topics, from_block, middle)
+                            + self.fetch_range(address, topics, middle + 1, to_block))
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * 2 ** attempt
+                METRICS.rpc_retry("eth_getLogs")
+                print(f"Erreur eth_getLogs {from_block}..{to_block} ({e}), nouvelle tentative dans {delay:.1f}s")
+                time.sleep(delay)
+            else:
+                self._succeeded(size)
+                return logs
+
+    def iter_chunks(self, address, topics, from_block: int, to_block: int):
+        """
+        Génère (premier bloc, dernier bloc, logs triés) tranche par tranche, dans
+        l'ordre des blocs. Au plus `concurrency` tranches sont en vol : la mémoire
+        reste bornée quelle que soit la taille de la plage.
+        """
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as pool:
+            pending = deque()
+            start = from_block
+            while start <= to_block or pending:
+                while start <= to_block and len(pending) < max(1, self.concurrency):
+                    end = min(start + self.chunk_size - 1, to_block)
+                    pending.append((start, end, pool.submit(self.fetch_range, address, topics, start, end)))
+                    start = end + 1
+                first, last, future = pending.popleft()
+                yield first, last, sorted(future.result(), key=log_position)
+
+    def fetch(self, address, topics, from_block: int, to_block: int) -> list:
+        """
+        Tous les logs de [from_block, to_block], dans l'ordre de la chaîne.
+        """
+        logs = []
+        for _, _, chunk_logs in self.iter_chunks(address, topics, from_block, to_block):
+            logs.extend(chunk_logs)
+        return logs
@@ -0,0 +1,327 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Métriques d'exécution communes aux extracteurs Uniswap et Chainlink.
+
+Le registre METRICS du processus accumule :
+    rpc_calls_total{method}            appels JSON-RPC par méthode (un lot compte chaque appel)
+    rpc_errors_total{method}           requêtes en erreur (transport ou réponse JSON-RPC)
+    rpc_retries_total{method}          nouvelles tentatives
+    rpc_endpoint_requests_total{endpoint, status}  requêtes par endpoint du pool (ok, rate_limited, error)
+    rpc_range_splits_total{method}     plages eth_getLogs refusées puis coupées en deux
+    rpc_request_seconds{method}        histogramme de latence des requêtes HTTP
+    block_timestamps_total{source}     timestamps de blocs lus dans l'index ou déduits des slots
+    rows_total{stage, status}          lignes lues, décodées, ignorées, écrites par étape
+    stage_seconds_total{stage}         temps mural passé dans chaque étape (lecture, récupération, décodage, écriture)
+    block_to_row_seconds{dataset}      suivi de chaîne : délai entre le timestamp d'un bloc (ou d'un round) et l'écriture de sa ligne
+    chain_reorgs_total                 suivi de chaîne : réorganisations plus profondes que la profondeur de confirmation
+
+En fin d'exécution, write_metrics écrit un résumé JSON et un fichier texte
+au format Prometheus (collecteur textfile de node_exporter) :
+    logs/metrics_uniswap.json
+    logs/metrics_uniswap.prom
+
+ProgressLogger remplace les affichages ligne par ligne : une ligne de
+progression au plus toutes les `interval` secondes.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+METRIC_PREFIX = "openprice"
+
+DEFAULT_PROGRESS_INTERVAL = 10.0  # Secondes minimales entre deux lignes de progression
+
+# Bornes (en secondes) de l'histogramme de latence RPC
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Bornes (en secondes) de l'histogramme de fraîcheur des lignes (bloc → ligne écrite)
+FRESHNESS_BUCKETS = (1.0, 2.0, 5.0, 10.0, 15.0, 20.0, 30.0, 45.0, 60.0, 120.0, 300.0, 900.0, 3600.0)
+
+HISTOGRAM_BUCKETS = {
+    "block_to_row_seconds": FRESHNESS_BUCKETS,
+}
+
+DESCRIPTIONS = {
+    "rpc_calls_total": "Appels JSON-RPC par méthode.",
+    "rpc_errors_total": "Requêtes JSON-RPC en erreur.",
+    "rpc_retries_total": "Nouvelles tentatives après une erreur RPC.",
+    "rpc_endpoint_requests_total": "Requêtes par endpoint RPC et par issue (ok, rate_limited, error).",
+    "rpc_range_splits_total": "Plages eth_getLogs refusées par le nœud puis coupées en deux.",
+    "rpc_request_seconds": "Latence des requêtes HTTP JSON-RPC.",
+    "block_timestamps_total": "Timestamps de blocs obtenus sans en-tête RPC (index persistant ou slots).",
+    "rows_total": "Lignes traitées par étape et par statut.",
+    "stage_seconds_total": "Temps mural passé dans chaque étape.",
+    "block_to_row_seconds": "Délai entre le timestamp d'un bloc (ou d'un round Chainlink) et l'écriture de sa ligne.",
+    "chain_reorgs_total": "Réorganisations détectées au-delà de la profondeur de confirmation.",
+}
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    """
+    Histogramme cumulatif à bornes fixes (sémantique Prometheus).
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list:
+        """
+        [(borne, nombre d'observations <= borne)], borne +Inf comprise.
+        """
+        total, out = 0, []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            out.append((bound, total))
+        out.append((float("inf"), self.count))
+        return out
+
+
+class Metrics:
+    """
+    Registre de compteurs, d'histogrammes et de temps par étape.
+    Utilisable depuis plusieurs threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.started_at = time.time()
+            self._started = time.perf_counter()
+
+    def count(self, name: str, value=1, **labels) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(HISTOGRAM_BUCKETS.get(name, LATENCY_BUCKETS))
+            histogram.observe(value)
+
+    def observe_many(self, name: str, values, **labels) -> None:
+        """
+        Plusieurs observations du même histogramme (une par ligne écrite, par exemple).
+        """
+        for value in values:
+            self.observe(name, float(value), **labels)
+
+    def add_stage_time(self, stage: str, seconds: float) -> None:
+        self.count("stage_seconds_total", seconds, stage=stage)
+
+    @contextmanager
+    def stage(self, stage: str):
+        """
+        Ajoute le temps mural du bloc `with` à l'étape `stage`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(stage, time.perf_counter() - start)
+
+    def timed_iter(self, iterable, stage: str):
+        """
+        Parcourt `iterable` en comptant dans l'étape `stage` le temps passé à produire chaque élément.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_stage_time(stage, time.perf_counter() - start)
+                return
+            self.add_stage_time(stage, time.perf_counter() - start)
+            yield item
+
+    def rows(self, stage: str, status: str, n: int) -> None:
+        if n:
+            self.count("rows_total", int(n), stage=stage, status=status)
+
+    def rpc_request(self, methods, seconds: float, error: bool = False) -> None:
+        """
+        Une requête HTTP JSON-RPC : un appel par méthode de `methods` (plusieurs pour un lot).
+        """
+        methods = list(methods)
+        for method in set(methods):
+            self.count("rpc_calls_total", methods.count(method), method=method)
+        label = methods[0] if len(set(methods)) == 1 else "batch"
+        self.observe("rpc_request_seconds", seconds, method=label)
+        if error:
+            self.count("rpc_errors_total", method=label)
+
+    def rpc_retry(self, method: str, n: int = 1) -> None:
+        self.count("rpc_retries_total", n, method=method)
+
+    def get(self, name: str, **labels):
+        with self._lock:
+            return self.counters.get((name, _label_key(labels)), 0)
+
+    def to_dict(self) -> dict:
+        """
+        Résumé JSON : compteurs par nom puis par étiquettes, histogrammes (nombre, somme, moyenne, bornes).
+        """
+        with self._lock:
+            summary = {
+                "started_at": self.started_at,
+                "duration_seconds": round(time.perf_counter() - self._started, 3),
+            }
+            for (name, labels), value in sorted(self.counters.items()):
+                label = ",".join(f"{k}={v}" for k, v in labels) or "total"
+                summary.setdefault(name, {})[label] = round(value, 6) if isinstance(value, float) else value
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                label = ",".join(f"{k}={v}" for k, v in labels) or "total"
+                summary.setdefault(name, {})[label] = {
+                    "count": histogram.count,
+                    "sum": round(histogram.sum, 6),
+                    "mean": round(histogram.sum / histogram.count, 6) if histogram.count else None,
+                    "buckets": {("+Inf" if bound == float("inf") else str(bound)): n
+                                for bound, n in histogram.cumulative()},
+                }
+        return summary
+
+    def to_prometheus(self, job: str) -> str:
+        """
+        Texte au format d'exposition Prometheus ; toutes les séries portent l'étiquette job.
+        """
+        def fmt_labels(labels, extra=()):
+            pairs = [("job", job), *labels, *extra]
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            counters, histograms = dict(self.counters), dict(self.histograms)
+            duration = time.perf_counter() - self._started
+            started_at = self.started_at
+
+        for name in sorted({name for name, _ in counters}):
+            full = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {full} {DESCRIPTIONS.get(name, name)}")
+            lines.append(f"# TYPE {full} counter")
+            for (series, labels), value in sorted(counters.items()):
+                if series == name:
+                    lines.append(f"{full}{fmt_labels(labels)} {value:g}" if isinstance(value, float)
+                                 else f"{full}{fmt_labels(labels)} {value}")
+        for name in sorted({name for name, _ in histograms}):
+            full = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {full} {DESCRIPTIONS.get(name, name)}")
+            lines.append(f"# TYPE {full} histogram")
+            for (series, labels), histogram in sorted(histograms.items()):
+                if series != name:
+                    continue
+                for bound, n in histogram.cumulative():
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{full}_bucket{fmt_labels(labels, [('le', le)])} {n}")
+                lines.append(f"{full}_sum{fmt_labels(labels)} {histogram.sum:g}")
+                lines.append(f"{full}_count{fmt_labels(labels)} {histogram.count}")
+
+        lines.append(f"# HELP {METRIC_PREFIX}_run_duration_seconds Durée de la dernière exécution.")
+        lines.append(f"# TYPE {METRIC_PREFIX}_run_duration_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}_run_duration_seconds{fmt_labels(())} {duration:.3f}")
+        lines.append(f"# HELP {METRIC_PREFIX}_run_started_timestamp_seconds Début de la dernière exécution (UNIX).")
+        lines.append(f"# TYPE {METRIC_PREFIX}_run_started_timestamp_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}_run_started_timestamp_seconds{fmt_labels(())} {started_at:.0f}")
+        return "\n".join(lines) + "\n"
+
+
+# Registre partagé du processus
+METRICS = Metrics()
+
+
+def _write_atomic(path: str, text: str) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def write_metrics(directory: str, job: str, metrics: Metrics = METRICS, **extra) -> tuple:
+    """
+    Écrit <directory>/metrics_<job>.json et <directory>/metrics_<job>.prom
+    (remplacement atomique : un collecteur ne lit jamais un fichier à moitié écrit).
+    extra : champs ajoutés au résumé JSON (ex. exit_code).
+    Retourne les deux chemins.
+    """
+    os.makedirs(directory, exist_ok=True)
+    summary = {"job": job, **extra, **metrics.to_dict()}
+    json_path = os.path.join(directory, f"metrics_{job}.json")
+    prom_path = os.path.join(directory, f"metrics_{job}.prom")
+    _write_atomic(json_path, json.dumps(summary, indent=2) + "\n")
+    _write_atomic(prom_path, metrics.to_prometheus(job))
+    return json_path, prom_path
+
+
+def export_at_exit(directory: str, job: str, metrics: Metrics = METRICS) -> None:
+    """
+    Écrit les métriques à la sortie du processus, y compris après sys.exit(1) :
+    une exécution en échec laisse aussi ses compteurs.
+    """
+    def export():
+        try:
+            json_path, _ = write_metrics(directory, job, metrics)
+            print(f"Métriques écrites dans {json_path}")
+        except OSError as e:
+            print(f"Erreur lors de l'écriture des métriques dans {directory}: {e}")
+    atexit.register(export)
+
+
+class ProgressLogger:
+    """
+    Progression affichée au plus une fois toutes les `interval` secondes
+    (et à la fin avec done()), au lieu d'une ligne par élément traité.
+    """
+
+    def __init__(self, label: str, total=None, unit: str = "lignes", interval: float = DEFAULT_PROGRESS_INTERVAL):
+        self.label = label
+        self.total = total
+        self.unit = unit
+        self.interval = interval
+        self.done_count = 0
+        self._start = time.perf_counter()
+        self._last = self._start
+
+    def update(self, n: int = 1, detail: str = "") -> None:
+        self.done_count += n
+        now = time.perf_counter()
+        if now - self._last >= self.interval:
+            self._last = now
+            self._print(now, detail)
+
+    def done(self, detail: str = "") -> None:
+        self._print(time.perf_counter(), detail)
+
+    def _print(self, now: float, detail: str) -> None:
+        elapsed = now - self._start
+        rate = self.done_count / elapsed if elapsed > 0 else 0.0
+        position = f"{self.done_count}/{self.total}" if self.total is not None else f"{self.done_count}"
+        suffix = f", {detail}" if detail else ""
+        print(f"{self.label} : {position} {self.unit} en {elapsed:.1f}s ({rate:.0f} {self.unit}/s){suffix}")
@@ -0,0 +1,250 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Mise à jour des jeux de données en un seul processus (étapes de update.sh).
+
+Les étapes s'enchaînent dans le même interpréteur au lieu de trois
+processus Python :
+
+    bars       reconstruction des fichiers de barres absents
+    uniswap    events Swap depuis la dernière ligne de data/uniswap_eth_usd.csv
+    chainlink  rounds qui suivent le dernier round de data/chainlink_eth_usd.csv
+               (du jeu data/parquet/chainlink avec --output-format parquet)
+    append     ajout des fichiers *_last.csv aux jeux cumulés (et à leur
+               manifeste annexe, voir dataset_manifest.py), puis suppression
+    readme     mise à jour des dates d'extraction du README
+
+Avec --pools / --feeds, les étapes portent sur ces pools et flux du
+registre (registry.py) : les events Swap de tous les pools sont lus en une
+seule passe (mêmes requêtes eth_getLogs, timestamps de blocs communs), les
+flux sont extraits l'un après l'autre avec le même pool d'endpoints.
+Chaque pool et chaque flux a son jeu cumulé data/<nom>.csv.
+
+Le pool d'endpoints RPC (sessions HTTP, limites de débit, bascule) est créé
+une fois et partagé par les étapes uniswap et chainlink. Les modules des
+étapes sont importés au moment où l'étape s'exécute : pandas n'est chargé
+qu'avec bars / uniswap, web3 qu'avec chainlink, mpmath qu'avec le moteur de
+référence ; `--help` ou une exécution limitée au README restent légers.
+
+Un échec de bars, uniswap ou chainlink arrête le pipeline (code 1) ; le
+fichier Chainlink partiel est alors supprimé. Un échec du README n'est
+qu'un avertissement. Avec --metrics-dir, metrics_uniswap et
+metrics_chainlink sont écrits comme par les scripts lancés séparément.
+
+    RPC=http://127.0.0.1:8545 python3 scripts/pipeline.py --bars 1m 1h 1d
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+
+from csv_tail import read_last_record
+from dataset_manifest import dataset_stats
+from metrics import METRICS, write_metrics
+from registry import DEFAULT_FEED, DEFAULT_POOL, DEFAULT_REGISTRY_PATH, Registry
+
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), os.pardir, 'data'))
+STAGES = ("bars", "uniswap", "chainlink", "append", "readme")
+
+
+def next_timestamp(path: str, column: str):
+    """
+    Timestamp UNIX de la dernière ligne du CSV + 1 s (colonne `column`),
+    ou None si le fichier est vide.
+    """
+    last_row = read_last_record(path)
+    if last_row is None or not last_row.get(column):
+        return None
+    return int(datetime.fromisoformat(last_row[column]).timestamp()) + 1
+
+
+def append_rows(last_path: str, dataset_path: str) -> int:
+    """
+    Ajoute les lignes de last_path (sans son en-tête) à la fin de dataset_path,
+    comme `tail -n +2 last >> dataset`. Retourne le nombre d'octets ajoutés.
+    """
+    with open(last_path, 'rb') as src, open(dataset_path, 'ab') as dst:
+        src.readline()
+        start = dst.tell()
+        shutil.copyfileobj(src, dst)
+        return dst.tell() - start
+
+
+class Pipeline:
+    """
+    Étapes de la mise à jour, exécutées dans le processus courant. Le client
+    RPC est créé à la première étape qui en a besoin, puis réutilisé.
+    pools, feeds : noms des pools et des flux du registre mis à jour
+    (défaut: le pool ETH/USDC et le flux ETH/USD).
+    """
+
+    def __init__(self, output_format: str = "csv", bar_intervals=(), metrics_dir=None, concurrency: int = 8,
+                 pools=(DEFAULT_POOL,), feeds=(DEFAULT_FEED,), registry_path: str = DEFAULT_REGISTRY_PATH):
+        self.output_format = output_format
+        self.bar_intervals = list(bar_intervals)
+        self.metrics_dir = metrics_dir
+        self.concurrency = concurrency
+        self.registry_path = registry_path
+        try:
+            registry = Registry.load(registry_path)
+            self.pools = [registry.pool(name) for name in pools]
+            self.feeds = [registry.feed(name) for name in feeds]
+        except ValueError as e:
+            print(f"ERREUR: {e}", file=sys.stderr)
+            sys.exit(1)
+        self._rpc = None
+
+    @property
+    def rpc(self):
+        if self._rpc is None:
+            from rpc_client import PooledRpcClient, rate_limit_from_env
+
+            # Lecture de la variable d'environnement RPC (un endpoint, ou plusieurs séparés par des virgules)
+            rpc_url = os.environ.get("RPC", "")
+            if not rpc_url:
+                print("ERREUR: la variable d'environnement 'RPC' n'est pas définie.", file=sys.stderr)
+                sys.exit(1)
+            try:
+                self._rpc = PooledRpcClient(rpc_url, pool_size=self.concurrency, rate=rate_limit_from_env())
+            except ValueError as e:
+                print(f"ERREUR: variable RPC ou RPC_RATE_LIMIT invalide: {e}", file=sys.stderr)
+                sys.exit(1)
+        return self._rpc
+
+    def bars(self) -> None:
+        from bars import INTERVALS, bars_path, build_bars
+
+        unknown = [interval for interval in self.bar_intervals if interval not in INTERVALS]
+        if unknown:
+            print(f"ERREUR: intervalle(s) de barres inconnu(s) : {' '.join(unknown)}", file=sys.stderr)
+            sys.exit(1)
+        # Un fichier de barres absent est reconstruit depuis le jeu cumulé du pool (une seule lecture pour tous)
+        for pool in self.pools:
+            missing = [interval for interval in self.bar_intervals
+                       if not os.path.exists(bars_path(interval, pool.data_dir, pool.name))]
+            if missing:
+                print(f"[INFO] Reconstruction des barres {' '.join(missing)} depuis {pool.dataset_path}")
+                build_bars(pool.dataset_path, missing, pool.data_dir, pool.name, rebuild=True)
+
+    def uniswap(self) -> None:
+        import Uniswap_process_logs as uniswap
+
+        # Une seule passe pour tous les pools, chacun repartant de la dernière ligne de son jeu cumulé
+        since = {}
+        for pool in self.pools:
+            since[pool.name] = next_timestamp(pool.dataset_path, "timestamp")
+            print(f"[INFO] Timestamp de démarrage pour {pool.name} (dernière date +1s) : {since[pool.name]}")
+        uniswap.main(source="rpc", since=since, output_format=self.output_format,
+                     bar_intervals=self.bar_intervals, rpc=self.rpc,
+                     pools=[pool.name for pool in self.pools], registry_path=self.registry_path)
+
+    def chainlink(self) -> None:
+        import chainlink_dicho
+
+        for feed in self.feeds:
+            # --resume : reprise après le dernier round du jeu cumulé, Parquet en sortie parquet seule
+            # (--debut ne sert que s'il est vide)
+            argv = [
+                "--feed", feed.name, "--registry", self.registry_path,
+                "--resume", "--dataset", feed.dataset_path, "--output", feed.last_path,
+                "--phases-file", os.path.join(DATA_DIR, "chainlink_phases.json"),
+                "--parquet-dir", feed.parquet_dir,
+                "--output-format", self.output_format, "--concurrency", str(self.concurrency),
+            ]
+            debut = next_timestamp(feed.dataset_path, "datetime_utc")
+            if debut is not None:
+                print(f"[INFO] Timestamp de démarrage pour {feed.name} (dernière date +1s) : {debut}")
+                argv += ["--debut", str(debut)]
+            chainlink_dicho.main(argv, rpc=self.rpc)
+
+    def append(self) -> None:
+        for last_path, dataset_path in ((entry.last_path, entry.dataset_path) for entry in self.pools + self.feeds):
+            if not os.path.exists(last_path):
+                print(f"[WARNING] {last_path} non trouvé, aucune concaténation effectuée.")
+                continue
+            print(f"[INFO] Concaténation de {last_path} dans {dataset_path}")
+            append_rows(last_path, dataset_path)
+            # Manifeste annexe prolongé sur les seules lignes ajoutées
+            stats = dataset_stats(dataset_path)
+            print(f"[INFO] {dataset_path} : {stats['rows']} lignes, dernière {stats['last_timestamp']}")
+            print(f"[INFO] Suppression de {last_path}")
+            os.remove(last_path)
+
+    def readme(self) -> None:
+        import generate_readme
+
+        if not generate_readme.main():
+            sys.exit(1)
+
+    def run_stage(self, stage: str) -> int:
+        """
+        Exécute une étape ; retourne son code de sortie (0 : succès). Les
+        métriques des étapes uniswap et chainlink sont écrites même en cas d'échec.
+        """
+        print(f"[INFO] Étape {stage}...")
+        METRICS.reset()
+        start = time.perf_counter()
+        code = 0
+        try:
+            getattr(self, stage)()
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        finally:
+            if self.metrics_dir and stage in ("uniswap", "chainlink"):
+                json_path, _ = write_metrics(self.metrics_dir, stage)
+                print(f"Métriques écrites dans {json_path}")
+        status = "terminée" if code == 0 else f"en échec (code {code})"
+        print(f"[INFO] Étape {stage} {status} en {time.perf_counter() - start:.2f} s")
+        return code
+
+    def run(self, stages) -> int:
+        """
+        Exécute les étapes dans l'ordre de STAGES ; retourne le code de sortie du pipeline.
+        """
+        for path in (entry.dataset_path for entry in self.pools + self.feeds):
+            if not os.path.exists(path):
+                print(f"ERREUR: fichier {path} introuvable.", file=sys.stderr)
+                return 1
+
+        for stage in (s for s in STAGES if s in stages):
+            if self.run_stage(stage) == 0:
+                continue
+            if stage == "readme":
+                print("[WARNING] Impossible de mettre à jour le README !", file=sys.stderr)
+                continue
+            for feed in self.feeds if stage == "chainlink" else ():
+                if os.path.exists(feed.last_path):
+                    print(f"[INFO] Suppression du fichier potentiellement corrompu : {feed.last_path}")
+                    os.remove(feed.last_path)
+            print(f"ERREUR: échec de l'étape {stage}.", file=sys.stderr)
+            return 1
+        return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mise à jour des jeux de données Uniswap et Chainlink en un seul processus.")
+    parser.add_argument("--stages", nargs='+', choices=STAGES, default=list(STAGES),
+                        help=f"Étapes à exécuter, toujours dans l'ordre {' → '.join(STAGES)} (défaut: toutes).")
+    parser.add_argument("--output-format", choices=["csv", "parquet", "both"], default="csv",
+                        help="Format de sortie : CSV (par défaut), Parquet partitionné, ou les deux.")
+    parser.add_argument("--bars", nargs='+', default=[],
+                        help="Intervalles des barres OHLCV / VWAP à tenir à jour (ex. --bars 1m 1h 1d ; défaut: aucune).")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Connexions du pool RPC partagé et requêtes Chainlink en vol (défaut: 8).")
+    parser.add_argument("--metrics-dir", default=None,
+                        help="Répertoire où écrire metrics_uniswap et metrics_chainlink (.json et .prom) (défaut: aucun).")
+    parser.add_argument("--pools", nargs='+', default=[DEFAULT_POOL],
+                        help=f"Pools du registre mis à jour en une seule passe (défaut: {DEFAULT_POOL}).")
+    parser.add_argument("--feeds", nargs='+', default=[DEFAULT_FEED],
+                        help=f"Flux Chainlink du registre mis à jour (défaut: {DEFAULT_FEED}).")
+    parser.add_argument("--registry", default=DEFAULT_REGISTRY_PATH,
+                        help="Registre des pools et des flux (défaut: scripts/registry.json).")
+    args = parser.parse_args()
+
+    pipeline = Pipeline(args.output_format, args.bars, args.metrics_dir, args.concurrency,
+                        args.pools, args.feeds, args.registry)
+    sys.exit(pipeline.run(args.stages))
@@ -0,0 +1,342 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Magasin binaire des prix, indexé par le temps et lu par projection mémoire (mmap).
+
+Chaque jeu de données (swaps Uniswap, rounds Chainlink) est stocké colonne
+par colonne, à largeur fixe, dans l'ordre du temps :
+
+    data/store/uniswap/meta.json          source, octets du CSV déjà lus, lignes, types
+    data/store/uniswap/timestamp.bin      secondes UNIX (int64)
+    data/store/uniswap/price_usdc_per_eth.bin, usdc_amount.bin, ... (float64, int64)
+    data/store/uniswap/index.bin          un timestamp toutes les INDEX_STRIDE lignes
+
+Les colonnes sont ouvertes avec numpy.memmap : rien n'est chargé à
+l'ouverture, et les résultats sont des vues sur le fichier (sans copie).
+Une recherche par date passe d'abord par l'index clairsemé (en mémoire),
+puis par une recherche dichotomique dans un seul bloc de INDEX_STRIDE
+timestamps : quelques pages lues, quelle que soit la taille du jeu.
+
+Le magasin est construit, puis prolongé, depuis les CSV cumulés : seuls les
+octets ajoutés au CSV depuis la construction précédente sont lus. meta.json
+est remplacé en dernier ; après une interruption, les octets écrits au-delà
+du nombre de lignes enregistré sont ignorés puis écrasés.
+
+    python3 scripts/price_store.py build uniswap data/uniswap_eth_usd.csv
+    python3 scripts/price_store.py query uniswap --at "2024-04-01 12:00:00"
+    python3 scripts/price_store.py query chainlink --from 2024-04-01 --to 2024-04-02
+
+API :
+    store = PriceStore("data/store/uniswap")
+    store.price_at("2024-04-01 12:00:00")   # dernier prix à ou avant cette date
+    store.range(t1, t2)                     # {colonne: vue numpy} des lignes de [t1, t2]
+    store.latest()                          # dernière ligne
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+DEFAULT_STORE_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), os.pardir, 'data', 'store'))
+INDEX_STRIDE = 1024  # Lignes par entrée de l'index clairsemé
+READ_BLOCK_SIZE = 64 << 20  # Octets du CSV analysés à la fois lors de la construction
+
+# Colonnes stockées (nom dans le CSV, type numpy petit-boutiste à largeur fixe), colonne temporelle en premier
+COLUMNS = {
+    "uniswap": (
+        ("timestamp", "<i8"),
+        ("price_usdc_per_eth", "<f8"),
+        ("usdc_amount", "<f8"),
+        ("eth_amount", "<f8"),
+        ("volume_usdc", "<f8"),
+        ("block_number", "<i8"),
+    ),
+    "chainlink": (
+        ("datetime_utc", "<i8"),
+        ("price", "<f8"),
+        ("phase", "<u2"),
+        ("aggregator_round", "<u8"),  # global_round_id = phase << 64 | aggregator_round
+    ),
+}
+PRICE_COLUMNS = {"uniswap": "price_usdc_per_eth", "chainlink": "price"}
+
+
+def unix_seconds(value) -> int:
+    """
+    Secondes UNIX d'un nombre, d'un datetime (naïf : UTC) ou d'un texte ISO.
+    """
+    if isinstance(value, str):
+        value = int(value) if value.isdigit() else datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    return int(value)
+
+
+def format_timestamp(seconds: int) -> str:
+    """
+    Secondes UNIX → texte tel qu'écrit dans les CSV (2024-04-01 12:00:00+00:00).
+    """
+    return datetime.fromtimestamp(int(seconds), tz=timezone.utc).isoformat(sep=' ')
+
+
+def _column_path(root: str, name: str) -> str:
+    return os.path.join(root, f"{name}.bin")
+
+
+def _load_meta(root: str):
+    try:
+        with open(os.path.join(root, "meta.json"), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _save_meta(root: str, meta: dict) -> None:
+    path = os.path.join(root, "meta.json")
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _open_column(path: str, dtype: str, rows: int) -> np.ndarray:
+    if rows == 0:
+        return np.empty(0, dtype=dtype)
+    # Vue ndarray de la projection : les tranches évitent le coût de la sous-classe memmap
+    return np.asarray(np.memmap(path, dtype=dtype, mode='r', shape=(rows,)))
+
+
+class PriceStore:
+    """
+    Lecture d'un magasin construit par build_store. Les colonnes sont des vues
+    sur des projections numpy.memmap en lecture seule ; price_at, range et
+    latest n'en lisent que les pages utiles.
+    """
+
+    def __init__(self, root: str):
+        meta = _load_meta(root)
+        if meta is None:
+            raise FileNotFoundError(f"magasin introuvable : {root} (meta.json absent)")
+        self.root = root
+        self.dataset = meta["dataset"]
+        self.rows = meta["rows"]
+        self.stride = meta["index_stride"]
+        self.time_column = COLUMNS[self.dataset][0][0]
+        self.price_column = PRICE_COLUMNS[self.dataset]
+        self.columns = {}
+        for name, dtype in COLUMNS[self.dataset]:
+            path = _column_path(root, name)
+            if os.path.getsize(path) < self.rows * np.dtype(dtype).itemsize:
+                raise ValueError(f"colonne {path} plus courte que les {self.rows} lignes du magasin")
+            self.columns[name] = _open_column(path, dtype, self.rows)
+        self.timestamps = self.columns[self.time_column]
+        # Index clairsemé : timestamps des lignes 0, stride, 2·stride, ... (petit, lu en mémoire)
+        n_index = -(-self.rows // self.stride)
+        self.index = np.fromfile(os.path.join(root, "index.bin"), dtype="<i8", count=n_index)
+        if len(self.index) != n_index:
+            raise ValueError(f"index de {root} incomplet ({len(self.index)} entrées sur {n_index})")
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def search(self, ts, side: str = "left") -> int:
+        """
+        Position d'insertion de ts dans la colonne des timestamps (comme
+        numpy.searchsorted), via l'index clairsemé puis un seul bloc de la colonne.
+        """
+        ts = unix_seconds(ts)
+        block = int(np.searchsorted(self.index, ts, side))
+        lo = max(0, (block - 1) * self.stride)
+        hi = min(block * self.stride, self.rows)
+        return lo + int(np.searchsorted(self.timestamps[lo:hi], ts, side))
+
+    def row(self, position: int) -> dict:
+        """
+        Ligne `position` sous forme de dict {colonne: valeur} (timestamp en secondes UNIX).
+        """
+        row = {name: column[position].item() for name, column in self.columns.items()}
+        if self.dataset == "chainlink":
+            row["global_round_id"] = (row["phase"] << 64) | row["aggregator_round"]
+        return row
+
+    def price_at(self, ts):
+        """
+        Dernier prix à ou avant ts (swap Uniswap ou round Chainlink), ou None
+        si ts précède la première ligne.
+        """
+        position = self.search(ts, "right") - 1
+        if position < 0:
+            return None
+        return float(self.columns[self.price_column][position])
+
+    def range(self, start=None, end=None) -> dict:
+        """
+        Lignes dont le timestamp est dans [start, end] (bornes optionnelles) :
+        {colonne: vue numpy sur le fichier}, sans copie.
+        """
+        lo = 0 if start is None else self.search(start, "left")
+        hi = self.rows if end is None else self.search(end, "right")
+        return {name: column[lo:max(lo, hi)] for name, column in self.columns.items()}
+
+    def latest(self):
+        """
+        Dernière ligne du magasin, ou None s'il est vide.
+        """
+        return self.row(self.rows - 1) if self.rows else None
+
+
+def _parse_block(data: bytes, header, dataset: str) -> dict:
+    """
+    Lignes CSV complètes → {colonne: tableau numpy au type du magasin}.
+    """
+    import pandas as pd
+
+    from bars import epoch_seconds
+
+    names = [name for name, _ in COLUMNS[dataset]]
+    time_column = names[0]
+    df = pd.read_csv(io.BytesIO(data), names=header, header=None, usecols=names,
+                     dtype={time_column: str}, float_precision='round_trip')
+    arrays = {time_column: epoch_seconds(df[time_column])}
+    for name, dtype in COLUMNS[dataset][1:]:
+        arrays[name] = df[name].to_numpy().astype(dtype)
+    return arrays
+
+
+def build_store(csv_path: str, root: str, dataset: str, rebuild: bool = False) -> int:
+    """
+    Construit ou prolonge le magasin `root` depuis le CSV cumulé `csv_path`.
+    Seuls les octets ajoutés au CSV depuis l'appel précédent sont lus ; le
+    magasin est reconstruit si le CSV a raccourci ou si la source a changé.
+    Retourne le nombre de lignes ajoutées.
+    """
+    from csv_tail import read_header
+
+    os.makedirs(root, exist_ok=True)
+    header = read_header(csv_path)
+    size = os.path.getsize(csv_path)
+    meta = None if rebuild else _load_meta(root)
+    if meta is not None and (meta.get("dataset") != dataset or meta.get("source") != os.path.abspath(csv_path)
+                             or meta.get("source_bytes", 0) > size or meta.get("index_stride") != INDEX_STRIDE):
+        print(f"[INFO] Source modifiée depuis la construction de {root} : reconstruction")
+        meta = None
+    if meta is None:
+        meta = {"dataset": dataset, "source": os.path.abspath(csv_path), "source_bytes": 0, "rows": 0,
+                "index_stride": INDEX_STRIDE, "columns": dict(COLUMNS[dataset])}
+
+    # Octets au-delà des lignes enregistrées : écriture interrompue, écrasée
+    rows = meta["rows"]
+    for name, dtype in COLUMNS[dataset]:
+        with open(_column_path(root, name), 'ab') as f:
+            f.truncate(rows * np.dtype(dtype).itemsize)
+    index_path = os.path.join(root, "index.bin")
+    with open(index_path, 'ab') as f:
+        f.truncate(-(-rows // INDEX_STRIDE) * 8)
+    last_ts = None
+    if rows:
+        last_ts = int(np.fromfile(_column_path(root, COLUMNS[dataset][0][0]), dtype="<i8",
+                                  count=1, offset=(rows - 1) * 8)[0])
+
+    added = 0
+    with open(csv_path, 'rb') as src:
+        if meta["source_bytes"] == 0:
+            src.readline()  # En-tête
+            meta["source_bytes"] = src.tell()
+        src.seek(meta["source_bytes"])
+        pending = b''
+        while True:
+            data = src.read(READ_BLOCK_SIZE)
+            if not data:
+                break
+            # Seules les lignes complètes sont lues : une ligne en cours d'écriture le sera au prochain appel
+            data = pending + data
+            end = data.rfind(b'\n') + 1
+            data, pending = data[:end], data[end:]
+            if not data.strip():
+                continue
+            arrays = _parse_block(data, header, dataset)
+            timestamps = arrays[COLUMNS[dataset][0][0]]
+            if len(timestamps) == 0:
+                meta["source_bytes"] += len(data)
+                continue
+            unordered = np.flatnonzero(np.diff(timestamps) < 0)
+            if (last_ts is not None and timestamps[0] < last_ts) or len(unordered):
+                row = rows + (int(unordered[0]) + 1 if len(unordered) else 0)
+                raise ValueError(f"timestamps non croissants dans {csv_path} (ligne de données {row + 1})")
+
+            for name, dtype in COLUMNS[dataset]:
+                with open(_column_path(root, name), 'ab') as f:
+                    f.write(arrays[name].astype(dtype, copy=False).tobytes())
+            # Entrées d'index des positions multiples de INDEX_STRIDE couvertes par ce bloc
+            first = -(-rows // INDEX_STRIDE) * INDEX_STRIDE
+            with open(index_path, 'ab') as f:
+                f.write(timestamps[first - rows::INDEX_STRIDE].astype("<i8").tobytes())
+
+            rows += len(timestamps)
+            added += len(timestamps)
+            last_ts = int(timestamps[-1])
+            meta.update(rows=rows, source_bytes=meta["source_bytes"] + len(data))
+            _save_meta(root, meta)
+    _save_meta(root, meta)
+    return added
+
+
+def _print_rows(store: PriceStore, columns: dict, limit: int) -> None:
+    names = list(columns)
+    print(",".join(names))
+    n = len(columns[store.time_column])
+    for i in range(min(n, limit)):
+        values = [columns[name][i].item() for name in names]
+        values[0] = format_timestamp(values[0])
+        print(",".join(str(v) for v in values))
+    if n > limit:
+        print(f"... {n - limit} lignes de plus (--limit)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Magasin binaire des prix, indexé par le temps (mmap).")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = sub.add_parser("build", help="Construit ou prolonge le magasin depuis un CSV cumulé.")
+    build_parser.add_argument("dataset", choices=sorted(COLUMNS))
+    build_parser.add_argument("csv_path")
+    build_parser.add_argument("root", nargs='?', help="Répertoire du magasin (défaut: data/store/<dataset>).")
+    build_parser.add_argument("--rebuild", action="store_true", help="Reconstruire le magasin depuis le début du CSV.")
+
+    query_parser = sub.add_parser("query", help="Interroge le magasin.")
+    query_parser.add_argument("dataset", choices=sorted(COLUMNS))
+    query_parser.add_argument("--root", help="Répertoire du magasin (défaut: data/store/<dataset>).")
+    query_parser.add_argument("--at", help="Date (ISO ou secondes UNIX) : dernier prix à ou avant cette date.")
+    query_parser.add_argument("--from", dest="start", help="Début de l'intervalle (inclus).")
+    query_parser.add_argument("--to", dest="end", help="Fin de l'intervalle (incluse).")
+    query_parser.add_argument("--limit", type=int, default=20, help="Lignes affichées pour un intervalle (défaut: 20).")
+
+    args = parser.parse_args()
+    try:
+        if args.command == "build":
+            root = args.root or os.path.join(DEFAULT_STORE_DIR, args.dataset)
+            added = build_store(args.csv_path, root, args.dataset, args.rebuild)
+            print(f"Terminé. {added} lignes ajoutées à {root} ({PriceStore(root).rows} au total).")
+        else:
+            store = PriceStore(args.root or os.path.join(DEFAULT_STORE_DIR, args.dataset))
+            if args.at is not None:
+                position = store.search(args.at, "right") - 1
+                row = store.row(position) if position >= 0 else None
+            elif args.start is None and args.end is None:
+                row = store.latest()
+            else:
+                _print_rows(store, store.range(args.start, args.end), args.limit)
+                sys.exit(0)
+            if row is not None:
+                row[store.time_column] = format_timestamp(row[store.time_column])
+            print(json.dumps(row, indent=2))
+    except (OSError, ValueError) as e:
+        print(f"ERREUR: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,103 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Recherches par lots d'une borne dans un intervalle d'entiers.
+
+Chaque sonde évalue un lot de points en un seul aller-retour RPC (Multicall3
+ou requête batch) : find_last_true est une recherche k-aire, find_last_before
+une recherche par interpolation sur des timestamps croissants (rounds
+Chainlink, blocs).
+"""
+
+
+def find_last_true(probe, low: int, high: int, width: int = 32):
+    """
+    Dernier entier de [low, high] pour lequel `probe` est vrai, en supposant
+    le prédicat vrai sur un préfixe de l'intervalle. Retourne None si aucun.
+
+    `probe(ids)` évalue un lot d'identifiants et retourne {id: bool} : chaque
+    itération interroge `width` points répartis dans l'intervalle en un seul
+    lot (recherche k-aire), soit log_width(n) lots au lieu de log2(n) appels.
+    """
+    result = None
+    while low <= high:
+        if high - low + 1 <= width:
+            points = list(range(low, high + 1))
+        else:
+            step = (high - low) / (width - 1)
+            points = sorted({low + round(step * i) for i in range(width)})
+        answers = probe(points)
+        true_points = [p for p in points if answers[p]]
+        false_points = [p for p in points if not answers[p]]
+        last_true = true_points[-1] if true_points else None
+        first_false_after = next((p for p in false_points if last_true is None or p > last_true), None)
+
+        if last_true is not None:
+            result = last_true
+        if len(points) == high - low + 1:
+            break
+        low = last_true + 1 if last_true is not None else low
+        high = first_false_after - 1 if first_false_after is not None else high
+        if last_true is None and first_false_after == points[0]:
+            break
+    return result
+
+
+def _points_around(estimate: int, low: int, high: int, width: int):
+    """
+    Au plus `width` points de [low, high] : consécutifs autour de `estimate`,
+    puis espacés exponentiellement de part et d'autre (pour encadrer la cible
+    même si l'estimation est approximative).
+    """
+    near = max(2, width // 2)
+    points = {estimate + d for d in range(-(near // 2), near - near // 2)}
+    step = near // 2
+    while len(points) < width and (estimate - step > low or estimate + step < high):
+        step *= 2
+        points.update((estimate - step, estimate + step))
+    return sorted(p for p in points if low <= p <= high)
+
+
+def find_last_before(get_timestamps, low: int, high: int, target: int, inclusive: bool = False,
+                     width: int = 32, max_steps: int = 3):
+    """
+    Dernier identifiant de [low, high] dont le timestamp est < target (<= si
+    `inclusive`), ou None. `get_timestamps(ids)` retourne {id: timestamp ou None}.
+
+    Recherche par interpolation : updatedAt croît presque linéairement avec
+    l'aggregatorRoundId, la position de la cible est estimée à partir des
+    timestamps des bornes et un lot de `width` points est sondé autour de
+    l'estimation. Après `max_steps` lots sans conclure (croissance non
+    linéaire), la recherche k-aire find_last_true prend le relais.
+    """
+    def before(ts):
+        return ts is not None and (ts <= target if inclusive else ts < target)
+
+    ends = get_timestamps([low, high])
+    if not before(ends[low]):
+        return None
+    if before(ends[high]):
+        return high
+    # Invariant : before(low) et not before(high)
+    ts_low, ts_high = ends[low], ends[high]
+    for _ in range(max_steps):
+        if high - low <= 1:
+            return low
+        if ts_high is None or ts_high <= ts_low:
+            break
+        estimate = low + int((target - ts_low) * (high - low) / (ts_high - ts_low))
+        points = _points_around(min(max(estimate, low + 1), high - 1), low + 1, high - 1, width)
+        stamps = get_timestamps(points)
+        for p in points:
+            if before(stamps[p]):
+                low, ts_low = p, stamps[p]
+            else:
+                high, ts_high = p, stamps[p]
+                break
+    if high - low <= 1:
+        return low
+
+    def probe(ids):
+        return {i: before(ts) for i, ts in get_timestamps(ids).items()}
+    return find_last_true(probe, low, high - 1, width=width)
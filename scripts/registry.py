@@ -0,0 +1,155 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Registre des pools Uniswap V3 et des flux Chainlink extraits (scripts/registry.json).
+
+Un pool est décrit par son adresse, les décimales de token0 et token1, le
+sens de cotation (invert) et le flux Chainlink de référence ; un flux, par
+l'adresse de son proxy et les décimales de sa réponse.
+
+Cotation : sqrtPriceX96 donne le prix de token0 en token1. Avec invert, le
+prix est inversé : le pool USDC/WETH (token0 USDC, token1 WETH) est coté en
+USDC par WETH. Le jeton coté est le jeton de base, l'autre le jeton de
+cotation. Les jeux de données de tous les pools ont les colonnes de
+uniswap_eth_usd.csv : price_usdc_per_eth est le prix du jeton de base en
+jeton de cotation, usdc_amount et eth_amount les montants du jeton de
+cotation et du jeton de base, volume_usdc le volume en jeton de cotation.
+
+Chemins d'une entrée <nom>, sous le répertoire des données (data/, ou
+"data_dir" du registre, relatif au fichier) :
+
+    <nom>.csv, <nom>_last.csv     jeu cumulé et nouvelles lignes
+    <nom>_bars_<intervalle>.csv   barres OHLCV / VWAP (pools)
+    <nom>_checkpoint.json         blocs déjà traités (pools, checkpoint.py)
+    parquet/<nom>/                jeu Parquet partitionné
+
+"manifest" et "parquet_dir" remplacent les deux derniers (chemins
+historiques du pool ETH/USDC et du flux ETH/USD).
+"""
+
+import argparse
+import json
+import os
+import sys
+
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), os.pardir, 'data'))
+DEFAULT_REGISTRY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'registry.json')
+DEFAULT_POOL = "uniswap_eth_usd"
+DEFAULT_FEED = "chainlink_eth_usd"
+
+
+class Pool:
+    """
+    Pool Uniswap V3 du registre.
+    """
+
+    def __init__(self, name, address, token0, token1, decimals0, decimals1, invert=False, feed=None,
+                 data_dir=DATA_DIR, manifest=None, parquet_dir=None, description=""):
+        self.name = name
+        self.address = address
+        self.token0, self.token1 = token0, token1
+        self.decimals0, self.decimals1 = int(decimals0), int(decimals1)
+        self.invert = bool(invert)
+        self.feed = feed
+        self.data_dir = data_dir
+        self.description = description
+        self.dataset_path = os.path.join(data_dir, f"{name}.csv")
+        self.last_path = os.path.join(data_dir, f"{name}_last.csv")
+        self.manifest_path = os.path.join(data_dir, manifest or f"{name}_checkpoint.json")
+        self.parquet_dir = os.path.join(data_dir, parquet_dir or os.path.join("parquet", name))
+
+    @property
+    def base_token(self) -> str:
+        return self.token1 if self.invert else self.token0
+
+    @property
+    def quote_token(self) -> str:
+        return self.token0 if self.invert else self.token1
+
+    def __repr__(self) -> str:
+        return f"Pool({self.name}, {self.base_token}/{self.quote_token}, {self.address})"
+
+
+class Feed:
+    """
+    Flux Chainlink (proxy) du registre.
+    """
+
+    def __init__(self, name, address, decimals=8, data_dir=DATA_DIR, parquet_dir=None, description=""):
+        self.name = name
+        self.address = address
+        self.decimals = int(decimals)
+        self.data_dir = data_dir
+        self.description = description
+        self.dataset_path = os.path.join(data_dir, f"{name}.csv")
+        self.last_path = os.path.join(data_dir, f"{name}_last.csv")
+        self.parquet_dir = os.path.join(data_dir, parquet_dir or os.path.join("parquet", name))
+
+    def __repr__(self) -> str:
+        return f"Feed({self.name}, {self.address})"
+
+
+class Registry:
+    """
+    Pools et flux chargés depuis un fichier JSON {"pools": {...}, "feeds": {...}}.
+    """
+
+    def __init__(self, pools: dict, feeds: dict):
+        self.pools = pools
+        self.feeds = feeds
+        for pool in pools.values():
+            if pool.feed is not None and pool.feed not in feeds:
+                raise ValueError(f"pool {pool.name} : flux {pool.feed} absent du registre")
+        addresses = [pool.address.lower() for pool in pools.values()]
+        if len(set(addresses)) != len(addresses):
+            raise ValueError("plusieurs pools du registre ont la même adresse")
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_REGISTRY_PATH, data_dir: str = DATA_DIR):
+        """
+        Lit le registre ; lève ValueError si le fichier est absent ou mal formé.
+        data_dir : répertoire des données si le registre n'en indique pas.
+        """
+        try:
+            with open(path, encoding='utf-8') as f:
+                config = json.load(f)
+        except OSError as e:
+            raise ValueError(f"registre {path} illisible: {e}") from e
+        except json.JSONDecodeError as e:
+            raise ValueError(f"registre {path} mal formé: {e}") from e
+        if config.get("data_dir") is not None:
+            data_dir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(path)), config["data_dir"]))
+        try:
+            pools = {name: Pool(name, data_dir=data_dir, **entry) for name, entry in config.get("pools", {}).items()}
+            feeds = {name: Feed(name, data_dir=data_dir, **entry) for name, entry in config.get("feeds", {}).items()}
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"registre {path} : entrée invalide ({e})") from e
+        return cls(pools, feeds)
+
+    def pool(self, name: str) -> Pool:
+        if name not in self.pools:
+            raise ValueError(f"pool inconnu : {name} (registre : {', '.join(self.pools)})")
+        return self.pools[name]
+
+    def feed(self, name: str) -> Feed:
+        if name not in self.feeds:
+            raise ValueError(f"flux inconnu : {name} (registre : {', '.join(self.feeds)})")
+        return self.feeds[name]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pools et flux du registre.")
+    parser.add_argument("--registry", default=DEFAULT_REGISTRY_PATH, help="Fichier du registre (défaut: scripts/registry.json).")
+    args = parser.parse_args()
+    try:
+        registry = Registry.load(args.registry)
+    except ValueError as e:
+        print(f"ERREUR: {e}", file=sys.stderr)
+        sys.exit(1)
+    for pool in registry.pools.values():
+        print(f"pool {pool.name:<24} {pool.address} {pool.base_token}/{pool.quote_token} "
+              f"(décimales {pool.decimals0}/{pool.decimals1}{', inversé' if pool.invert else ''}) "
+              f"→ {pool.feed or '-'} | {pool.dataset_path}")
+    for feed in registry.feeds.values():
+        print(f"flux {feed.name:<24} {feed.address} (décimales {feed.decimals}) | {feed.dataset_path}")
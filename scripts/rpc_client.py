@@ -0,0 +1,380 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Client JSON-RPC HTTP minimal, avec support des requêtes batch.
+
+Utilisé là où web3.py ferait un aller-retour HTTP par appel : plusieurs
+appels sont regroupés dans un seul POST JSON-RPC (tableau de requêtes).
+Chaque requête est comptée dans le registre de métriques (appels par
+méthode, latence, erreurs).
+
+PooledRpcClient répartit les requêtes sur plusieurs endpoints (variable RPC
+sous forme de liste séparée par des virgules) :
+  - limite de débit par endpoint (seau à jetons, requêtes par seconde) ;
+  - répartition pondérée (round-robin pondéré lissé) entre les endpoints
+    disponibles, en évitant ceux dont le seau est vide ;
+  - sur 429, 5xx, erreur de connexion ou erreur JSON-RPC de limite de débit,
+    l'endpoint est mis en pause (Retry-After, sinon délai exponentiel) et la
+    requête repart aussitôt sur un autre endpoint.
+
+Options d'un endpoint, après un # (jamais envoyé au serveur) :
+
+    RPC="https://a.example/KEY#rps=25&weight=3,https://b.example#rps=5"
+"""
+
+import itertools
+import os
+import threading
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+from metrics import METRICS
+
+
+class RpcError(Exception):
+    """
+    Erreur de transport ou réponse JSON-RPC en erreur.
+    """
+
+
+class JsonRpcClient:
+    """
+    Client JSON-RPC sur HTTP (connexions keep-alive via requests.Session).
+    Utilisable depuis plusieurs threads.
+    metrics : registre où compter les requêtes (défaut: registre partagé du processus).
+    """
+
+    def __init__(self, url: str, timeout: float = 30.0, pool_size: int = 16, metrics=METRICS):
+        self.url = url
+        self.timeout = timeout
+        self.metrics = metrics
+        self._ids = itertools.count(1)
+        self._ids_lock = threading.Lock()
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def _next_id(self) -> int:
+        with self._ids_lock:
+            return next(self._ids)
+
+    def _post(self, payload):
+        methods = [item["method"] for item in payload] if isinstance(payload, list) else [payload["method"]]
+        start = time.perf_counter()
+        try:
+            response = self._session.post(self.url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            reply = response.json()
+        except (requests.RequestException, ValueError) as e:
+            self.metrics.rpc_request(methods, time.perf_counter() - start, error=True)
+            raise RpcError(f"Échec de la requête vers '{self.url}': {e}") from e
+        error = isinstance(reply, dict) and bool(reply.get("error"))
+        self.metrics.rpc_request(methods, time.perf_counter() - start, error=error)
+        return reply
+
+    def call(self, method: str, params: list):
+        """
+        Appel JSON-RPC simple. Retourne `result` ou lève RpcError.
+        """
+        reply = self._post({"jsonrpc": "2.0", "id": self._next_id(), "method": method, "params": params})
+        if not isinstance(reply, dict):
+            raise RpcError(f"Réponse inattendue pour {method}: {reply!r}")
+        if reply.get("error"):
+            raise RpcError(f"{method}: {reply['error']}")
+        return reply.get("result")
+
+    def batch(self, calls: list) -> list:
+        """
+        Envoie une liste de (method, params) dans une seule requête batch.
+
+        Retourne une liste alignée sur `calls` : pour chaque appel, le dict
+        de réponse JSON-RPC (avec `result` ou `error`), ou None si le serveur
+        n'a pas répondu pour cet appel.
+        """
+        if not calls:
+            return []
+        ids = [self._next_id() for _ in calls]
+        payload = [
+            {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+            for request_id, (method, params) in zip(ids, calls)
+        ]
+        reply = self._post(payload)
+        if isinstance(reply, dict):
+            # Certains nœuds répondent par une erreur unique au lieu d'un tableau
+            raise RpcError(f"Requête batch refusée: {reply.get('error', reply)}")
+        by_id = {item.get("id"): item for item in reply if isinstance(item, dict)}
+        return [by_id.get(request_id) for request_id in ids]
+
+
+# Codes HTTP après lesquels la requête est renvoyée vers un autre endpoint
+FAILOVER_STATUS = {408, 425, 429, 500, 502, 503, 504}
+# Erreurs JSON-RPC de limite de débit renvoyées avec un statut 200 (Alchemy, Infura, nœuds publics).
+# -32005 seul ne suffit pas : Infura l'utilise aussi pour « query returned more than 10000 results ».
+RATE_LIMIT_CODES = {429, -32029}
+RATE_LIMIT_MESSAGES = ("rate limit", "too many requests", "request rate exceeded")
+
+
+class TokenBucket:
+    """
+    Seau à jetons : `rate` jetons par seconde, au plus `burst` accumulés.
+    rate=None : aucune limite. Par défaut burst=1 : requêtes régulièrement
+    espacées, jamais plus de rate + 1 dans une fenêtre d'une seconde.
+    """
+
+    def __init__(self, rate=None, burst=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else 1.0
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """
+        Délai avant qu'un jeton soit disponible (sans le prendre).
+        """
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, (1 - self._tokens) / self.rate)
+
+    def reserve(self) -> float:
+        """
+        Prend un jeton ; retourne le délai à attendre avant d'envoyer la requête
+        (le solde peut devenir négatif : les réservations suivantes attendent d'autant).
+        """
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+
+class Endpoint:
+    """
+    Un endpoint RPC : URL, poids, seau à jetons et état de pause après erreur.
+    `name` (hôte, sans chemin ni clé d'API) sert d'étiquette dans les métriques.
+    """
+
+    def __init__(self, url: str, weight: float = 1.0, rate=None, burst=None, name=None):
+        self.url = url
+        self.weight = weight
+        self.bucket = TokenBucket(rate, burst)
+        self.name = name or urlsplit(url).netloc or url
+        self.cooldown_until = 0.0
+        self.failures = 0
+        self.current = 0.0  # Compteur du round-robin pondéré lissé
+
+
+def parse_endpoints(spec: str, rate=None, burst=None) -> list:
+    """
+    Liste d'Endpoint à partir de "url[#rps=..&weight=..&burst=..],url…".
+    rate / burst : valeurs par défaut des endpoints sans rps / burst.
+    """
+    endpoints, names = [], {}
+    for entry in (part.strip() for part in spec.split(",")):
+        if not entry:
+            continue
+        url, _, fragment = entry.partition("#")
+        options = dict(parse_qsl(fragment))
+        try:
+            endpoint = Endpoint(
+                url,
+                weight=float(options.get("weight", 1.0)),
+                rate=float(options["rps"]) if "rps" in options else rate,
+                burst=float(options["burst"]) if "burst" in options else burst,
+            )
+        except ValueError as e:
+            raise ValueError(f"options invalides pour l'endpoint RPC '{url}': {fragment}") from e
+        # Deux endpoints du même hôte (clés différentes) restent distincts dans les métriques
+        names[endpoint.name] = names.get(endpoint.name, 0) + 1
+        if names[endpoint.name] > 1:
+            endpoint.name = f"{endpoint.name}#{names[endpoint.name]}"
+        endpoints.append(endpoint)
+    if not endpoints:
+        raise ValueError("aucun endpoint RPC")
+    return endpoints
+
+
+class EndpointPool:
+    """
+    Choix de l'endpoint de chaque requête et suivi de leur santé.
+    Utilisable depuis plusieurs threads (et depuis asyncio : reserve() ne bloque pas).
+
+    backoff, max_backoff : pause d'un endpoint après des erreurs consécutives
+    (backoff × 2^(erreurs-1), plafonnée), si le serveur n'a pas donné de Retry-After.
+    """
+
+    def __init__(self, endpoints, backoff: float = 1.0, max_backoff: float = 60.0, metrics=METRICS):
+        self.endpoints = list(endpoints)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.metrics = metrics
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_spec(cls, spec: str, rate=None, burst=None, **kwargs):
+        return cls(parse_endpoints(spec, rate, burst), **kwargs)
+
+    @property
+    def urls(self) -> list:
+        return [endpoint.url for endpoint in self.endpoints]
+
+    def reserve(self):
+        """
+        Choisit l'endpoint de la prochaine requête et y prend un jeton.
+        Retourne (endpoint, délai à attendre avant l'envoi).
+
+        Parmi les endpoints hors pause, ceux dont le seau a un jeton passent en
+        premier (round-robin pondéré lissé) ; sinon celui qui en aura un le plus tôt.
+        Si tous sont en pause, celui dont la pause finit le plus tôt.
+        """
+        now = time.monotonic()
+        with self._lock:
+            available = [e for e in self.endpoints if e.cooldown_until <= now]
+            if not available:
+                endpoint = min(self.endpoints, key=lambda e: e.cooldown_until)
+                return endpoint, endpoint.cooldown_until - now + endpoint.bucket.reserve()
+            waits = {id(e): e.bucket.wait_time() for e in available}
+            ready = [e for e in available if waits[id(e)] == 0] or [min(available, key=lambda e: waits[id(e)])]
+            total = sum(e.weight for e in ready)
+            for e in ready:
+                e.current += e.weight
+            endpoint = max(ready, key=lambda e: e.current)
+            endpoint.current -= total
+            return endpoint, endpoint.bucket.reserve()
+
+    def success(self, endpoint: Endpoint) -> None:
+        with self._lock:
+            endpoint.failures = 0
+        self.metrics.count("rpc_endpoint_requests_total", endpoint=endpoint.name, status="ok")
+
+    def failure(self, endpoint: Endpoint, retry_after=None, status: str = "error") -> None:
+        """
+        Met l'endpoint en pause : `retry_after` secondes si le serveur l'a indiqué,
+        sinon un délai exponentiel selon le nombre d'erreurs consécutives.
+        """
+        with self._lock:
+            endpoint.failures += 1
+            delay = retry_after if retry_after is not None else self.backoff * 2 ** (endpoint.failures - 1)
+            endpoint.cooldown_until = time.monotonic() + min(self.max_backoff, delay)
+        self.metrics.count("rpc_endpoint_requests_total", endpoint=endpoint.name, status=status)
+
+
+def parse_retry_after(value):
+    """
+    En-tête Retry-After en secondes (la forme date HTTP est ignorée).
+    """
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limit_error(reply) -> bool:
+    """
+    Vrai si une réponse JSON-RPC (non batch) est une erreur de limite de débit.
+    """
+    if not isinstance(reply, dict) or not isinstance(reply.get("error"), dict):
+        return False
+    error = reply["error"]
+    message = str(error.get("message", "")).lower()
+    return error.get("code") in RATE_LIMIT_CODES or any(m in message for m in RATE_LIMIT_MESSAGES)
+
+
+class PooledRpcClient(JsonRpcClient):
+    """
+    JsonRpcClient sur un pool d'endpoints (EndpointPool, ou spécification
+    "url1,url2#rps=10"), avec bascule automatique sur 429 / 5xx.
+
+    retries : nouvelles tentatives d'une requête, sur d'autres endpoints si
+    possible, avant de lever RpcError.
+    """
+
+    def __init__(self, endpoints, timeout: float = 30.0, pool_size: int = 16, retries: int = 5,
+                 rate=None, metrics=METRICS):
+        self.pool = endpoints if isinstance(endpoints, EndpointPool) else EndpointPool.from_spec(endpoints, rate, metrics=metrics)
+        super().__init__(",".join(self.pool.urls), timeout=timeout, pool_size=pool_size, metrics=metrics)
+        self.retries = retries
+
+    def _post(self, payload):
+        methods = [item["method"] for item in payload] if isinstance(payload, list) else [payload["method"]]
+        label = methods[0] if len(set(methods)) == 1 else "batch"
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.metrics.rpc_retry(label)
+            endpoint, delay = self.pool.reserve()
+            if delay > 0:
+                time.sleep(delay)
+            start = time.perf_counter()
+            try:
+                response = self._session.post(endpoint.url, json=payload, timeout=self.timeout)
+            except requests.RequestException as e:
+                self.metrics.rpc_request(methods, time.perf_counter() - start, error=True)
+                self.pool.failure(endpoint)
+                last_error = e
+                continue
+            elapsed = time.perf_counter() - start
+            if response.status_code in FAILOVER_STATUS:
+                self.metrics.rpc_request(methods, elapsed, error=True)
+                status = "rate_limited" if response.status_code == 429 else "error"
+                self.pool.failure(endpoint, parse_retry_after(response.headers.get("Retry-After")), status)
+                last_error = f"HTTP {response.status_code} de {endpoint.name}"
+                continue
+            try:
+                response.raise_for_status()
+                reply = response.json()
+            except (requests.RequestException, ValueError) as e:
+                # Erreur HTTP non transitoire (400, 401, 413…) : la renvoyer ailleurs ne changerait rien
+                self.metrics.rpc_request(methods, elapsed, error=True)
+                raise RpcError(f"Échec de la requête vers '{endpoint.name}': {e}") from e
+            if is_rate_limit_error(reply):
+                self.metrics.rpc_request(methods, elapsed, error=True)
+                self.pool.failure(endpoint, status="rate_limited")
+                last_error = f"{endpoint.name}: {reply['error']}"
+                continue
+            self.metrics.rpc_request(methods, elapsed, error=isinstance(reply, dict) and bool(reply.get("error")))
+            self.pool.success(endpoint)
+            return reply
+        raise RpcError(f"Échec de la requête {label} après {self.retries + 1} tentatives: {last_error}")
+
+    def request(self, method: str, params: list) -> dict:
+        """
+        Appel simple ; retourne la réponse JSON-RPC complète (result ou error), pour web3_provider.
+        """
+        return self._post({"jsonrpc": "2.0", "id": self._next_id(), "method": method, "params": params})
+
+
+def rate_limit_from_env():
+    """
+    Limite de débit par défaut des endpoints (RPC_RATE_LIMIT, requêtes par seconde), ou None.
+    """
+    value = os.environ.get("RPC_RATE_LIMIT", "")
+    return float(value) if value else None
+
+
+def web3_provider(client: PooledRpcClient):
+    """
+    Fournisseur web3.py qui envoie ses requêtes par `client` (pool, limites, bascule).
+    """
+    # Import différé : web3 n'est requis que par l'extracteur Chainlink
+    import json
+    from web3.providers import JSONBaseProvider
+
+    class PooledProvider(JSONBaseProvider):
+        def make_request(self, method, params):
+            # Même sérialisation que HTTPProvider (HexBytes, adresses…)
+            request = json.loads(self.encode_rpc_request(method, params))
+            return client.request(method, request["params"])
+
+    return PooledProvider()
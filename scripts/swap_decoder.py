@@ -0,0 +1,136 @@
+# SPDX-License-Identifier: CC-BY-4.0
+# © 2025 HES-SO / HEG Geneva / Deep Mining Lab / FairOnChain / Open Price ETH
+
+"""
+Décodage vectorisé des événements Swap Uniswap V3.
+
+Toute la colonne `data` des logs cryo est décodée en une seule passe :
+les mots ABI de 32 octets sont lus en bloc via NumPy (4 limbs uint64
+big-endian par mot) au lieu d'un `bytes.fromhex` + `mp.mpf` par ligne.
+
+Précision : les montants et le prix sont calculés en float64. Par rapport
+au calcul de référence mpmath (mp.dps = 50) de `Uniswap_process_logs.py`,
+l'écart relatif reste inférieur à REFERENCE_RTOL sur chaque colonne.
+
+Les décimales des deux jetons et le sens de cotation sont ceux du pool
+(registry.py) ; par défaut, le pool USDC/WETH coté en USDC par ETH.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Écart relatif maximal garanti par rapport au moteur de référence mpmath
+REFERENCE_RTOL = 1e-12
+
+USDC_DECIMALS = 6
+ETH_DECIMALS = 18
+
+WORD_HEX = 64                    # 32 octets = 64 caractères hexadécimaux
+DECODED_WORDS = 3                # amount0, amount1, sqrtPriceX96
+DECODED_HEX = DECODED_WORDS * WORD_HEX
+LIMBS_PER_WORD = 4               # 4 x uint64 = 256 bits
+
+DECODED_COLUMNS = ['usdc_amount', 'eth_amount', 'sqrt_price_x96', 'price_usdc_per_eth', 'volume_usdc']
+
+
+def _strip_hex_prefix(data: pd.Series) -> pd.Series:
+    """
+    Retire le préfixe '0x' et ne garde que les mots utiles (amount0, amount1, sqrtPriceX96).
+    """
+    data = data.astype(str)
+    data = data.where(~data.str.startswith('0x'), data.str.slice(2))
+    return data.str.slice(0, DECODED_HEX)
+
+
+def _hex_to_limbs(words_hex: pd.Series) -> np.ndarray:
+    """
+    Convertit des chaînes hex de longueur fixe en matrice (n, 12) de limbs uint64.
+    Un seul `bytes.fromhex` pour tout le lot.
+    """
+    buf = bytes.fromhex(''.join(words_hex.tolist()))
+    limbs = np.frombuffer(buf, dtype='>u8').astype(np.uint64)
+    return limbs.reshape(-1, DECODED_WORDS * LIMBS_PER_WORD)
+
+
+def _valid_hex_mask(words_hex: pd.Series) -> pd.Series:
+    """
+    Lignes dont les mots utiles sont complets et en hexadécimal valide.
+    """
+    return words_hex.str.len().eq(DECODED_HEX) & words_hex.str.fullmatch(r'[0-9a-fA-F]*').fillna(False)
+
+
+def _uint256_to_float(limbs: np.ndarray) -> np.ndarray:
+    """
+    Valeur flottante d'un uint256 donné par ses 4 limbs (poids fort en premier).
+    """
+    value = limbs[:, 0].astype(np.float64)
+    for i in range(1, LIMBS_PER_WORD):
+        value = value * 2.0**64 + limbs[:, i].astype(np.float64)
+    return value
+
+
+def _int256_to_float(limbs: np.ndarray) -> np.ndarray:
+    """
+    Valeur flottante d'un int256 en complément à deux.
+    Pour un négatif x, |x| = ~x + 1 : on évite ainsi la soustraction de 2**256.
+    """
+    negative = (limbs[:, 0] >> np.uint64(63)) == 1
+    magnitude = np.where(negative[:, None], ~limbs, limbs)
+    value = _uint256_to_float(magnitude)
+    return np.where(negative, -(value + 1.0), value)
+
+
+def decode_swap_batch(data: pd.Series, decimals0: int = USDC_DECIMALS, decimals1: int = ETH_DECIMALS,
+                      invert: bool = True) -> pd.DataFrame:
+    """
+    Décode une colonne entière de `data` d'événements Swap.
+
+    decimals0, decimals1 : décimales de token0 et token1 du pool. invert :
+    prix de token1 en token0 (USDC par ETH) au lieu de token0 en token1 ;
+    usdc_amount et volume_usdc sont alors en token0, eth_amount en token1
+    (l'inverse sans invert).
+
+    Retourne un DataFrame aligné sur l'index de `data` avec les colonnes
+    DECODED_COLUMNS et une colonne booléenne `valid` (False pour les lignes
+    mal formées ou dont le prix n'est pas calculable, ex. sqrtPriceX96 nul).
+    """
+    words_hex = _strip_hex_prefix(data)
+
+    try:
+        valid = words_hex.str.len().eq(DECODED_HEX)
+        limbs = _hex_to_limbs(words_hex[valid])
+    except ValueError:
+        # Au moins une ligne contient des caractères non hexadécimaux : validation ligne par ligne
+        valid = _valid_hex_mask(words_hex)
+        limbs = _hex_to_limbs(words_hex[valid])
+
+    n_words = LIMBS_PER_WORD
+    amount0 = _int256_to_float(limbs[:, 0:n_words])
+    amount1 = _int256_to_float(limbs[:, n_words:2 * n_words])
+    sqrt_price_x96 = _uint256_to_float(limbs[:, 2 * n_words:3 * n_words])
+
+    # Conversion des montants avec décimales : jeton de cotation (USDC), puis jeton de base (ETH)
+    token0_amount = amount0 / 10.0**decimals0
+    token1_amount = amount1 / 10.0**decimals1
+    usdc_amount, eth_amount = (token0_amount, token1_amount) if invert else (token1_amount, token0_amount)
+
+    # Prix : (sqrtPriceX96 / 2**96)**2 donne token1 par token0 (ETH par USDC), ajusté des décimales puis inversé
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        sqrt_price = sqrt_price_x96 / 2.0**96
+        price_token0_adj = sqrt_price * sqrt_price * 10.0**(decimals0 - decimals1)
+        price_usdc_per_eth = 1.0 / price_token0_adj if invert else price_token0_adj
+        volume_usdc = np.abs(usdc_amount) + np.abs(eth_amount * price_usdc_per_eth)
+
+    decoded = pd.DataFrame(
+        {
+            'usdc_amount': usdc_amount,
+            'eth_amount': eth_amount,
+            'sqrt_price_x96': sqrt_price_x96,
+            'price_usdc_per_eth': price_usdc_per_eth,
+            'volume_usdc': volume_usdc,
+        },
+        index=words_hex.index[valid.to_numpy()],
+    ).reindex(words_hex.index)
+
+    decoded['valid'] = valid & np.isfinite(decoded['price_usdc_per_eth']) & np.isfinite(decoded['volume_usdc'])
+    return decoded